@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+import warnings
+
+
+PERIODS = {'year' : 'Y', 'quarter' : 'Q'}
+PERIOD_STATS = ('sum', 'count', 'min', 'max')
+DESCRIBE_STATS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+def period_aggregates(data, period='year'):
+
+	"""
+	Function to compute the sum, the number of observed values, the minimum and
+	the maximum of every tag per period, with one `reduceat` over the sorted rows.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column, sorted by month.
+
+	period : str, optional; default:'year'
+		Represents the period of the aggregates. Possible values `year` or `quarter`
+
+	Returns:
+	--------
+	tables : dict
+		Represents one DataFrame (one row per period, one column per tag) per statistic.
+
+	"""
+	labels = data.index.to_period(PERIODS[period])
+	if period == 'year':
+		labels = labels.year
+
+	values = data.to_numpy(dtype=np.float64)
+	observed = ~np.isnan(values)
+
+	starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]]) if len(labels) else np.array([], dtype=int)
+	index = pd.Index(labels[starts], name=period)
+
+	if not len(starts):
+		return {stat : pd.DataFrame(index=index, columns=data.columns, dtype=np.float64) for stat in PERIOD_STATS}
+
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore', RuntimeWarning)
+		res = dict(
+			sum=np.add.reduceat(np.where(observed, values, 0.), starts, axis=0),
+			count=np.add.reduceat(observed, starts, axis=0).astype(np.float64),
+			min=np.fmin.reduceat(values, starts, axis=0),
+			max=np.fmax.reduceat(values, starts, axis=0),
+		)
+
+	return {stat : pd.DataFrame(vals, index=index, columns=data.columns) for stat, vals in res.items()}
+
+
+def describe_values(data):
+
+	"""
+	Function to compute `pandas.DataFrame.describe` of every tag with vectorized NumPy reductions.
+
+	Returns:
+	--------
+	res : pandas.DataFrame
+		Represents the summary statistics, one row per tag.
+
+	"""
+	values = data.to_numpy(dtype=np.float64)
+	count = (~np.isnan(values)).sum(axis=0)
+
+	# all missing (or single valued) tags give NaN statistics, like pandas
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore', RuntimeWarning)
+		mean = np.nanmean(values, axis=0)
+		std = np.where(count > 1, np.nanstd(values, axis=0, ddof=1), np.nan)
+		quartiles = np.nanpercentile(values, [0, 25, 50, 75, 100], axis=0)
+
+	res = np.column_stack([count, mean, std, quartiles[0], quartiles[1], quartiles[2], quartiles[3], quartiles[4]])
+
+	return pd.DataFrame(res, index=data.columns, columns=DESCRIBE_STATS)
+
+
+class AggregateTables:
+
+	"""
+	Per tag aggregates of the dataset, materialized once per period (yearly,
+	quarterly and all-time) and updated with new rows without a full recompute.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column, sorted by month.
+
+	"""
+	def __init__(self, data):
+
+		self.columns = data.columns
+		self.n_rows = len(data)
+		self.periods = {period : period_aggregates(data, period) for period in PERIODS}
+		self.summary = describe_values(data)
+
+	def update(self, new_rows, data):
+
+		"""
+		Function to add new rows (following the data) to the aggregates. The period
+		tables are merged with the aggregates of the new rows only, the all-time
+		quartiles need the whole `data` (including the new rows).
+		"""
+		self.n_rows += len(new_rows)
+
+		for period, tables in self.periods.items():
+			new_tables = period_aggregates(new_rows, period)
+
+			tables['sum'] = tables['sum'].add(new_tables['sum'], fill_value=0)
+			tables['count'] = tables['count'].add(new_tables['count'], fill_value=0)
+			tables['min'] = tables['min'].combine(new_tables['min'], np.fmin)
+			tables['max'] = tables['max'].combine(new_tables['max'], np.fmax)
+
+		self.summary = describe_values(data)
+
+	def table(self, period='year', stat='mean', cols=None):
+
+		"""
+		Returns an aggregate of the tags (all when `cols` is None).
+
+		Parameters:
+		-----------
+		period : str, optional; default:'year'
+			Represents the period. Possible values `year`, `quarter` or `all`
+
+		stat : str, optional; default:'mean'
+			Represents the statistic, `sum`, `count`, `mean`, `min` or `max` per period,
+			or any column of `pandas.DataFrame.describe` for `all`.
+
+		cols : list, optional; default:None
+			Represents the tags.
+
+		Returns:
+		--------
+		res : pandas.DataFrame or pandas.Series
+			Represents the aggregate, one row per period and one column per tag,
+			or one value per tag for `all`.
+
+		"""
+		cols = self.columns if cols is None else cols
+
+		if period == 'all':
+			return self.summary.loc[cols, stat]
+
+		tables = self.periods[period]
+		if stat == 'mean':
+			return tables['sum'][cols] / tables['count'][cols].where(tables['count'][cols] > 0)
+
+		return tables[stat][cols]
+
+	def describe(self, cols=None):
+
+		"""
+		Returns `pandas.DataFrame.describe` of the tags (all when `cols` is None), one row per tag.
+		"""
+		cols = self.columns if cols is None else cols
+		return self.summary.loc[cols]
+
+	def missing_percentage(self):
+
+		"""
+		Returns the percentage of missing values of every tag.
+		"""
+		n_missing = self.n_rows - self.summary['count']
+		return ((n_missing / self.n_rows) * 100).rename("Percentage of Data Missing").to_frame()
+
+	def years(self):
+		return self.periods['year']['sum'].index.tolist()
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+import os
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.metrics import r2_score, mean_squared_error
+
+from modelling import find_best_fit, arima_fit, arima_forecast
+from compact_arima import CompactARIMA
+
+
+def _scores(actual, forecast):
+	rmse = np.sqrt(mean_squared_error(actual, forecast))
+	score = r2_score(actual, forecast) if len(actual) > 1 else np.nan
+
+	return rmse, score
+
+
+def make_cutoffs(n_obs, initial=60, step=1, horizon=12, partial=False):
+
+	"""
+	Function to compute the positions of the backtest cutoffs.
+
+	Parameters:
+	-----------
+	n_obs : int
+		Represents the length of the series.
+
+	initial : int, optional; default:60
+		Represents the number of observations of the first training window.
+
+	step : int, optional; default:1
+		Represents the number of observations between two cutoffs.
+
+	horizon : int, optional; default:12
+		Represents the number of steps forecasted from each cutoff.
+
+	partial : bool, optional; default:False
+		Represents whether to keep the last cutoffs whose horizon runs past the data.
+
+	Returns:
+	--------
+	cutoffs : list
+		Represents the number of observations used for training at each cutoff.
+
+	"""
+	last = n_obs - 1 if partial else n_obs - horizon
+
+	return list(range(initial, last + 1, step))
+
+
+def backtest(data, order=None, horizon=12, initial=60, step=1, window='expanding', refit_every=None, partial=False):
+
+	"""
+	Function to evaluate an ARIMA model over many train/test cutoffs
+	(rolling-origin evaluation).
+
+	The model is fitted once with `arima_fit` at the first cutoff and converted
+	to a `CompactARIMA`. At the following cutoffs the new observations are
+	appended to its state with `CompactARIMA.append` (same parameters), instead
+	of fitting the model from scratch, so the training window only matters at
+	the fits.
+
+	Parameters:
+	-----------
+	data : pandas.Series
+		Represents the data of a single tag. Missing values are dropped.
+
+	order : tuple, optional; default:None
+		Represents the order for the ARIMA. Searched with `find_best_fit`
+		on the first training window when None.
+
+	horizon : int, optional; default:12
+		Represents the number of steps forecasted from each cutoff.
+
+	initial : int, optional; default:60
+		Represents the number of observations of the first training window.
+
+	step : int, optional; default:1
+		Represents the number of observations between two cutoffs.
+
+	window : str, optional; default:'expanding'
+		Represents the training window. Possible values `expanding`
+		(all the observations up to the cutoff) or `rolling` (the last `initial` ones).
+
+	refit_every : int, optional; default:None
+		Represents the number of cutoffs after which the model is fitted from scratch
+		again, on the training window of the cutoff. Never refitted when None.
+
+	partial : bool, optional; default:False
+		Represents whether to keep the last cutoffs whose horizon runs past the data.
+
+	Returns:
+	--------
+	results : dict
+		Represents the results of the backtest:
+		`forecasts` the forecast and the actual value per cutoff and horizon,
+		`by_cutoff` the RMSE and R^2 per cutoff,
+		`by_horizon` the RMSE and R^2 per horizon, over all the cutoffs.
+
+	"""
+	if window not in ('expanding', 'rolling'):
+		raise ValueError(f"window must be either 'expanding' or 'rolling', got {window!r}")
+
+	data = data.dropna()
+	cutoffs = make_cutoffs(len(data), initial=initial, step=step, horizon=horizon, partial=partial)
+
+	if not cutoffs:
+		raise ValueError(f'Series of length {len(data)} is too short for initial={initial} and horizon={horizon}')
+
+	if order is None:
+		order = find_best_fit(data.iloc[:initial], trace=False)['order']
+
+	model_fit, fit_start = None, None
+	records = list()
+
+	for i, cutoff in enumerate(cutoffs):
+
+		train_data = data.iloc[cutoff - initial:cutoff] if window == 'rolling' else data.iloc[:cutoff]
+		test_data = data.iloc[cutoff:cutoff + horizon]
+
+		if model_fit is None or (refit_every is not None and i % refit_every == 0):
+			model_fit = CompactARIMA.from_results(arima_fit(train_data, order))
+			fit_start = cutoff - len(train_data)
+
+		else:
+			model_fit = model_fit.append(data.iloc[fit_start:cutoff])
+
+		forecast_res = np.asarray(arima_forecast(model_fit, model_fit.n_obs, model_fit.n_obs + len(test_data) - 1)).reshape(-1)
+
+		for h in range(len(test_data)):
+			records.append(dict(cutoff=train_data.index[-1], horizon=h + 1, date=test_data.index[h],
+				actual=test_data.iloc[h], forecast=forecast_res[h]))
+
+	forecasts = pd.DataFrame.from_records(records)
+	forecasts['error'] = forecasts['forecast'] - forecasts['actual']
+
+	by_cutoff = forecasts.groupby('cutoff').apply(lambda g: pd.Series(_scores(g['actual'], g['forecast']), index=['rmse', 'r2']))
+	by_horizon = forecasts.groupby('horizon').apply(lambda g: pd.Series(_scores(g['actual'], g['forecast']), index=['rmse', 'r2']))
+
+	return dict(forecasts=forecasts, by_cutoff=by_cutoff, by_horizon=by_horizon)
+
+
+def _backtest_tag(tag, data, order, kwargs):
+	try:
+		return tag, backtest(data, order=order, **kwargs), None
+
+	except Exception as e:
+		return tag, None, f'{type(e).__name__}: {e}'
+
+
+def backtest_all(data, orders=None, n_jobs=None, **kwargs):
+
+	"""
+	Function to run `backtest` for every tag of a dataset in parallel.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	orders : dict, optional; default:None
+		Represents the ARIMA order per tag. The order of a missing tag is
+		searched on its first training window.
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None.
+
+	**kwargs :
+		Represents the remaining arguments of `backtest`.
+
+	Returns:
+	--------
+	results : dict
+		Represents the `forecasts`, `by_cutoff` and `by_horizon` tables of
+		`backtest` with an extra leading `tag` level, and the `errors` of the
+		tags whose backtest failed.
+
+	"""
+	orders = orders or dict()
+	n_jobs = n_jobs or os.cpu_count()
+
+	tables = dict(forecasts=dict(), by_cutoff=dict(), by_horizon=dict())
+	errors = dict()
+
+	with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+
+		futures = [executor.submit(_backtest_tag, col, data[col], orders.get(col), kwargs) for col in data.columns]
+
+		for future in as_completed(futures):
+			tag, res, error = future.result()
+
+			if error is not None:
+				errors[tag] = error
+				continue
+
+			for name in tables:
+				tables[name][tag] = res[name]
+
+	results = dict()
+	for name, table in tables.items():
+		tags = [col for col in data.columns if col in table]
+		results[name] = pd.concat([table[tag] for tag in tags], keys=tags, names=['tag']) if tags else pd.DataFrame()
+
+	results['errors'] = pd.Series(errors, name='error', dtype=object)
+
+	return results
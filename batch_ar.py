@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from tracing import traced
+
+
+class BatchARResults:
+
+	"""
+	AR(p) models of the `d`-th differences of every tag of a dataset, with an
+	intercept (the drift of the differenced series), fitted all at once.
+
+	Parameters:
+	-----------
+	params : numpy.ndarray
+		Represents the intercept and the `p` lag coefficients of every tag, of shape (k, p + 1).
+		The rows of the tags with too few observations are all NaN.
+
+	order : tuple
+		Represents the `(p, d)` order of the models.
+
+	data : pandas.DataFrame
+		Represents the data the models were fitted on.
+
+	fitted_values : numpy.ndarray
+		Represents the one step ahead in-sample predictions (levels), of shape (n, k).
+
+	"""
+	def __init__(self, params, order, data, fitted_values):
+
+		self.params = params
+		self.order = order
+		self.index = data.index
+		self.columns = data.columns
+		self.fitted_values = fitted_values
+
+		# the last `p + d` observations are enough to start the recursion
+		self.tail = data.to_numpy(dtype=np.float64)[-(order[0] + order[1]):]
+
+	@property
+	def n_obs(self):
+		return len(self.index)
+
+	@property
+	def freq(self):
+		return self.index.freq or (pd.infer_freq(self.index[-3:]) if len(self.index) >= 3 else None)
+
+	def future_index(self, steps):
+
+		"""
+		Returns the dates of the `steps` periods following the data.
+		"""
+		if self.freq is None:
+			return pd.RangeIndex(self.n_obs, self.n_obs + steps)
+
+		return pd.date_range(self.index[-1], periods=steps + 1, freq=self.freq)[1:]
+
+	def forecast(self, steps):
+
+		"""
+		Function to forecast the `steps` periods following the data, recursively and for all the tags at once.
+
+		Returns:
+		--------
+		forecasts : numpy.ndarray
+			Represents the forecasted levels, of shape (steps, k).
+
+		"""
+		p, d = self.order
+		intercept, coefs = self.params[:, 0], self.params[:, 1:]
+
+		diffs = [self.tail]
+		for _ in range(d):
+			diffs.append(np.diff(diffs[-1], axis=0))
+
+		# lags[:, 0] is the last difference, lags[:, i] the one `i` periods before it
+		lags = diffs[d][::-1].T.copy()
+		res = np.empty((steps, len(self.columns)))
+
+		for h in range(steps):
+			res[h] = intercept + np.einsum('kp,kp->k', coefs, lags)
+			lags[:, 1:] = lags[:, :-1]
+			lags[:, 0] = res[h]
+
+		for i in reversed(range(d)):
+			res = diffs[i][-1] + np.cumsum(res, axis=0)
+
+		return res
+
+
+def _lag_windows(values, p, d):
+
+	"""
+	Returns the `d`-th differences of the values and their sliding windows of
+	length `p + 1`, of shape (n - d - p, k, p + 1), the target being the last element.
+	"""
+	diffed = np.diff(values, n=d, axis=0) if d else values
+	return diffed, sliding_window_view(diffed, p + 1, axis=0)
+
+
+@traced()
+def batch_ar_fit(data, order=(12, 1), ridge=1e-8):
+
+	"""
+	Function to fit an AR(p) model with an intercept on the `d`-th differences of
+	every tag, estimating the parameters of all the tags with one batched least
+	squares solve instead of one optimisation per tag.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the data which needs to be fitted, one tag per column. The
+		periods with a missing value in their target or lags are left out of the
+		fit of the tag, the tags with fewer than `2 * (p + 1)` usable periods get NaN
+		parameters.
+
+	order : tuple, optional; default:(12, 1)
+		Represents the number of lags `p` and the order of differencing `d`.
+
+	ridge : float, optional; default:1e-8
+		Represents the ridge penalty of the lag coefficients, relative to the
+		mean square of the differences, keeping the normal equations solvable.
+
+	Returns:
+	-------
+	model_fit : BatchARResults
+		Represents the fitted models.
+	"""
+	p, d = order
+	values = data.to_numpy(dtype=np.float64)
+	diffed, windows = _lag_windows(values, p, d)
+
+	valid = np.isfinite(windows).all(axis=-1)
+	target = np.where(valid, windows[..., -1], 0.)
+
+	# design of shape (t, k, p + 1): the intercept followed by the lags 1..p
+	design = np.concatenate([np.ones(valid.shape + (1,)), windows[..., -2::-1]], axis=-1)
+	design = np.where(valid[..., None], design, 0.)
+
+	xtx = np.einsum('tki,tkj->kij', design, design)
+	xty = np.einsum('tki,tk->ki', design, target)
+
+	n_valid = valid.sum(axis=0)
+	usable = n_valid >= 2 * (p + 1)
+	xtx[~usable] = np.eye(p + 1)
+
+	# the intercept is not penalised
+	lag_diag = np.arange(1, p + 1)
+	xtx[:, lag_diag, lag_diag] += ridge * xtx[:, lag_diag, lag_diag].mean(axis=1, keepdims=True)
+
+	params = np.linalg.solve(xtx, xty[..., None])[..., 0]
+	params[~usable] = np.nan
+
+	# one step ahead predictions: the `d`-th difference is linear in the level with a unit
+	# coefficient, so the error of the predicted difference is the error of the predicted level
+	fitted_diff = np.einsum('tki,ki->tk', np.where(valid[..., None], design, np.nan), params)
+	fitted_values = np.full(values.shape, np.nan)
+	fitted_values[d + p:] = values[d + p:] - diffed[p:] + fitted_diff
+
+	return BatchARResults(params, (p, d), data, fitted_values)
+
+
+def _position(model, key):
+	if isinstance(key, (int, np.integer)):
+		return int(key)
+
+	key = pd.Timestamp(key)
+	if key <= model.index[-1]:
+		return model.index.get_loc(key)
+
+	return model.n_obs - 2 + len(pd.date_range(model.index[-1], key, freq=model.freq))
+
+
+@traced()
+def batch_ar_forecast(model, start, end):
+
+	"""
+	Function to predict every tag from `start` to `end` (both included), like
+	`arima_forecast`: one step ahead in-sample predictions up to the last period
+	of the data, recursive forecasts after it.
+
+	Parameters:
+	-----------
+	model : BatchARResults
+		Represents the fitted models.
+
+	start, end : int or datetime
+		Represents the first and last periods predicted, as positions in
+		the data (may be past its end) or as dates.
+
+	Returns:
+	-------
+	predictions : pandas.DataFrame
+		Represents the predicted levels, one column per tag.
+	"""
+	start, end = _position(model, start), _position(model, end)
+	n = model.n_obs
+
+	parts, index = list(), list()
+	if start < n:
+		parts.append(model.fitted_values[start:min(end, n - 1) + 1])
+		index.append(model.index[start:min(end, n - 1) + 1])
+
+	if end >= n:
+		steps = end - n + 1
+		future_vals = model.forecast(steps)[max(start - n, 0):]
+		parts.append(future_vals)
+		index.append(model.future_index(steps)[max(start - n, 0):])
+
+	index = index[0].append(index[1:]) if index else pd.Index([])
+
+	return pd.DataFrame(np.concatenate(parts) if parts else np.empty((0, len(model.columns))), index=index, columns=model.columns)
@@ -0,0 +1,333 @@
+import numpy as np
+import pandas as pd
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import time
+import warnings
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pandas.tseries.offsets import DateOffset
+from sklearn.metrics import r2_score, mean_squared_error
+from urllib.parse import quote
+
+from dataset import DATA_PATH, load_dataset, data_fingerprint
+from modelling import find_best_fit, arima_fit, arima_forecast
+from batch_ar import batch_ar_fit, batch_ar_forecast
+
+warnings.filterwarnings('ignore')
+
+
+def select_tags(columns, patterns):
+
+	"""
+	Returns the columns matching any of the (shell style) glob patterns, in dataset order.
+	"""
+	return [col for col in columns if any(fnmatch.fnmatchcase(col, p) for p in patterns)]
+
+
+def forecast_tag(tag, series, horizon=12, test_size=12):
+
+	"""
+	Function to search the order of a tag, score it on its last `test_size`
+	months and forecast the `horizon` months after the data.
+
+	Parameters:
+	-----------
+	tag : str
+		Represents the name of the tag.
+
+	series : pandas.Series
+		Represents the data of the tag. Missing values are dropped.
+
+	horizon : int, optional; default:12
+		Represents the number of months forecasted.
+
+	test_size : int, optional; default:12
+		Represents the number of months held out for the scores.
+
+	Returns:
+	--------
+	res : dict
+		Represents the chosen order, the RMSE and R^2 on the held out months,
+		the forecast dates and values, the fit time and the error (if any).
+
+	"""
+	start = time.perf_counter()
+	res = dict(tag=tag, order=None, rmse=np.nan, r2=np.nan, dates=list(), forecast=list(), error=None)
+
+	try:
+		series = series.dropna()
+		test_date = series.index[-1] + DateOffset(months=-test_size)
+		train_data = series[:test_date]
+		test_data = series[test_date:].iloc[1:]
+
+		order = find_best_fit(train_data, trace=False)['order']
+		res['order'] = list(order)
+
+		model = arima_fit(train_data, order)
+		test_res = np.asarray(arima_forecast(model, len(train_data), len(train_data) + len(test_data) - 1)).reshape(-1)
+		res['rmse'] = float(np.sqrt(mean_squared_error(test_data.values, test_res)))
+		res['r2'] = float(r2_score(test_data.values, test_res))
+
+		model = arima_fit(series, order)
+		forecast_res = np.asarray(arima_forecast(model, len(series), len(series) + horizon - 1)).reshape(-1)
+		future_index = pd.date_range(series.index[-1], periods=horizon + 1, freq='MS')[1:]
+
+		res['dates'] = future_index.strftime('%Y-%m-%d').tolist()
+		res['forecast'] = forecast_res.tolist()
+
+	except Exception as e:
+		res['error'] = f'{type(e).__name__}: {e}'
+
+	res['fit_time'] = time.perf_counter() - start
+
+	return res
+
+
+def forecast_tags_ar(data, tags, horizon=12, test_size=12, lags=12):
+
+	"""
+	Function to score and forecast many tags like `forecast_tag`, with batched AR(`lags`)
+	models of the first differences fitted for all the tags at once instead of ARIMA.
+
+	Returns:
+	--------
+	results : list
+		Represents one `forecast_tag` like record per tag. The fit time
+		of a record is its share of the time of the whole batch.
+
+	"""
+	start = time.perf_counter()
+	data = data[tags]
+
+	test_date = data.index[-1] + DateOffset(months=-test_size)
+	train_data = data[:test_date]
+	test_data = data[test_date:].iloc[1:]
+
+	model = batch_ar_fit(train_data, order=(lags, 1))
+	test_res = batch_ar_forecast(model, len(train_data), len(train_data) + len(test_data) - 1)
+
+	model = batch_ar_fit(data, order=(lags, 1))
+	forecast_res = batch_ar_forecast(model, len(data), len(data) + horizon - 1)
+	dates = forecast_res.index.strftime('%Y-%m-%d').tolist()
+
+	# the scores of `forecast_tag` (RMSE and R^2 over the observed test months) for all the tags at once
+	actual, predicted = test_data.to_numpy(dtype=np.float64), test_res.to_numpy()
+	observed = ~np.isnan(actual)
+	errors = np.where(observed, actual - predicted, 0.)
+	n_observed = observed.sum(axis=0)
+
+	with np.errstate(invalid='ignore', divide='ignore'):
+		rmse = np.sqrt((errors ** 2).sum(axis=0) / n_observed)
+		means = np.where(observed, actual, 0.).sum(axis=0) / n_observed
+		r2 = 1 - (errors ** 2).sum(axis=0) / (np.where(observed, actual - means, 0.) ** 2).sum(axis=0)
+
+	failed = np.isnan(model.params).any(axis=1) | np.isnan(forecast_res.to_numpy()).any(axis=0) | np.isnan(np.where(observed, predicted, 0.)).any(axis=0)
+	forecast_vals = forecast_res.to_numpy().T.tolist()
+
+	fit_time = (time.perf_counter() - start) / max(len(tags), 1)
+	results = list()
+
+	for i, tag in enumerate(tags):
+		res = dict(tag=tag, order=[lags, 1, 0], rmse=np.nan, r2=np.nan, dates=list(), forecast=list(), error=None, fit_time=fit_time)
+
+		if failed[i]:
+			res['error'] = 'not enough data to fit or forecast'
+
+		else:
+			res.update(rmse=float(rmse[i]), r2=float(r2[i]), dates=dates, forecast=forecast_vals[i])
+
+		results.append(res)
+
+	return results
+
+
+class Checkpoint:
+
+	"""
+	One JSON file per finished tag, in a directory specific to the
+	run configuration, so an interrupted run resumes where it stopped.
+	Only the successful records are saved, the failed tags are retried.
+
+	Parameters:
+	-----------
+	root : str
+		Represents the directory of the checkpoints.
+
+	config : dict
+		Represents the configuration of the run (JSON serializable).
+
+	"""
+	def __init__(self, root, config):
+
+		digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:16]
+		self.path = os.path.join(root, digest)
+		os.makedirs(self.path, exist_ok=True)
+
+		with open(os.path.join(self.path, 'config.json'), 'w') as f:
+			json.dump(config, f, indent=1)
+
+	def _file(self, tag):
+		return os.path.join(self.path, f'{quote(tag, safe="")}.json')
+
+	def done(self, tag):
+		return os.path.exists(self._file(tag))
+
+	def save(self, res):
+		if res['error'] is not None:
+			return
+
+		tmp_path = f'{self._file(res["tag"])}.tmp'
+		with open(tmp_path, 'w') as f:
+			json.dump(res, f)
+
+		os.replace(tmp_path, self._file(res['tag']))
+
+	def load(self, tag):
+		with open(self._file(tag)) as f:
+			return json.load(f)
+
+
+def to_frame(results):
+
+	"""
+	Function to flatten the results of `forecast_tag` into one row per tag and
+	forecast date, with the order, the scores and the error of the tag repeated.
+	"""
+	rows = list()
+
+	for res in results:
+		info = dict(tag=res['tag'], order=str(tuple(res['order'])) if res['order'] else None,
+			rmse=res['rmse'], r2=res['r2'], fit_time=res['fit_time'], error=res['error'])
+
+		if not res['dates']:
+			rows.append(dict(info, date=pd.NaT, forecast=np.nan))
+
+		for date, value in zip(res['dates'], res['forecast']):
+			rows.append(dict(info, date=pd.Timestamp(date), forecast=value))
+
+	return pd.DataFrame.from_records(rows, columns=['tag', 'date', 'forecast', 'order', 'rmse', 'r2', 'fit_time', 'error'])
+
+
+def run(data, tags, output, horizon=12, test_size=12, n_jobs=None, checkpoint_dir='./CHECKPOINTS', model='arima', lags=12):
+
+	"""
+	Function to forecast many tags on a process pool, checkpointing
+	every successful tag, and write all the results to a columnar file.
+	A worker which crashes only fails its tag.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	tags : list
+		Represents the tags to be forecasted.
+
+	output : str
+		Represents the output file, Parquet (`.parquet`) or Feather (any other extension).
+
+	horizon : int, optional; default:12
+		Represents the number of months forecasted.
+
+	test_size : int, optional; default:12
+		Represents the number of months held out for the scores.
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None.
+
+	checkpoint_dir : str, optional; default:'./CHECKPOINTS'
+		Represents the directory of the checkpoints.
+
+	model : str, optional; default:'arima'
+		Represents the model family. Possible values `arima` (searched per tag on the
+		process pool) or `ar` (batched AR models of all the tags, see `forecast_tags_ar`)
+
+	lags : int, optional; default:12
+		Represents the number of lags of the `ar` models.
+
+	Returns:
+	--------
+	res : pandas.DataFrame
+		Represents the table written to the output file, see `to_frame`.
+
+	"""
+	config = dict(data=data_fingerprint(data), horizon=horizon, test_size=test_size)
+	if model == 'ar':
+		config.update(model=model, lags=lags)
+
+	checkpoint = Checkpoint(checkpoint_dir, config)
+
+	todo = [tag for tag in tags if not checkpoint.done(tag)]
+	print(f'{len(tags) - len(todo)} of {len(tags)} tags already done, checkpoints in {checkpoint.path}')
+
+	# the failed records are not checkpointed, so that a resumed run retries them
+	failed = dict()
+
+	if model == 'ar' and todo:
+		for res in forecast_tags_ar(data, todo, horizon, test_size, lags):
+			checkpoint.save(res)
+
+			if res['error'] is not None:
+				failed[res['tag']] = res
+
+		print(f'{len(todo)} tags forecasted with AR({lags}) models of the differences')
+		todo = list()
+
+	with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+
+		futures = {executor.submit(forecast_tag, tag, data[tag], horizon, test_size) : tag for tag in todo}
+
+		for i, future in enumerate(as_completed(futures)):
+			try:
+				res = future.result()
+
+			except Exception as e:
+				res = dict(tag=futures[future], order=None, rmse=np.nan, r2=np.nan, dates=list(), forecast=list(),
+					error=f'{type(e).__name__}: {e}', fit_time=np.nan)
+
+			checkpoint.save(res)
+
+			if res['error'] is not None:
+				failed[res['tag']] = res
+
+			status = res['error'] or f"order {tuple(res['order'])}, RMSE {res['rmse']:.2f}"
+			print(f"[{len(tags) - len(todo) + i + 1}/{len(tags)}] {res['tag']}: {status}")
+
+	res = to_frame([failed[tag] if tag in failed else checkpoint.load(tag) for tag in tags])
+
+	os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+	if output.endswith('.parquet'):
+		res.to_parquet(output, index=False)
+
+	else:
+		res.to_feather(output)
+
+	return res
+
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description='Forecast every tag of the dataset with ARIMA')
+	parser.add_argument('--tags', default='*', help='comma separated glob patterns of the tags to forecast')
+	parser.add_argument('--horizon', type=int, default=12, help='number of months forecasted')
+	parser.add_argument('--test-size', type=int, default=12, help='number of months held out for the scores')
+	parser.add_argument('--jobs', type=int, default=None, help='number of worker processes')
+	parser.add_argument('--data', default=DATA_PATH, help='path of the dataset')
+	parser.add_argument('--output', default='./FORECASTS/forecasts.parquet', help='output file (.parquet or .feather)')
+	parser.add_argument('--model', choices=['arima', 'ar'], default='arima', help='model family, ARIMA per tag or batched AR')
+	parser.add_argument('--lags', type=int, default=12, help='number of lags of the batched AR models')
+	parser.add_argument('--checkpoints', default='./CHECKPOINTS', help='directory of the checkpoints')
+	args = parser.parse_args()
+
+	df = load_dataset(args.data)
+	tags = select_tags(df.columns, args.tags.split(','))
+
+	if not tags:
+		parser.error(f'no tag matches {args.tags!r}')
+
+	run(df, tags, args.output, horizon=args.horizon, test_size=args.test_size, n_jobs=args.jobs, checkpoint_dir=args.checkpoints,
+		model=args.model, lags=args.lags)
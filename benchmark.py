@@ -0,0 +1,319 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+
+import utils
+import modelling
+import batch_ar
+import similarity
+import distributions
+
+from dataset import DATA_PATH, load_dataset
+
+warnings.filterwarnings('ignore')
+
+
+def synthetic_dataset(n_rows, n_tags, freq='MS', seed=0):
+
+	"""
+	Function to generate a dataset shaped like the bundled one: positive
+	question counts with a trend, a yearly seasonality and noise.
+
+	Parameters:
+	-----------
+	n_rows : int
+		Represents the number of periods.
+
+	n_tags : int
+		Represents the number of tags.
+
+	freq : str, optional; default:'MS'
+		Represents the frequency of the periods.
+
+	seed : int, optional; default:0
+		Represents the seed of the random generator.
+
+	Returns:
+	--------
+	df : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	"""
+	rng = np.random.default_rng(seed)
+	index = pd.date_range('2009-01-01', periods=n_rows, freq=freq, name='month')
+
+	level = rng.uniform(10, 1000, n_tags)
+	trend = rng.normal(0, 0.01, n_tags)
+	steps = np.arange(n_rows)[:, None]
+	seasonal = 1 + 0.1 * np.sin(2 * np.pi * steps / 12 + rng.uniform(0, 2 * np.pi, n_tags))
+
+	values = level * np.exp(trend * steps + rng.normal(0, 0.05, (n_rows, n_tags)).cumsum(axis=0)) * seasonal
+
+	return pd.DataFrame(np.round(values), index=index, columns=[f'tag_{i}' for i in range(n_tags)])
+
+
+def _cases(df, model_tags):
+
+	"""
+	Returns the benchmark cases of a dataset as (name, function, number of values processed).
+	"""
+	cols = df.columns.tolist()
+	model_cols = cols[:model_tags]
+
+	def moving_average():
+		for col in cols:
+			utils.apply_moving_average_filter(df[col], win_len=5)
+
+	def interactive_plot():
+		utils._figure_cache.clear()
+		utils.plot_interactive(df, cols[:10])
+
+	def adfuller():
+		for col in cols:
+			utils.adfuller_test(df[col].dropna())
+
+	def kpss():
+		for col in cols:
+			utils.kpss_test(df[col].dropna())
+
+	def best_fit():
+		for col in model_cols:
+			modelling.find_best_fit(df[col].dropna(), trace=False)
+
+	def fit():
+		for col in model_cols:
+			modelling.arima_fit(df[col].dropna(), (1, 1, 1))
+
+	fitted = dict()
+
+	def forecast():
+		for col in model_cols:
+			if col not in fitted:
+				fitted[col] = modelling.arima_fit(df[col].dropna(), (1, 1, 1))
+
+			n = len(df[col].dropna())
+			modelling.arima_forecast(fitted[col], n, n + 11)
+
+	def ar_fit():
+		batch_ar.batch_ar_fit(df, order=(12, 1))
+
+	ar_fitted = dict()
+
+	def ar_forecast():
+		if 'model' not in ar_fitted:
+			ar_fitted['model'] = batch_ar.batch_ar_fit(df, order=(12, 1))
+
+		batch_ar.batch_ar_forecast(ar_fitted['model'], len(df), len(df) + 11)
+
+	def similar_correlation():
+		similarity.SimilarityIndex(df).query(cols[0], k=10, method='correlation')
+
+	def similar_dtw():
+		similarity.SimilarityIndex(df).query(cols[0], k=10, method='dtw')
+
+	def kde():
+		distributions.kde_matrix(df.to_numpy())
+
+	n_rows = len(df)
+
+	return [
+		('apply_moving_average_filter', moving_average, n_rows * len(cols)),
+		('plot_interactive', interactive_plot, n_rows * min(len(cols), 10)),
+		('adfuller_test', adfuller, n_rows * len(cols)),
+		('kpss_test', kpss, n_rows * len(cols)),
+		('find_best_fit', best_fit, n_rows * len(model_cols)),
+		('arima_fit', fit, n_rows * len(model_cols)),
+		('arima_forecast', forecast, 12 * len(model_cols)),
+		('batch_ar_fit', ar_fit, n_rows * len(cols)),
+		('batch_ar_forecast', ar_forecast, 12 * len(cols)),
+		('similar_tags_correlation', similar_correlation, n_rows * len(cols)),
+		('similar_tags_dtw', similar_dtw, n_rows * len(cols)),
+		('kde_matrix', kde, n_rows * len(cols)),
+	]
+
+
+def measure(func, repeat=3):
+
+	"""
+	Function to measure a benchmark case.
+
+	Parameters:
+	-----------
+	func : callable
+		Represents the benchmark case.
+
+	repeat : int, optional; default:3
+		Represents the number of timed runs, the fastest is kept.
+
+	Returns:
+	--------
+	res : dict
+		Represents the wall time (in seconds) and the peak of the memory allocated
+		by Python (in bytes, measured on a separate run).
+
+	"""
+	func()
+
+	times = list()
+	for _ in range(repeat):
+		start = time.perf_counter()
+		func()
+		times.append(time.perf_counter() - start)
+
+	tracemalloc.start()
+	func()
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	return dict(wall_time=min(times), peak_memory=peak)
+
+
+def run(datasets, repeat=3, model_tags=3, only=None):
+
+	"""
+	Function to run every benchmark case on every dataset.
+
+	Parameters:
+	-----------
+	datasets : dict
+		Represents the datasets by name.
+
+	repeat : int, optional; default:3
+		Represents the number of timed runs per case.
+
+	model_tags : int, optional; default:3
+		Represents the number of tags on which the ARIMA cases run.
+
+	only : list, optional; default:None
+		Represents the names of the cases to run, all when None.
+
+	Returns:
+	--------
+	results : list
+		Represents one record per case and dataset. The `error` of the failed
+		cases is set, and their measures are None.
+
+	"""
+	results = list()
+
+	for name, df in datasets.items():
+		for case, func, n_values in _cases(df, model_tags):
+
+			if only and case not in only:
+				continue
+
+			# a failing case (e.g. a missing optional dependency) is recorded without stopping the run
+			try:
+				res = measure(func, repeat=repeat)
+
+			except Exception as e:
+				res = dict(case=case, dataset=name, rows=df.shape[0], tags=df.shape[1], wall_time=None,
+					peak_memory=None, throughput=None, error=f"{type(e).__name__}: {' '.join(str(e).split())}")
+				results.append(res)
+
+				print(f"{case:<28} {name:<18} FAILED {res['error']}")
+				continue
+
+			res.update(case=case, dataset=name, rows=df.shape[0], tags=df.shape[1],
+				throughput=n_values / res['wall_time'] if res['wall_time'] > 0 else np.inf, error=None)
+			results.append(res)
+
+			print(f"{case:<28} {name:<18} {res['wall_time'] * 1e3:10.2f} ms {res['peak_memory'] / 1024 ** 2:8.2f} MiB {res['throughput']:12.0f} values/s")
+
+	return results
+
+
+def compare(results, baseline, threshold=1.25):
+
+	"""
+	Function to flag the cases slower than the baseline, or failing
+	when they passed in the baseline.
+
+	Parameters:
+	-----------
+	results : list
+		Represents the records returned by `run`.
+
+	baseline : list
+		Represents the records of an earlier run.
+
+	threshold : float, optional; default:1.25
+		Represents the ratio of wall times (or peak memories) above which a case is a regression.
+
+	Returns:
+	--------
+	regressions : list
+		Represents the regressed cases, with their ratios to the baseline. A case
+		failing now is reported with the `error` metric and its error as `current`.
+
+	"""
+	baseline = {(r['case'], r['dataset']) : r for r in baseline}
+	regressions = list()
+
+	for r in results:
+		base = baseline.get((r['case'], r['dataset']))
+		if base is None or base.get('error'):
+			continue
+
+		if r.get('error'):
+			regressions.append(dict(case=r['case'], dataset=r['dataset'], metric='error',
+				baseline=None, current=r['error'], ratio=None))
+			continue
+
+		for metric in ('wall_time', 'peak_memory'):
+			if base[metric] > 0 and r[metric] / base[metric] > threshold:
+				regressions.append(dict(case=r['case'], dataset=r['dataset'], metric=metric,
+					baseline=base[metric], current=r[metric], ratio=r[metric] / base[metric]))
+
+	return regressions
+
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description='Benchmark the hot paths of utils and modelling')
+	parser.add_argument('--rows', default='132,1320', help='comma separated row counts of the synthetic datasets')
+	parser.add_argument('--tags', default='80,800', help='comma separated tag counts of the synthetic datasets')
+	parser.add_argument('--repeat', type=int, default=3, help='number of timed runs per case')
+	parser.add_argument('--model-tags', type=int, default=3, help='number of tags used by the ARIMA cases')
+	parser.add_argument('--only', default=None, help='comma separated names of the cases to run')
+	parser.add_argument('--data', default=DATA_PATH, help='path of the bundled dataset')
+	parser.add_argument('--output', default='./BENCHMARKS/results.json', help='file to write the results to')
+	parser.add_argument('--baseline', default=None, help='results file to compare against')
+	parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio flagged as a regression')
+	args = parser.parse_args()
+
+	datasets = dict()
+	if os.path.exists(args.data):
+		datasets['bundled'] = load_dataset(args.data)
+
+	for n_rows in [int(r) for r in args.rows.split(',') if r]:
+		for n_tags in [int(t) for t in args.tags.split(',') if t]:
+			datasets[f'synthetic_{n_rows}x{n_tags}'] = synthetic_dataset(n_rows, n_tags)
+
+	only = args.only.split(',') if args.only else None
+	results = run(datasets, repeat=args.repeat, model_tags=args.model_tags, only=only)
+
+	os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+	with open(args.output, 'w') as f:
+		json.dump(dict(python=sys.version.split()[0], platform=platform.platform(), numpy=np.__version__,
+			pandas=pd.__version__, created=time.strftime('%Y-%m-%dT%H:%M:%S'), results=results), f, indent=1)
+
+	if args.baseline is not None:
+		with open(args.baseline) as f:
+			regressions = compare(results, json.load(f)['results'], threshold=args.threshold)
+
+		for r in regressions:
+			if r['metric'] == 'error':
+				print(f"REGRESSION {r['case']} on {r['dataset']}: passed in the baseline, fails now ({r['current']})")
+				continue
+
+			print(f"REGRESSION {r['case']} on {r['dataset']}: {r['metric']} x{r['ratio']:.2f} ({r['baseline']:.4g} -> {r['current']:.4g})")
+
+		sys.exit(1 if regressions else 0)
@@ -0,0 +1,215 @@
+import numpy as np
+import pandas as pd
+
+
+CHANGEPOINT, ANOMALY = 'changepoint', 'anomaly'
+
+# `score` is the CUSUM value of a changepoint or the scaled residual of an anomaly,
+# `change` the relative difference between the count and its expected value
+ALERT_COLUMNS = ['month', 'tag', 'kind', 'direction', 'score', 'change']
+
+
+class ChangepointDetector:
+
+	"""
+	Online detection of the shifts (changepoints) and the outliers (anomalies)
+	of the question counts of every tag, one monthly row at a time.
+
+	The log counts of every tag are tracked by an additive Holt-Winters model
+	(level, slope and one seasonal term per month of the period). The residual
+	of every new row, scaled by a running estimate of its deviation, feeds a
+	two-sided CUSUM: a changepoint is flagged when the cumulated drift exceeds
+	`threshold`, after which the level is reset to the new regime. A single
+	residual beyond `anomaly_z` deviations is flagged as an anomaly. The state
+	of all the tags is kept in arrays, so that a row costs a few vectorized
+	operations whatever its number of tags.
+
+	Parameters:
+	-----------
+	columns : pandas.Index
+		Represents the tags.
+
+	period : int, optional; default:12
+		Represents the period of the seasonality.
+
+	alpha, beta, gamma : float, optional; default:0.1, 0.05, 0.1
+		Represents the smoothing factors of the level, the slope and the seasonal terms.
+		The level is slow so that it does not absorb a shift before the CUSUM flags it.
+
+	scale_alpha : float, optional; default:0.05
+		Represents the smoothing factor of the residual variance.
+
+	drift : float, optional; default:0.5
+		Represents the deviation (in residual deviations) tolerated per row by the CUSUM.
+
+	threshold : float, optional; default:10.
+		Represents the CUSUM value flagged as a changepoint.
+
+	anomaly_z : float, optional; default:4.
+		Represents the scaled residual flagged as an anomaly. The residuals fed to the
+		CUSUM and to the deviation estimate are clipped to it, so that an anomaly
+		alone does not make a changepoint.
+
+	warmup : int, optional; default:24
+		Represents the number of observed rows of a tag before it can be flagged.
+
+	"""
+	def __init__(self, columns, period=12, alpha=0.1, beta=0.05, gamma=0.1, scale_alpha=0.05, drift=0.5, threshold=10., anomaly_z=4., warmup=24):
+
+		self.columns = pd.Index(columns)
+		self.period = period
+		self.alpha, self.beta, self.gamma = alpha, beta, gamma
+		self.scale_alpha = scale_alpha
+		self.drift = drift
+		self.threshold = threshold
+		self.anomaly_z = anomaly_z
+		self.warmup = warmup
+
+		k = len(self.columns)
+		self.level = np.zeros(k)
+		self.slope = np.zeros(k)
+		self.seasonal = np.zeros((period, k))
+		self.var = np.full(k, np.nan)
+		self.pos = np.zeros(k)
+		self.neg = np.zeros(k)
+		self.count = np.zeros(k, dtype=np.int64)
+
+		self.n_rows = 0
+		self.last_month = None
+		self.alerts = list()
+
+	def update(self, month, values):
+
+		"""
+		Function to process the row of a month.
+
+		Parameters:
+		-----------
+		month : datetime-like
+			Represents the month of the row, after the last one processed.
+
+		values : array-like
+			Represents the question counts of every tag, NaN when missing.
+
+		Returns:
+		--------
+		alerts : list
+			Represents the alerts raised by the row, as dicts of `ALERT_COLUMNS`.
+
+		"""
+		month = pd.Timestamp(month)
+		y = np.log1p(np.clip(np.asarray(values, dtype=np.float64), 0, None))
+
+		observed = ~np.isnan(y)
+		first = observed & (self.count == 0)
+		self.level[first] = y[first]
+
+		# the seasonal term of the calendar month, so that a gap in the months does not shift them
+		m = month.month % self.period
+		season = self.seasonal[m]
+
+		resid = np.where(observed, y - (self.level + self.slope + season), 0.)
+		ready = observed & (self.count >= self.warmup) & (self.var > 0)
+
+		with np.errstate(invalid='ignore', divide='ignore'):
+			z = np.where(ready, resid / np.sqrt(self.var), 0.)
+
+		clipped = np.clip(z, -self.anomaly_z, self.anomaly_z)
+		self.pos = np.where(ready, np.maximum(0., self.pos + clipped - self.drift), self.pos)
+		self.neg = np.where(ready, np.maximum(0., self.neg - clipped - self.drift), self.neg)
+
+		anomaly = ready & (np.abs(z) > self.anomaly_z)
+		changed = (self.pos > self.threshold) | (self.neg > self.threshold)
+
+		alerts = list()
+		for i in np.flatnonzero(anomaly | changed):
+			kind = CHANGEPOINT if changed[i] else ANOMALY
+			score = max(self.pos[i], self.neg[i]) if changed[i] else abs(z[i])
+			alerts.append(dict(month=month, tag=self.columns[i], kind=kind, direction='increase' if z[i] > 0 else 'decrease',
+				score=float(score), change=float(np.expm1(resid[i]))))
+
+		# the components learn from the observed values only, the outliers clipped like in the CUSUM
+		update = observed & ~first
+		y_clipped = np.where(ready, y - resid + clipped * np.sqrt(np.where(ready, self.var, 0.)), y)
+
+		level = np.where(update, self.alpha * (y_clipped - season) + (1 - self.alpha) * (self.level + self.slope), self.level)
+		self.slope = np.where(update, self.beta * (level - self.level) + (1 - self.beta) * self.slope, self.slope)
+		self.seasonal[m] = np.where(update, self.gamma * (y_clipped - level) + (1 - self.gamma) * season, season)
+		self.level = level
+
+		sq_resid = np.where(ready, clipped ** 2 * self.var, resid ** 2)
+		self.var = np.where(update & np.isnan(self.var), sq_resid, self.var)
+		self.var = np.where(update, self.scale_alpha * sq_resid + (1 - self.scale_alpha) * self.var, self.var)
+
+		# a changepoint starts a new regime: the level jumps to the current value and the CUSUM restarts
+		self.level[changed] = y[changed] - self.seasonal[m, changed]
+		self.pos[changed], self.neg[changed] = 0., 0.
+
+		self.count += observed
+		self.n_rows += 1
+		self.last_month = month
+		self.alerts.extend(alerts)
+
+		return alerts
+
+	def update_rows(self, rows):
+
+		"""
+		Function to process new rows, one tag per column (in the order of `columns`), sorted by month.
+
+		Returns:
+		--------
+		alerts : list
+			Represents the alerts raised by the rows.
+
+		"""
+		values = rows[self.columns].to_numpy(dtype=np.float64)
+
+		alerts = list()
+		for month, row in zip(rows.index, values):
+			if self.last_month is not None and month <= self.last_month:
+				continue
+
+			alerts.extend(self.update(month, row))
+
+		return alerts
+
+	def alerts_frame(self, kinds=None, since=None):
+
+		"""
+		Returns the alerts raised so far (of the given kinds, from the month `since`), latest first.
+		"""
+		res = pd.DataFrame(self.alerts, columns=ALERT_COLUMNS)
+
+		if kinds is not None:
+			res = res[res['kind'].isin(kinds)]
+
+		if since is not None:
+			res = res[res['month'] >= pd.Timestamp(since)]
+
+		return res.sort_values(['month', 'score'], ascending=False).reset_index(drop=True)
+
+
+def detect_changepoints(data, **kwargs):
+
+	"""
+	Function to run a `ChangepointDetector` over a dataset.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column, sorted by month.
+
+	**kwargs : dict
+		Represents the parameters of the detector.
+
+	Returns:
+	--------
+	detector : ChangepointDetector
+		Represents the detector, with the alerts of the whole dataset, ready for the next rows.
+
+	"""
+	detector = ChangepointDetector(data.columns, **kwargs)
+	detector.update_rows(data)
+
+	return detector
@@ -0,0 +1,240 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+
+
+COMPACT_SUFFIX = '.json'
+FORMAT_VERSION = 1
+
+
+class CompactARIMA:
+
+	"""
+	The part of a fitted ARIMA model which forecasting needs: the order, the
+	parameters, the last levels of the series (enough to rebuild its differences)
+	and the last residuals. It is stored as a small JSON file and loaded without
+	statsmodels, and its `predict` mirrors the one of the ARIMA results, so that
+	`modelling.arima_forecast` accepts it.
+
+	Parameters:
+	-----------
+	order : tuple
+		Represents the `(p, d, q)` order of the model.
+
+	const : float
+		Represents the mean of the `d`-th differences.
+
+	ar, ma : list
+		Represents the AR and MA coefficients.
+
+	levels : list
+		Represents the last observations of the series.
+
+	resid : list
+		Represents the residuals of the last observations.
+
+	n_obs : int
+		Represents the number of observations of the series.
+
+	last_date : str, optional; default:None
+		Represents the date of the last observation, when the series is indexed by dates.
+
+	freq : str, optional; default:None
+		Represents the frequency of the dates.
+
+	"""
+	def __init__(self, order, const, ar, ma, levels, resid, n_obs, last_date=None, freq=None):
+
+		self.order = tuple(int(o) for o in order)
+		self.const = float(const)
+		self.ar = np.asarray(ar, dtype=np.float64)
+		self.ma = np.asarray(ma, dtype=np.float64)
+		self.levels = np.asarray(levels, dtype=np.float64)
+		self.resid = np.asarray(resid, dtype=np.float64)
+		self.n_obs = int(n_obs)
+		self.last_date = pd.Timestamp(last_date) if last_date is not None else None
+		self.freq = freq
+
+	@classmethod
+	def from_results(cls, model_fit, n_tail=1):
+
+		"""
+		Function to extract the compact model of fitted ARIMA results, from
+		`statsmodels.tsa.arima_model` as well as `statsmodels.tsa.arima.model`.
+
+		Parameters:
+		-----------
+		model_fit : statsmodels ARIMAResults
+			Represents the fitted ARIMA model.
+
+		n_tail : int, optional; default:1
+			Represents the number of last observations which can be predicted in-sample.
+
+		"""
+		model = model_fit.model
+		p, q = len(model_fit.arparams), len(model_fit.maparams)
+		d = int(getattr(model, 'k_diff', 0))
+
+		params = model_fit.params
+		if hasattr(params, 'index'):
+			names = list(params.index)
+
+		else:
+			names = list(getattr(model, 'param_names', None) or model.exog_names)
+
+		const = np.asarray(params)[names.index('const')] if 'const' in names else 0.
+
+		levels = np.asarray(model.data.orig_endog, dtype=np.float64).reshape(-1)
+		resid = np.asarray(model_fit.resid, dtype=np.float64).reshape(-1)
+		n_keep = max(p + d, n_tail + d, 1)
+
+		labels = model.data.row_labels
+		last_date, freq = None, None
+		if isinstance(labels, pd.DatetimeIndex):
+			last_date = labels[-1]
+			freq = labels.freqstr or (pd.infer_freq(labels[-3:]) if len(labels) >= 3 else None)
+
+		return cls((p, d, q), const, model_fit.arparams, model_fit.maparams, levels[-n_keep:],
+			resid[-max(q, n_tail, 1):], len(levels), last_date, freq)
+
+	def to_dict(self):
+		return dict(format=FORMAT_VERSION, order=list(self.order), const=self.const, ar=self.ar.tolist(), ma=self.ma.tolist(),
+			levels=self.levels.tolist(), resid=self.resid.tolist(), n_obs=self.n_obs,
+			last_date=self.last_date.strftime('%Y-%m-%d') if self.last_date is not None else None, freq=self.freq)
+
+	@classmethod
+	def from_dict(cls, res):
+		if res.get('format') != FORMAT_VERSION:
+			raise ValueError(f"Unsupported compact ARIMA format {res.get('format')!r}")
+
+		return cls(res['order'], res['const'], res['ar'], res['ma'], res['levels'], res['resid'],
+			res['n_obs'], res['last_date'], res['freq'])
+
+	def save(self, filename):
+		tmp_path = f'{filename}.tmp'
+		with open(tmp_path, 'w') as f:
+			json.dump(self.to_dict(), f)
+
+		os.replace(tmp_path, filename)
+
+	@classmethod
+	def load(cls, filename):
+		with open(filename) as f:
+			return cls.from_dict(json.load(f))
+
+	def append(self, data):
+
+		"""
+		Function to run the model on data extended past its observations, with the
+		same parameters: the new observations and their one step ahead residuals
+		are appended, like `apply` of the state-space ARIMA results.
+
+		Parameters:
+		-----------
+		data : pandas.Series
+			Represents the data of the model, extended with the new observations.
+
+		Returns:
+		--------
+		model : CompactARIMA
+			Represents the model updated with the new observations.
+
+		"""
+		if self.last_date is not None and isinstance(data.index, pd.DatetimeIndex):
+			new_data = data[data.index > self.last_date]
+
+		else:
+			new_data = data.iloc[self.n_obs:]
+
+		res = CompactARIMA(self.order, self.const, self.ar, self.ma, self.levels, self.resid, self.n_obs, self.last_date, self.freq)
+
+		for value in np.asarray(new_data, dtype=np.float64).reshape(-1):
+			residual = value - res.forecast(1)[0]
+			res.levels = np.r_[res.levels, value][-len(self.levels):]
+			res.resid = np.r_[res.resid, residual][-len(self.resid):]
+			res.n_obs += 1
+
+		if self.last_date is not None and len(new_data):
+			res.last_date = pd.Timestamp(new_data.index[-1])
+
+		return res
+
+	def _position(self, key):
+		if isinstance(key, (int, np.integer)):
+			return int(key)
+
+		if self.last_date is None:
+			raise KeyError(f'The model has no dates, {key!r} must be a position')
+
+		key = pd.Timestamp(key)
+		if key > self.last_date:
+			return self.n_obs - 2 + len(pd.date_range(self.last_date, key, freq=self.freq))
+
+		return self.n_obs - len(pd.date_range(key, self.last_date, freq=self.freq))
+
+	def forecast(self, steps):
+
+		"""
+		Function to forecast the levels of the `steps` periods following the data.
+		"""
+		p, d, q = self.order
+
+		diffs = [self.levels]
+		for _ in range(d):
+			diffs.append(np.diff(diffs[-1]))
+
+		# the ARMA recursion runs on the deviations of the differences from their mean
+		dev = list(diffs[d][len(diffs[d]) - p:] - self.const) if p else list()
+		errors = list(self.resid[len(self.resid) - q:]) if q else list()
+		res = np.empty(steps)
+
+		for h in range(steps):
+			ar_part = np.dot(self.ar, dev[::-1][:p]) if p else 0.
+			ma_part = np.dot(self.ma, errors[::-1][:q]) if q else 0.
+			res[h] = ar_part + ma_part
+
+			dev.append(res[h])
+			errors.append(0.)
+
+		res = res + self.const
+		for i in reversed(range(d)):
+			res = diffs[i][-1] + np.cumsum(res)
+
+		return res
+
+	def predict(self, start, end, typ='levels'):
+
+		"""
+		Function to predict the levels from `start` to `end` (both included), as
+		positions or dates. The in-sample predictions are limited to the
+		last observations kept by `from_results`.
+
+		Returns:
+		--------
+		predictions : pandas.Series or numpy.ndarray
+			Represents the predicted levels, indexed by date when the model has dates.
+
+		"""
+		if typ != 'levels':
+			raise ValueError("Only typ='levels' predictions are supported")
+
+		start, end = self._position(start), self._position(end)
+		n_in_sample = min(len(self.resid), len(self.levels))
+
+		if start < self.n_obs - n_in_sample:
+			raise ValueError(f'Only the last {n_in_sample} observations can be predicted in-sample')
+
+		# in-sample, the one step ahead prediction of a level is the level minus its residual
+		in_sample = (self.levels[-n_in_sample:] - self.resid[-n_in_sample:])[start - self.n_obs + n_in_sample:end - self.n_obs + n_in_sample + 1]
+
+		steps = end - self.n_obs + 1
+		out_sample = self.forecast(steps)[max(start - self.n_obs, 0):] if steps > 0 else np.empty(0)
+		res = np.concatenate([in_sample, out_sample])
+
+		if self.last_date is None:
+			return res
+
+		start_date = self.last_date + (start - self.n_obs + 1) * pd.tseries.frequencies.to_offset(self.freq)
+
+		return pd.Series(res, index=pd.date_range(start_date, periods=len(res), freq=self.freq), name='predicted_mean')
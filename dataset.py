@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import hashlib
+import json
+import os
+import threading
+
+try:
+	import pyarrow.feather as feather
+
+except ImportError:
+	feather = None
+
+from tracing import traced
+
+
+DATA_PATH = './DATA/archive/MLTollsStackOverflow.csv'
+DATE_FORMAT = '%y-%b'
+
+
+def data_fingerprint(data):
+
+	"""
+	Function to compute a stable hash of a pandas object,
+	including its index.
+
+	Parameters:
+	-----------
+	data : pandas.Series or pandas.DataFrame
+		Represents the data to be hashed.
+
+	Returns:
+	--------
+	digest : str
+		Represents the hex digest of the data.
+
+	"""
+	hashes = pd.util.hash_pandas_object(data, index=True).values
+	return hashlib.sha1(hashes.tobytes()).hexdigest()
+
+
+@traced()
+def read_dataset(path=DATA_PATH):
+
+	"""
+	Function to read the dataset, indexed and sorted by month.
+
+	Parameters:
+	-----------
+	path : str, optional; default:DATA_PATH
+		Represents the path of the CSV file.
+
+	Returns:
+	--------
+	df : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	"""
+	df = pd.read_csv(path)
+	df['month'] = pd.to_datetime(df['month'], format=DATE_FORMAT)
+	df = df.set_index('month').sort_index()
+
+	return df
+
+
+def compact_floats(df):
+
+	"""
+	Function to store the columns as float32 when that loses no value
+	(question counts below 2^24 always fit).
+	"""
+	values = df.to_numpy(dtype=np.float64)
+	compact = values.astype(np.float32)
+
+	if np.array_equal(compact.astype(np.float64), values, equal_nan=True):
+		return pd.DataFrame(compact, index=df.index, columns=df.columns)
+
+	return df.astype(np.float64)
+
+
+def source_signature(path, use_hash=False):
+
+	"""
+	Function to identify a version of the source file, from its size and
+	modification time, or from the hash of its content when `use_hash` is True.
+	"""
+	stat = os.stat(path)
+	signature = dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+	if use_hash:
+		digest = hashlib.sha1()
+		with open(path, 'rb') as f:
+			for block in iter(lambda: f.read(1 << 20), b''):
+				digest.update(block)
+
+		signature = dict(size=stat.st_size, sha1=digest.hexdigest())
+
+	return signature
+
+
+def _cache_path(path):
+	return f'{os.path.splitext(path)[0]}.feather' if feather is not None else f'{os.path.splitext(path)[0]}.pkl'
+
+
+def _write_cache(df, cache_path, signature):
+	out = df.reset_index()
+	tmp_path = f'{cache_path}.tmp'
+
+	if feather is not None:
+		feather.write_feather(out, tmp_path)
+
+	else:
+		out.to_pickle(tmp_path)
+
+	os.replace(tmp_path, cache_path)
+
+	with open(f'{cache_path}.json', 'w') as f:
+		json.dump(signature, f)
+
+
+def _read_cache(cache_path, signature):
+	try:
+		with open(f'{cache_path}.json') as f:
+			if json.load(f) != signature:
+				return None
+
+		df = feather.read_feather(cache_path) if feather is not None else pd.read_pickle(cache_path)
+
+	except (OSError, ValueError):
+		return None
+
+	return df.set_index(df.columns[0])
+
+
+_datasets = dict()
+_datasets_lock = threading.Lock()
+
+
+@traced()
+def load_dataset(path=DATA_PATH, use_hash=False):
+
+	"""
+	Function to load the dataset, parsing the CSV file only once.
+
+	The parsed dataset is kept in memory for the whole process (all the Streamlit
+	sessions) and in a columnar file next to the CSV (Feather when `pyarrow` is
+	installed, pickle otherwise). Both are invalidated when the CSV file changes.
+
+	Parameters:
+	-----------
+	path : str, optional; default:DATA_PATH
+		Represents the path of the CSV file.
+
+	use_hash : bool, optional; default:False
+		Represents whether to detect the changes of the CSV file by the hash of its
+		content instead of its size and modification time.
+
+	Returns:
+	--------
+	df : pandas.DataFrame
+		Represents the dataset, one tag per column, indexed and sorted by month.
+		It is shared between the callers and must not be modified in place.
+
+	"""
+	signature = source_signature(path, use_hash=use_hash)
+	key = (os.path.abspath(path), use_hash)
+
+	with _datasets_lock:
+		if key in _datasets and _datasets[key][0] == signature:
+			return _datasets[key][1]
+
+		cache_path = _cache_path(path)
+		df = _read_cache(cache_path, signature)
+
+		if df is None:
+			df = compact_floats(read_dataset(path))
+			try:
+				_write_cache(df, cache_path, signature)
+
+			except OSError:
+				pass
+
+		_datasets[key] = (signature, df)
+
+	return df
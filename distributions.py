@@ -0,0 +1,265 @@
+import numpy as np
+import hashlib
+import threading
+import warnings
+
+from collections import OrderedDict
+
+from tracing import traced
+
+
+BANDWIDTH_FACTORS = {'scott' : 1.059, 'silverman' : 0.9}
+
+
+def _column_stats(values):
+
+	"""
+	Returns the number of observed values, the deviation, the IQR, the minimum and the maximum of every column.
+	"""
+	count = (~np.isnan(values)).sum(axis=0)
+
+	# the missing values are sorted last, the quantiles are interpolated within the observed ones
+	ordered = np.sort(values, axis=0)
+	cols = np.arange(values.shape[1])
+	last = np.maximum(count - 1, 0)
+
+	def quantile(q):
+		below = np.floor(q * last).astype(np.int64)
+		above = np.minimum(below + 1, last)
+		return ordered[below, cols] + (q * last - below) * (ordered[above, cols] - ordered[below, cols])
+
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore', RuntimeWarning)
+		std = np.nanstd(values, axis=0, ddof=1)
+
+	empty = count == 0
+
+	return (count, np.where(count > 1, std, np.nan), np.where(empty, np.nan, quantile(.75) - quantile(.25)),
+		np.where(empty, np.nan, ordered[0]), np.where(empty, np.nan, ordered[last, cols]))
+
+
+def _bandwidths(count, std, iqr, method):
+
+	# the spread is the smallest of the deviation and the normalized IQR, which are 0 for constant columns
+	spread = np.fmin(std, iqr / 1.349)
+	spread = np.where(spread > 0, spread, np.where(std > 0, std, 1.))
+
+	with np.errstate(divide='ignore'):
+		return BANDWIDTH_FACTORS[method] * spread * count.astype(np.float64) ** -0.2
+
+
+def bandwidths(values, method='scott'):
+
+	"""
+	Function to choose the bandwidth of the Gaussian KDE of every column at once,
+	with the rule of thumb of `statsmodels` (used by `seaborn.distplot`).
+
+	Parameters:
+	-----------
+	values : numpy.ndarray
+		Represents the values, one tag per column. Missing values are ignored.
+
+	method : str, optional; default:'scott'
+		Represents the rule of thumb. Possible values `scott` or `silverman`
+
+	Returns:
+	--------
+	bw : numpy.ndarray
+		Represents the bandwidth of every column.
+
+	"""
+	count, std, iqr, _, _ = _column_stats(np.asarray(values, dtype=np.float64).reshape(len(values), -1))
+	return _bandwidths(count, std, iqr, method)
+
+
+def kde_matrix(values, n_grid=512, bw=None, cut=3, method='scott'):
+
+	"""
+	Function to compute the Gaussian KDE of every column at once: the values
+	are linearly binned on a grid per column (one `bincount` for all the
+	columns), then convolved with their kernels by FFT.
+
+	Parameters:
+	-----------
+	values : numpy.ndarray
+		Represents the values, one tag per column. Missing values are ignored.
+
+	n_grid : int, optional; default:512
+		Represents the number of points of the grids.
+
+	bw : float or numpy.ndarray, optional; default:None
+		Represents the bandwidth of every column. Chosen by `bandwidths` when None.
+
+	cut : float, optional; default:3
+		Represents how far (in bandwidths) the grids extend past the extreme values.
+
+	method : str, optional; default:'scott'
+		Represents the rule of thumb of the bandwidths, see `bandwidths`.
+
+	Returns:
+	--------
+	grid : numpy.ndarray
+		Represents the grids, of shape (n_grid, k).
+
+	density : numpy.ndarray
+		Represents the densities on the grids, of shape (n_grid, k). NaN for the empty columns.
+
+	bw : numpy.ndarray
+		Represents the bandwidths.
+
+	"""
+	values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+	k = values.shape[1]
+
+	observed = ~np.isnan(values)
+	count, std, iqr, vmin, vmax = _column_stats(values)
+	bw = _bandwidths(count, std, iqr, method) if bw is None else np.broadcast_to(np.asarray(bw, dtype=np.float64), (k,))
+
+	empty = count == 0
+	lo = np.where(empty, 0., vmin - cut * bw)
+	delta = np.where(empty, 1., (vmax + cut * bw - lo) / (n_grid - 1))
+
+	pos = np.where(observed, (values - lo) / delta, 0.)
+	left = np.clip(np.floor(pos), 0, n_grid - 2).astype(np.int64)
+	frac = pos - left
+
+	idx = (left + np.arange(k) * n_grid)[observed]
+	binned = np.bincount(idx, (1 - frac)[observed], minlength=k * n_grid)
+	binned += np.bincount(idx + 1, frac[observed], minlength=k * n_grid)
+
+	with np.errstate(invalid='ignore', divide='ignore'):
+		binned = binned.reshape(k, n_grid).T / count
+
+	# the Fourier transform of the Gaussian kernel, the grids zero padded so that it does not wrap around
+	n_fft = 2 * n_grid
+	sigma = np.where(empty, 1., bw / delta)
+	kernel = np.exp(-2 * (np.pi * np.fft.rfftfreq(n_fft)[:, None] * sigma) ** 2)
+
+	density = np.fft.irfft(np.fft.rfft(np.nan_to_num(binned), n=n_fft, axis=0) * kernel, n=n_fft, axis=0)[:n_grid]
+	density = np.clip(density, 0, None) / delta
+	density[:, empty] = np.nan
+
+	grid = lo + delta * np.arange(n_grid)[:, None]
+
+	return grid, density, bw
+
+
+def histogram_matrix(values, max_bins=50):
+
+	"""
+	Function to compute the density histogram of every column at once, the number
+	of bins of a column given by the Freedman-Diaconis rule (like `seaborn.distplot`).
+
+	Parameters:
+	-----------
+	values : numpy.ndarray
+		Represents the values, one tag per column. Missing values are ignored.
+
+	max_bins : int, optional; default:50
+		Represents the maximum number of bins.
+
+	Returns:
+	--------
+	edges : numpy.ndarray
+		Represents the bin edges, of shape (b + 1, k) where `b` is the largest number of bins.
+
+	density : numpy.ndarray
+		Represents the densities, of shape (b, k). NaN past the bins of a column.
+
+	n_bins : numpy.ndarray
+		Represents the number of bins of every column.
+
+	"""
+	values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+	k = values.shape[1]
+
+	observed = ~np.isnan(values)
+	count, _, iqr, vmin, vmax = _column_stats(values)
+
+	with np.errstate(invalid='ignore', divide='ignore'):
+		width = 2 * iqr * count.astype(np.float64) ** (-1 / 3)
+		n_bins = np.where(width > 0, np.ceil((vmax - vmin) / width), np.sqrt(count))
+
+	n_bins = np.clip(np.nan_to_num(n_bins), 1, max_bins).astype(np.int64)
+
+	# the bins of a constant column span the value +- 0.5, like numpy.histogram
+	constant = ~(vmax > vmin)
+	lo = np.nan_to_num(np.where(constant, vmin - 0.5, vmin))
+	width = np.where(constant, 1., vmax - vmin) / n_bins
+
+	b = int(n_bins.max()) if k else 1
+	pos = np.where(observed, np.floor((values - lo) / width), 0.)
+	idx = (np.clip(pos.astype(np.int64), 0, n_bins - 1) + np.arange(k) * b)[observed]
+
+	with np.errstate(invalid='ignore', divide='ignore'):
+		density = np.bincount(idx, minlength=k * b).reshape(k, b).T / (count * width)
+
+	density[np.arange(b)[:, None] >= n_bins] = np.nan
+	edges = lo + width * np.arange(b + 1)[:, None]
+
+	return edges, density, n_bins
+
+
+_distribution_cache = OrderedDict()
+_distribution_lock = threading.Lock()
+DISTRIBUTION_CACHE_SIZE = 1024
+
+
+@traced()
+def tag_distributions(data, cols, n_grid=512, cut=3, method='scott'):
+
+	"""
+	Function to compute the KDEs and the histograms of the tags, cached per tag (and
+	its values): only the tags not computed earlier are computed, all at once.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	cols : array-like
+		Represents the tags.
+
+	n_grid : int, optional; default:512
+		Represents the number of points of the KDE grids.
+
+	cut : float, optional; default:3
+		Represents how far (in bandwidths) the KDE grids extend past the extreme values.
+
+	method : str, optional; default:'scott'
+		Represents the rule of thumb of the bandwidths, see `bandwidths`.
+
+	Returns:
+	--------
+	res : dict
+		Represents, per tag, the KDE `grid` and `density`, its `bandwidth`, and the histogram `edges` and `hist` (densities).
+
+	"""
+	cols = list(cols)
+	values = data[cols].to_numpy(dtype=np.float64)
+
+	# the distributions only depend on the values of a tag, hashed on their own so that a tag stays cached when others change
+	keys = {col : (hashlib.sha1(np.ascontiguousarray(values[:, i]).tobytes()).hexdigest(), col, n_grid, cut, method)
+		for i, col in enumerate(cols)}
+
+	with _distribution_lock:
+		res = {col : _distribution_cache[key] for col, key in keys.items() if key in _distribution_cache}
+
+	missing = [i for i, col in enumerate(cols) if col not in res]
+	if missing:
+		grid, density, bw = kde_matrix(values[:, missing], n_grid=n_grid, cut=cut, method=method)
+		edges, hist, n_bins = histogram_matrix(values[:, missing])
+
+		for i, col in enumerate(cols[j] for j in missing):
+			res[col] = dict(grid=grid[:, i].copy(), density=density[:, i].copy(), bandwidth=bw[i],
+				edges=edges[:n_bins[i] + 1, i].copy(), hist=hist[:n_bins[i], i].copy())
+
+	with _distribution_lock:
+		for col in cols:
+			_distribution_cache[keys[col]] = res[col]
+			_distribution_cache.move_to_end(keys[col])
+
+		while len(_distribution_cache) > DISTRIBUTION_CACHE_SIZE:
+			_distribution_cache.popitem(last=False)
+
+	return res
@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+import argparse
+import os
+import pickle
+import threading
+
+from dataset import DATA_PATH, DATE_FORMAT, load_dataset, compact_floats, data_fingerprint
+from aggregates import AggregateTables
+from changepoints import detect_changepoints
+from tracing import traced
+
+
+STATE_PATH = './DATA/archive/derived_state.pkl'
+MODELS_ROOT = './MODELS'
+MA_WINDOWS = range(3, 11)
+
+
+def validate_rows(data, new_rows):
+
+	"""
+	Function to check new rows against the schema of the dataset.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the current dataset.
+
+	new_rows : pandas.DataFrame
+		Represents the rows to be appended, either indexed by month or with a
+		`month` column in the format of the CSV file (e.g. `20-Jan`).
+
+	Returns:
+	--------
+	new_rows : pandas.DataFrame
+		Represents the validated rows, with the columns in the order of the dataset.
+
+	"""
+	new_rows = new_rows.copy()
+
+	if 'month' in new_rows.columns:
+		new_rows['month'] = pd.to_datetime(new_rows['month'], format=DATE_FORMAT)
+		new_rows = new_rows.set_index('month')
+
+	if not isinstance(new_rows.index, pd.DatetimeIndex):
+		raise ValueError('New rows must be indexed by month or have a `month` column')
+
+	new_rows = new_rows.sort_index()
+
+	unknown = new_rows.columns.difference(data.columns)
+	missing = data.columns.difference(new_rows.columns)
+	if len(unknown) or len(missing):
+		raise ValueError(f'New rows do not match the dataset schema, unknown columns: {unknown.tolist()}, missing columns: {missing.tolist()}')
+
+	if new_rows.index.has_duplicates:
+		raise ValueError('New rows contain duplicated months')
+
+	if len(data) and new_rows.index[0] <= data.index[-1]:
+		raise ValueError(f'New rows must be after the last month of the dataset ({data.index[-1]:%Y-%m})')
+
+	new_rows = new_rows[data.columns].apply(pd.to_numeric, errors='raise').astype(np.float64)
+
+	if (new_rows < 0).any().any():
+		raise ValueError('New rows contain negative question counts')
+
+	new_rows.index.name = data.index.name
+
+	return new_rows
+
+
+class DerivedState:
+
+	"""
+	The artifacts derived from the dataset, which can be updated
+	with new rows without recomputing them on the whole dataset.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	windows : iterable of int, optional; default:MA_WINDOWS
+		Represents the window lengths of the moving averages.
+
+	"""
+	# bumped whenever the attributes change, so that the states saved by an older version are rebuilt
+	VERSION = 5
+
+	def __init__(self, data, windows=MA_WINDOWS):
+
+		self.version = self.VERSION
+		self.columns = data.columns
+		self.windows = list(windows)
+		self.aggregates = AggregateTables(data)
+		self.changepoints = detect_changepoints(data)
+
+		# imported here so that loading a saved state (the Home page) does not import matplotlib and statsmodels
+		from utils import rolling_moving_averages
+
+		smoothed_vals = rolling_moving_averages(data, windows=self.windows)
+		self.moving_averages = {w : pd.DataFrame(smoothed_vals[i], index=data.index, columns=data.columns)
+			for i, w in enumerate(self.windows)}
+		self.tail = data.iloc[len(data) - (max(self.windows) - 1):]
+
+		self.fingerprint = data_fingerprint(data)
+
+	def missing_percentage(self):
+
+		"""
+		Returns the percentage of missing values of every tag.
+		"""
+		return self.aggregates.missing_percentage()
+
+	def yearly_means(self, cols=None):
+
+		"""
+		Returns the yearly means of the tags (all when `cols` is None).
+		"""
+		return self.aggregates.table('year', 'mean', cols)
+
+	def quarterly_means(self, cols=None):
+
+		"""
+		Returns the quarterly means of the tags (all when `cols` is None).
+		"""
+		return self.aggregates.table('quarter', 'mean', cols)
+
+	def describe(self, cols=None):
+
+		"""
+		Returns the summary statistics (`pandas.DataFrame.describe`) of the tags, one row per tag.
+		"""
+		return self.aggregates.describe(cols)
+
+	def update(self, new_rows, data):
+
+		"""
+		Function to update the artifacts with new rows.
+
+		Parameters:
+		-----------
+		new_rows : pandas.DataFrame
+			Represents the validated new rows.
+
+		data : pandas.DataFrame
+			Represents the dataset including the new rows.
+
+		"""
+		from utils import rolling_moving_averages
+
+		self.aggregates.update(new_rows, data)
+		self.changepoints.update_rows(new_rows)
+
+		# only the last `max(windows) - 1` old rows are needed to extend the moving averages
+		extended = pd.concat([self.tail, new_rows])
+		smoothed_vals = rolling_moving_averages(extended, windows=self.windows)[:, len(self.tail):]
+
+		for i, w in enumerate(self.windows):
+			new_vals = pd.DataFrame(smoothed_vals[i], index=new_rows.index, columns=self.columns)
+			self.moving_averages[w] = pd.concat([self.moving_averages[w], new_vals])
+
+		self.tail = extended.iloc[len(extended) - (max(self.windows) - 1):]
+
+		self.fingerprint = data_fingerprint(data)
+
+
+def save_state(state, state_path=STATE_PATH):
+	tmp_path = f'{state_path}.tmp'
+	with open(tmp_path, 'wb') as f:
+		pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+	os.replace(tmp_path, state_path)
+
+
+_states = dict()
+_states_lock = threading.Lock()
+
+
+@traced()
+def load_state(data, state_path=STATE_PATH):
+
+	"""
+	Function to load the derived artifacts of the dataset, building
+	and saving them when they are missing or out of date.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset.
+
+	state_path : str, optional; default:STATE_PATH
+		Represents the path of the saved artifacts.
+
+	Returns:
+	--------
+	state : DerivedState
+		Represents the artifacts of the dataset.
+
+	"""
+	fingerprint = data_fingerprint(data)
+
+	with _states_lock:
+		state = _states.get(state_path)
+		if state is not None and state.fingerprint == fingerprint:
+			return state
+
+		state = None
+		if os.path.exists(state_path):
+			try:
+				with open(state_path, 'rb') as f:
+					state = pickle.load(f)
+
+			except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+				state = None
+
+		if state is None or state.fingerprint != fingerprint or getattr(state, 'version', None) != DerivedState.VERSION:
+			state = DerivedState(data)
+			save_state(state, state_path)
+
+		_states[state_path] = state
+
+	return state
+
+
+@traced()
+def append_rows(new_rows, path=DATA_PATH, state_path=STATE_PATH, models_root=MODELS_ROOT):
+
+	"""
+	Function to append new rows to the dataset and update
+	its derived artifacts and the latest ARIMA model of every tag incrementally.
+
+	Parameters:
+	-----------
+	new_rows : pandas.DataFrame
+		Represents the rows to be appended, see `validate_rows`.
+
+	path : str, optional; default:DATA_PATH
+		Represents the path of the CSV file.
+
+	state_path : str, optional; default:STATE_PATH
+		Represents the path of the saved artifacts.
+
+	models_root : str, optional; default:MODELS_ROOT
+		Represents the directory of the model registry, see `registry.ModelRegistry.update_models`.
+		The models are not updated when None or when the directory does not exist.
+
+	Returns:
+	--------
+	data : pandas.DataFrame
+		Represents the dataset including the new rows.
+
+	state : DerivedState
+		Represents the updated artifacts.
+
+	"""
+	data = load_dataset(path)
+	state = load_state(data, state_path)
+	new_rows = validate_rows(data, new_rows)
+
+	header = pd.read_csv(path, nrows=0).columns
+	with open(path, 'rb+') as f:
+		f.seek(0, os.SEEK_END)
+		if f.tell():
+			f.seek(-1, os.SEEK_END)
+			if f.read(1) != b'\n':
+				f.write(b'\n')
+
+	out = new_rows.copy()
+	out.insert(0, 'month', out.index.strftime(DATE_FORMAT))
+	out[header].to_csv(path, mode='a', header=False, index=False)
+
+	data = compact_floats(pd.concat([data, new_rows]))
+	state.update(new_rows, data)
+	save_state(state, state_path)
+
+	if models_root is not None and os.path.isdir(models_root):
+		# imported here so that the Home page does not import statsmodels
+		from registry import get_registry
+
+		get_registry(models_root).update_models(data)
+
+	return data, state
+
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description='Append new months of tag counts to the dataset')
+	parser.add_argument('rows', help='CSV file with the new rows, in the format of the dataset')
+	parser.add_argument('--data', default=DATA_PATH, help='path of the dataset')
+	parser.add_argument('--state', default=STATE_PATH, help='path of the derived artifacts')
+	parser.add_argument('--models', default=MODELS_ROOT, help='directory of the model registry')
+	args = parser.parse_args()
+
+	new_rows = pd.read_csv(args.rows)
+	data, state = append_rows(new_rows, path=args.data, state_path=args.state, models_root=args.models)
+	print(f'Dataset now has {len(data)} months, last one {data.index[-1]:%Y-%m}')
+
+	# the new rows are the last ones of the dataset
+	alerts = state.changepoints.alerts_frame(since=data.index[len(data) - len(new_rows)])
+	if len(alerts):
+		print(f'{len(alerts)} alerts in the new months:')
+		print(alerts.to_string(index=False))
@@ -1,36 +1,27 @@
-import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-import plotly.offline as pyo
 import streamlit as st
 import os
-import sys
 import warnings
 
-from statsmodels.tsa.seasonal import seasonal_decompose
-from statsmodels.graphics.tsaplots import plot_acf
-from pandas.tseries.offsets import DateOffset
-from sklearn.metrics import r2_score, mean_squared_error
+from ingest import load_state
+from dataset import load_dataset
+from views import PAGES, load_page, import_report
 
-from utils import apply_moving_average_filter, plot_interactive, multiple_distribution_plots,\
- box_dist, interactive_pie_chart, adfuller_test, kpss_test
-
-from modelling import find_best_fit, arima_fit, load_arima, arima_forecast
+import tracing
+from tracing import span
 
 warnings.filterwarnings('ignore')
-plt.style.use('ggplot')
 
 if __name__ == "__main__":
 
+	tracing.start_run()
+	tracing.instrument(st, ['pyplot', 'write', 'dataframe', 'image'], prefix='streamlit')
+
 	if not os.path.exists('./MODELS'):
 		os.mkdir('./MODELS')
 
-	df = pd.read_csv('./DATA/archive/MLTollsStackOverflow.csv')
-	df['month'] = pd.to_datetime(df['month'], format='%y-%b')
-	df = df.set_index('month').sort_index()
+	df = load_dataset('./DATA/archive/MLTollsStackOverflow.csv')
+	derived = load_state(df)
 
 	st.set_page_config(page_title='StackOverflow')
 
@@ -46,166 +37,16 @@ if __name__ == "__main__":
 		</body>
 		""", unsafe_allow_html=True)
 	
-	radio = st.sidebar.radio("Navigation", ["Home", "Data Insights", "Know Specific Data", "Statistical Tests", "Data Modelling"])
-
-	if radio == "Home":
-		st.header("Top 100 records of the StackOverflow Dataset")
-		cols = ["nltk", "spacy", "python", "r"]
-		st_ms = st.multiselect("Topics", df.columns.tolist(), default=cols)
-		st.dataframe(df[st_ms].head(100))
-
-		st.markdown(f""" 
-
-			The above Data-frame represents the top discussion topics and their tolls in StackOverflow from the year 2009-2019.
-			The total Number of records in the dataset is {df.shape[0]} and the total number of topics that are being discussed 
-			are {df.shape[1]}.
-			""")
-
-		st.markdown("The data is recorded at the begining of each month of each year.")
-		st.markdown("")
-
-		st.header("Percentage of Data Missing")
-		miss_df = pd.DataFrame((df.isna().sum() / df.isna().count()) * 100, columns=["Percentage of Data Missing"])
-		st.dataframe(miss_df)
-
-		st.markdown("")
-		st.header("Top 20 discussion topics in Stack Overflow over the year 2009-2019")
-		st.image('./img/comparison.gif')
-
-
-	if radio == "Data Insights":
-
-		st.header("Comparison plots")
-		cols = ['nltk', 'spacy']
-		st_ms = st.multiselect("Topics", df.columns.tolist(), default=cols)
-		fig = plot_interactive(df, st_ms)
-		st.write(fig)
-
-		# st.markdown("")
-		# st.markdown("# Distribution Plot for the data")
-		# fig2 = multiple_distribution_plots(df, st_ms)
-		# st.pyplot(fig2)
-
-		st.markdown("")
-		df_sub1 = df[['python', 'r', 'matlab']].copy()
-		df_sub1['year'] = df_sub1.index.year
-		df_sub1 = df_sub1.groupby(by=['year']).mean()
-
-		st.header("Comparison between Python, R, and Matlab Question Toll")
-		fig2 = interactive_pie_chart(df_sub1)
-		st.write(fig2)
-
-		st.markdown("")
-		st.header("Rise of Big-Data Libraries")
-		fig3 = plot_interactive(df, ['hadoop', 'apache-spark', 'pyspark', 'Dask'])
-		st.write(fig3)
-
-
-	if radio == "Know Specific Data":
-
-		option = st.selectbox('Select the Tag which needs to be analyzed', df.columns.tolist())
-
-		df_sub2 = df[[option]]
-		st.header(f'Data Properties of {option} tag')
-		st.dataframe(df_sub2.describe().T)
-
-		st.header(f"Distribution of the {option} tag")
-		fig4 = box_dist(df_sub2, option, title=f'Distribution Plot of the {option}')
-		st.pyplot(fig4)
-
-		st.header(f'Trend and Seasonality in the {option} tag')
-		ses_trend_res = seasonal_decompose(df_sub2[option], model='additive')
-		fig5, ax5 = plt.subplots(3, 1, figsize=(12, 8))
-		ax5[0].plot(ses_trend_res.trend)
-		ax5[1].plot(ses_trend_res.seasonal)
-		ax5[2].plot(ses_trend_res.resid)
-
-		ax5[0].set_ylabel('Trend')
-		ax5[1].set_ylabel('Seasonal')
-		ax5[2].set_ylabel('Residual')
-
-		st.pyplot(fig5)
-
-		st.header(f"Auto-Correlation plot of the {option} tag")
-		fig6, ax6 = plt.subplots(figsize=(10, 4))
-		plot_acf(df_sub2[option], use_vlines=False, ax=ax6, title=f'AutoCorrelation of {option}', lags=40)
-		st.pyplot(fig6)
-
-		st.header(f"The pattern of the {option} tag")
-
-		slider_val = st.slider('Window Length', min_value=3, max_value=10)
-		
-		with st.spinner('Calculating the Moving Average ....'):
-			df_sub2['moving_average'] = apply_moving_average_filter(df_sub2[option], win_len=slider_val)
-
-		fig7 = plot_interactive(df_sub2, [option, 'moving_average'], title=f'Pattern in {option} tag')
-		st.write(fig7)
-
-
-	if radio == "Statistical Tests":
-
-		option = st.selectbox("Select the Tag which needs to be tested", df.columns.tolist())
-
-		st.header('Augmented Dickey-Fuller Test Results')
-		adtes_res, ad_is_stn = adfuller_test(df[option])
-		st.dataframe(adtes_res)
-		ad_is_stn = "Stationary" if ad_is_stn else "Non-Stationary"
-		st.markdown(f'\n As per the Augmented Dickey Fuller the series for the tag **{option}** is considered to be **{ad_is_stn}**')
-
-		st.markdown("")
-		st.header('KPSS Test Results')
-		option2 = st.selectbox('Select the Null Hypothesis for the KPSS Test', ['c', 'ct'])
-		kpsstest_res, kpss_is_stn = kpss_test(df[option], reg=option2)
-		st.dataframe(kpsstest_res)
-		kpss_is_stn = "Stationary" if kpss_is_stn else "Non-Stationary"
-		st.markdown(f""" 
-			As per the KPSS Test on the series for the tag **{option}** is considered to be **{kpss_is_stn}**
-			""")
-
-
-	if radio == "Data Modelling":
-
-		dropdown = st.selectbox('Tag', df.columns.tolist())
-		df_sub = df[[dropdown]]
-
-		slider = st.slider('Test Size (in months)', min_value=12, max_value=48, value=12)
-		last_date = df_sub.index[-1]
-		print('Last Date',last_date)
-		test_date = last_date + DateOffset(months=-slider)
-		print('Test Date',test_date)
-
-		train_data = df_sub[:test_date]
-		test_data = df_sub[test_date:]
-
-		print(len(train_data), len(test_data))
-
-		if st.button('Best-Params'):
-			with st.spinner('Finding the best params....'):
-				best_params = find_best_fit(df_sub[dropdown])
-
-			st.write(best_params)
-
-		if st.button('Fit-Model'):
-			with st.spinner('Fitting the ARIMA model....'):
-				best_params = find_best_fit(df_sub[dropdown])
-				model = arima_fit(train_data[dropdown], best_params['order'], f'./MODELS/arima_{dropdown}.sav')
-				forecast_res = arima_forecast(model, train_data.index[-1], test_data.index[-1] )
-				# print(forecast_res)
-				score = r2_score(test_data[dropdown].values.reshape(-1), forecast_res.values.reshape(-1))
-				rmse = np.sqrt(mean_squared_error(test_data[dropdown].values.reshape(-1), forecast_res.values.reshape(-1)))
-
+	radio = st.sidebar.radio("Navigation", list(PAGES))
 
-			st.write("**Model Fitting Complete.**")
-			st.markdown(f'$\mu$ of the test data : {test_data[dropdown].mean()}')
-			st.markdown(f'$RMSE$ of the model : {rmse}')
-			st.markdown(f'$R^{2}$ Score of the model : {score}')
-			
-			fig, ax = plt.subplots(figsize=(12,8))
-			plt.plot(test_data.index, test_data.values, label='Test Data')
-			plt.plot(forecast_res.index, forecast_res.values, label='Forecast')
-			plt.legend()
-			st.pyplot(fig)
+	with span(f'page.{radio}'):
+		load_page(radio).render(df, derived)
 
+	if st.sidebar.checkbox('Show Import Times'):
+		st.sidebar.dataframe(pd.DataFrame.from_dict(import_report(), orient='index'))
 
-			
+	if tracing.enabled():
+		if st.sidebar.checkbox('Show Timings'):
+			st.sidebar.dataframe(pd.DataFrame(tracing.run_spans(), columns=['name', 'parent', 'duration']))
 
+		tracing.write_metrics()
@@ -0,0 +1,272 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from modelling import find_best_fit, arima_fit
+from dataset import data_fingerprint
+
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+def _search_job(data, seasonal):
+	best_params = find_best_fit(data, seasonal=seasonal, trace=False)
+	return dict(order=list(best_params['order']), seasonal_order=list(best_params['seasonal_order']))
+
+
+def _fit_job(data, train_data, order, seasonal, filename):
+	res = dict()
+
+	if order is None:
+		res = _search_job(data, seasonal)
+		order = res['order']
+
+	arima_fit(train_data, tuple(order), filename)
+	res.update(order=list(order), filename=filename)
+
+	return res
+
+
+class JobQueue:
+
+	"""
+	Background jobs running the ARIMA order searches and fits on a process
+	pool, with their status and results kept in a directory on disk (one JSON
+	file per job) so that they survive the reruns of the Streamlit script.
+
+	A job is identified by its kind, its tag, the fingerprint of its data and
+	its split date: submitting the same job again returns the existing one
+	while it is queued, running or done.
+
+	Parameters:
+	-----------
+	root : str, optional; default:'./JOBS'
+		Represents the directory of the job files.
+
+	registry : registry.ModelRegistry, optional; default:None
+		Represents the registry the finished orders and models are added to.
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None.
+
+	max_age : float, optional; default:7 * 24 * 3600
+		Represents the age (in seconds) after which the finished jobs are forgotten.
+
+	"""
+	def __init__(self, root='./JOBS', registry=None, n_jobs=None, max_age=7 * 24 * 3600):
+
+		self.root = root
+		self.registry = registry
+		self.max_age = max_age
+
+		self._lock = threading.RLock()
+		self._executor = ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count())
+		self._futures = dict()
+
+		os.makedirs(self.root, exist_ok=True)
+		self.prune()
+
+	@staticmethod
+	def job_id(kind, tag, data, split_date=None):
+		split_date = pd.Timestamp(split_date).strftime('%Y-%m-%d') if split_date is not None else ''
+		key = f'{kind}|{tag}|{data_fingerprint(data)}|{split_date}'
+
+		return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+	def _path(self, job_id):
+		return os.path.join(self.root, f'{job_id}.json')
+
+	def _write(self, job):
+		tmp_path = f'{self._path(job["id"])}.tmp'
+		with open(tmp_path, 'w') as f:
+			json.dump(job, f, indent=1)
+
+		os.replace(tmp_path, self._path(job['id']))
+
+	def _read(self, job_id):
+		try:
+			with open(self._path(job_id)) as f:
+				return json.load(f)
+
+		except (OSError, ValueError):
+			return None
+
+	def get(self, job_id):
+
+		"""
+		Returns the record of a job, or None when it is unknown. A job left queued
+		or running by a process which is gone (e.g. a restarted app) is unknown.
+		"""
+		with self._lock:
+			job = self._read(job_id)
+
+			if job is not None and job['status'] in (QUEUED, RUNNING) and job_id not in self._futures:
+				return None
+
+			return job
+
+	def find(self, kind, tag, data, split_date=None):
+
+		"""
+		Returns the record of the job of a tag, its data and split date, or None.
+		"""
+		return self.get(self.job_id(kind, tag, data, split_date))
+
+	def _submit(self, kind, tag, data, split_date, force, func, *args):
+		job_id = self.job_id(kind, tag, data, split_date)
+
+		with self._lock:
+			job = self.get(job_id)
+			if job is not None and job['status'] != FAILED and not (force and job['status'] == DONE):
+				return job
+
+			job = dict(id=job_id, kind=kind, tag=tag, status=QUEUED, pid=os.getpid(), submitted=time.time(),
+				started=None, finished=None, split_date=split_date.strftime('%Y-%m-%d') if split_date is not None else None,
+				result=None, error=None)
+			self._write(job)
+
+			future = self._executor.submit(func, *args)
+			self._futures[job_id] = future
+
+			# the pool gives no start event, the job is running as soon as a worker is free
+			job.update(status=RUNNING, started=time.time())
+			self._write(job)
+
+		future.add_done_callback(lambda f: self._finish(job, data, f))
+
+		return dict(job)
+
+	def _finish(self, job, data, future):
+		with self._lock:
+			self._futures.pop(job['id'], None)
+			job['finished'] = time.time()
+
+			try:
+				job['result'] = future.result()
+
+				if self.registry is not None:
+					if 'seasonal_order' in job['result']:
+						self.registry.put_order(job['tag'], data, job['result'])
+
+					if job['kind'] == 'fit':
+						train_data = data[:pd.Timestamp(job['split_date'])]
+						self.registry.put_model(job['tag'], train_data, job['split_date'], job['result']['order'], None, job['result']['filename'])
+
+				job['status'] = DONE
+
+			except Exception as e:
+				job['error'] = f'{type(e).__name__}: {e}'
+				job['status'] = FAILED
+
+			self._write(job)
+
+	def submit_search(self, tag, data, seasonal=False, force=False):
+
+		"""
+		Function to search the best ARIMA order of a tag in the background, see `modelling.find_best_fit`.
+
+		Parameters:
+		-----------
+		tag : str
+			Represents the name of the tag.
+
+		data : pandas.Series
+			Represents the data on which the ARIMA model needs to be applied.
+
+		seasonal : bool, optional; default:False
+			Represents whether there are any seasonality in the data.
+
+		force : bool, optional; default:False
+			Represents whether to run a job already done again.
+
+		Returns:
+		--------
+		job : dict
+			Represents the record of the (new or existing) job. The `result`
+			of a finished search holds the `order` and the `seasonal_order`.
+
+		"""
+		return self._submit('search', tag, data, None, force, _search_job, data, seasonal)
+
+	def submit_fit(self, tag, data, split_date, order=None, seasonal=False, force=False):
+
+		"""
+		Function to fit the ARIMA model of a tag on its data up to `split_date` in the
+		background, searching its order on the whole data first when `order` is None.
+
+		Parameters:
+		-----------
+		tag : str
+			Represents the name of the tag.
+
+		data : pandas.Series
+			Represents the whole data of the tag.
+
+		split_date : datetime-like
+			Represents the train/test split date.
+
+		order : tuple, optional; default:None
+			Represents the order for the ARIMA.
+
+		seasonal : bool, optional; default:False
+			Represents whether there are any seasonality in the data.
+
+		force : bool, optional; default:False
+			Represents whether to run a job already done again (e.g. its model was evicted).
+
+		Returns:
+		--------
+		job : dict
+			Represents the record of the (new or existing) job. The `result` of a
+			finished fit holds the `order` and the `filename` of the saved model.
+
+		"""
+		split_date = pd.Timestamp(split_date)
+		train_data = data[:split_date]
+
+		job_id = self.job_id('fit', tag, data, split_date)
+		root = self.registry.root if self.registry is not None else self.root
+		filename = os.path.join(root, f'arima_{tag}_{job_id}.json')
+
+		return self._submit('fit', tag, data, split_date, force, _fit_job, data, train_data,
+			list(order) if order is not None else None, seasonal, filename)
+
+	def prune(self):
+
+		"""
+		Remove the files of the jobs finished more than `max_age` seconds ago.
+		"""
+		if self.max_age is None:
+			return
+
+		now = time.time()
+		with self._lock:
+			for name in os.listdir(self.root):
+				if not name.endswith('.json'):
+					continue
+
+				job = self._read(name[:-len('.json')])
+				if job is not None and job['status'] in (DONE, FAILED) and now - (job['finished'] or now) > self.max_age:
+					os.remove(self._path(job['id']))
+
+
+_queues = dict()
+_queues_lock = threading.Lock()
+
+
+def get_queue(root='./JOBS', registry=None, **kwargs):
+
+	"""
+	Returns the process-wide job queue of a directory, so that it (and its
+	worker processes) survives the reruns of the Streamlit script.
+	"""
+	with _queues_lock:
+		if root not in _queues:
+			_queues[root] = JobQueue(root, registry=registry, **kwargs)
+
+		return _queues[root]
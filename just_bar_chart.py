@@ -1,25 +1,190 @@
 import numpy as np
 import pandas as pd
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 import seaborn as sns
 import bar_chart_race as bcr
+import argparse
+import inspect
+import io
 import os
 import sys
 import warnings
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib import animation
+
+from dataset import load_dataset
+
+# private parts of `bar_chart_race` (and `matplotlib.animation.MovieWriter._run`) used by `parallel_bar_chart_race`,
+# which falls back to `bcr.bar_chart_race` when they are missing (see the versions pinned in requirements.txt)
+try:
+	from bar_chart_race._make_chart import _BarChartRace
+
+except ImportError:
+	_BarChartRace = None
+
 warnings.filterwarnings('ignore')
 plt.style.use('ggplot')
 
 
+def _race_params(df, filename, **kwargs):
+
+	"""
+	Returns the arguments of `bcr.bar_chart_race`, defaults included,
+	which are also the arguments of its chart class.
+	"""
+	params = inspect.signature(bcr.bar_chart_race).bind(df, filename, **kwargs)
+	params.apply_defaults()
+
+	return dict(params.arguments)
+
+
+def _writer_class(race):
+	writer = race.writer
+	return animation.writers[writer] if isinstance(writer, str) else type(writer)
+
+
+def _frame_collector(writer_cls):
+
+	"""
+	Returns a movie writer which keeps the frames grabbed by `Animation.save`
+	in memory instead of piping them to the encoder, so that the frames are
+	exactly the ones `writer_cls` would have encoded.
+	"""
+	class FrameCollector(writer_cls):
+
+		def _run(self):
+			self._proc = type('Pipe', (), dict(stdin=io.BytesIO()))()
+
+		def finish(self):
+			self.frames = self._proc.stdin.getvalue()
+
+	return FrameCollector
+
+
+def _has_private_api(race=None):
+
+	"""
+	Returns whether the private attributes used to render the frames on a
+	process pool exist, those of the chart `race` included when given.
+	"""
+	if _BarChartRace is None or not callable(getattr(animation.MovieWriter, '_run', None)):
+		return False
+
+	return race is None or all(hasattr(race, attr) for attr in ('orig_rcParams', 'fig', 'anim_func', 'plot_bars', 'df_values', 'fps'))
+
+
+def _render_chunk(params, frames):
+
+	"""
+	Worker for `parallel_bar_chart_race`. Renders some frames of the
+	race and returns them as the raw bytes the encoder expects.
+	"""
+	race = _BarChartRace(**params)
+	writer = _frame_collector(_writer_class(race))(fps=race.fps)
+
+	anim = animation.FuncAnimation(race.fig, race.anim_func, frames, lambda: race.plot_bars(0),
+		interval=race.period_length / race.steps_per_period)
+	anim.save(params['filename'], writer=writer)
+
+	return writer.frames
+
+
+def parallel_bar_chart_race(df, filename, n_jobs=None, chunk_size=20, **kwargs):
+
+	"""
+	Function to render the bar chart race on a process pool.
+
+	The frames are split into chunks rendered by the workers and streamed, in
+	order, into a single encoder, so the video is the same as the one of
+	`bcr.bar_chart_race`. Writers which don't encode through a pipe (e.g. the
+	GIF and HTML ones), and versions of `bar_chart_race` or `matplotlib` without
+	the private attributes it relies on, fall back to `bcr.bar_chart_race`.
+
+	Parameters:
+	-----------
+	df : pandas.DataFrame
+		Represents the dataset, one row per period and one tag per column.
+
+	filename : str
+		Represents the filename of the video.
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None.
+
+	chunk_size : int, optional; default:20
+		Represents the number of frames rendered per task. Bounds the memory
+		used by the rendered frames waiting to be encoded.
+
+	**kwargs :
+		Represents the arguments of `bcr.bar_chart_race`, e.g. `n_bars`,
+		`steps_per_period`, `interpolate_period`, `figsize` or `dpi`.
+
+	"""
+	params = _race_params(df, filename, **kwargs)
+
+	if not _has_private_api():
+		return bcr.bar_chart_race(**params)
+
+	race = _BarChartRace(**params)
+	writer_cls = _writer_class(race)
+
+	if not _has_private_api(race) or not issubclass(writer_cls, animation.MovieWriter) or issubclass(writer_cls, animation.FileMovieWriter):
+		if hasattr(race, 'orig_rcParams'):
+			plt.rcParams = race.orig_rcParams
+
+		return bcr.bar_chart_race(**params)
+
+	n_jobs = n_jobs or os.cpu_count()
+	chunks = [range(i, min(i + chunk_size, len(race.df_values))) for i in range(0, len(race.df_values), chunk_size)]
+
+	dpi = mpl.rcParams['savefig.dpi']
+	dpi = race.fig.dpi if dpi == 'figure' else dpi
+
+	writer = writer_cls(fps=race.fps)
+
+	try:
+		with writer.saving(race.fig, filename, dpi), ProcessPoolExecutor(max_workers=n_jobs) as executor:
+
+			pending = deque()
+			for chunk in chunks:
+				pending.append(executor.submit(_render_chunk, params, chunk))
+
+				# keep a bounded number of rendered chunks waiting for the encoder
+				if len(pending) > n_jobs:
+					writer._proc.stdin.write(pending.popleft().result())
+
+			while pending:
+				writer._proc.stdin.write(pending.popleft().result())
+
+	finally:
+		plt.rcParams = race.orig_rcParams
+
 
 if __name__ == "__main__":
 
-	df = pd.read_csv('./DATA/archive/MLTollsStackOverflow.csv')
-	df['month'] = pd.to_datetime(df['month'], format='%y-%b')
-	df = df.set_index('month').sort_index()
+	parser = argparse.ArgumentParser(description='Render the bar chart race of the tags')
+	parser.add_argument('--output', default='./VIDEOS/race.mp4', help='filename of the video')
+	parser.add_argument('--jobs', type=int, default=None, help='number of worker processes, 0 to render in a single process')
+	parser.add_argument('--n-bars', type=int, default=20, help='number of bars')
+	parser.add_argument('--steps-per-period', type=int, default=10, help='number of interpolated frames per period')
+	parser.add_argument('--figsize', type=float, nargs=2, default=(12, 8), help='width and height in inches')
+	parser.add_argument('--dpi', type=int, default=144, help='resolution of the frames')
+	args = parser.parse_args()
+
+	df = load_dataset('./DATA/archive/MLTollsStackOverflow.csv')
+
+	race_kwargs = dict(title='StackOverflow Question Toll over the year 2009-2019', orientation='h',
+		n_bars=args.n_bars, steps_per_period=args.steps_per_period, figsize=tuple(args.figsize), dpi=args.dpi)
+
+	if args.jobs == 0:
+		bcr.bar_chart_race(df=df, filename=args.output, **race_kwargs)
+
+	else:
+		parallel_bar_chart_race(df, args.output, n_jobs=args.jobs, **race_kwargs)
 
-	bcr.bar_chart_race(df=df, filename='./VIDEOS/race.mp4', title='StackOverflow Question Toll over the year 2009-2019', orientation='h', 
-		n_bars=20, figsize=(12, 8))
 
 
 
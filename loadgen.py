@@ -0,0 +1,105 @@
+import numpy as np
+import argparse
+import json
+import random
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+
+def _request(url, timeout):
+	start = time.perf_counter()
+
+	try:
+		with urlopen(url, timeout=timeout) as res:
+			body = json.loads(res.read())
+			status = res.status
+
+	except HTTPError as e:
+		body, status = dict(), e.code
+
+	return time.perf_counter() - start, status, body.get('batch_size', 0)
+
+
+def run(base_url, tags, n_requests=1000, concurrency=16, horizons=(12,), timeout=30., seed=0):
+
+	"""
+	Function to send forecast requests to the service from `concurrency` threads
+	and measure their latency and the throughput of the service.
+
+	Parameters:
+	-----------
+	base_url : str
+		Represents the address of the service, e.g. `http://127.0.0.1:8502`.
+
+	tags : list
+		Represents the tags requested, picked at random.
+
+	n_requests : int, optional; default:1000
+		Represents the number of requests sent.
+
+	concurrency : int, optional; default:16
+		Represents the number of requests in flight.
+
+	horizons : tuple, optional; default:(12,)
+		Represents the horizons requested, picked at random.
+
+	timeout : float, optional; default:30.
+		Represents the timeout (in seconds) of a request.
+
+	seed : int, optional; default:0
+		Represents the seed of the random picks.
+
+	Returns:
+	--------
+	res : dict
+		Represents the throughput (requests per second), the latency percentiles
+		(in milliseconds), the number of errors and the mean batch size.
+
+	"""
+	rng = random.Random(seed)
+	urls = [f'{base_url}/forecast?{urlencode(dict(tag=rng.choice(tags), horizon=rng.choice(horizons)))}' for _ in range(n_requests)]
+
+	start = time.perf_counter()
+	with ThreadPoolExecutor(max_workers=concurrency) as executor:
+		results = list(executor.map(lambda url: _request(url, timeout), urls))
+	elapsed = time.perf_counter() - start
+
+	latencies = np.array([r[0] for r in results]) * 1e3
+	ok = np.array([r[1] == 200 for r in results])
+	batch_sizes = np.array([r[2] for r in results])[ok]
+
+	return dict(requests=n_requests, concurrency=concurrency, seconds=elapsed, throughput=n_requests / elapsed,
+		p50=float(np.percentile(latencies, 50)), p90=float(np.percentile(latencies, 90)),
+		p99=float(np.percentile(latencies, 99)), max=float(latencies.max()),
+		errors=int((~ok).sum()), mean_batch_size=float(batch_sizes.mean()) if len(batch_sizes) else 0.)
+
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description='Load test the forecast service')
+	parser.add_argument('--url', default='http://127.0.0.1:8502', help='address of the service')
+	parser.add_argument('--tags', default=None, help='comma separated tags to request, all the served ones when omitted')
+	parser.add_argument('--requests', type=int, default=1000, help='number of requests')
+	parser.add_argument('--concurrency', default='1,8,32', help='comma separated numbers of requests in flight')
+	parser.add_argument('--horizons', default='12', help='comma separated horizons to request')
+	args = parser.parse_args()
+
+	if args.tags:
+		tags = args.tags.split(',')
+
+	else:
+		with urlopen(f'{args.url}/tags') as res:
+			tags = json.loads(res.read())['tags']
+
+	if not tags:
+		parser.error('the service has no model')
+
+	horizons = [int(h) for h in args.horizons.split(',')]
+	for concurrency in [int(c) for c in args.concurrency.split(',')]:
+		res = run(args.url, tags, n_requests=args.requests, concurrency=concurrency, horizons=horizons)
+		print(f"concurrency {concurrency:>4}: {res['throughput']:8.1f} req/s  p50 {res['p50']:7.2f} ms  p90 {res['p90']:7.2f} ms  "
+			f"p99 {res['p99']:7.2f} ms  errors {res['errors']}  mean batch {res['mean_batch_size']:.2f}")
@@ -1,11 +1,24 @@
 import numpy as np
 import pandas as pd
+import os
+import signal
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from pmdarima import auto_arima
 from statsmodels.tsa.arima_model import ARIMA
 from statsmodels.tsa.arima_model import ARIMAResults
 
+from compact_arima import CompactARIMA, COMPACT_SUFFIX
+from tracing import traced
+
+
+def _auto_arima(data, seasonal=False, trace=False):
+	return auto_arima(data, seasonal=seasonal, trace=trace, start_p=0, start_q=0, max_p=5, max_q=5)
+
 
+@traced()
 def find_best_fit(data, seasonal=False, trace=True):
 
 	"""
@@ -31,13 +44,111 @@ def find_best_fit(data, seasonal=False, trace=True):
 	"""
 	best_params = dict()
 
-	stepwise_fit = auto_arima(data, seasonal=seasonal, trace=trace, start_p=0, start_q=0, max_p=5, max_q=5)
+	stepwise_fit = _auto_arima(data, seasonal=seasonal, trace=trace)
 	best_params['order'] = stepwise_fit.get_params()['order']
 	best_params['seasonal_order'] = stepwise_fit.get_params()['seasonal_order']
 
 	return best_params
 
 
+class _SearchTimeout(Exception):
+	pass
+
+
+def _raise_timeout(signum, frame):
+	raise _SearchTimeout()
+
+
+def _search_tag(tag, values, seasonal=False, timeout=None):
+
+	"""
+	Worker for `find_best_fit_batch`. Runs the order search of a single tag and
+	never raises, the failure is reported in the returned record instead.
+	"""
+	record = dict(tag=tag, order=None, seasonal_order=None, aic=np.nan, fit_time=np.nan, n_obs=len(values), error=None)
+
+	# SIGALRM is only available on Unix, elsewhere the search runs without a time limit
+	use_alarm = timeout is not None and hasattr(signal, 'SIGALRM')
+	if use_alarm:
+		prev_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+		signal.setitimer(signal.ITIMER_REAL, timeout)
+
+	start = time.perf_counter()
+	try:
+		stepwise_fit = _auto_arima(values, seasonal=seasonal, trace=False)
+		record['order'] = stepwise_fit.get_params()['order']
+		record['seasonal_order'] = stepwise_fit.get_params()['seasonal_order']
+		record['aic'] = stepwise_fit.aic()
+
+	except _SearchTimeout:
+		record['error'] = f'timed out after {timeout}s'
+
+	except Exception as e:
+		record['error'] = f'{type(e).__name__}: {e}'
+
+	finally:
+		if use_alarm:
+			signal.setitimer(signal.ITIMER_REAL, 0)
+			signal.signal(signal.SIGALRM, prev_handler)
+
+	record['fit_time'] = time.perf_counter() - start
+
+	return record
+
+
+@traced()
+def find_best_fit_batch(data, seasonal=False, n_jobs=None, timeout=None):
+
+	"""
+	Function to find the best set of ARIMA orders for
+	every tag of a dataset in parallel.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column. Missing values of a
+		tag are dropped before its search.
+
+	seasonal : bool, optional; default:False
+		Represents whether there are any seasonality in the data.
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None.
+
+	timeout : float, optional; default:None
+		Represents the time limit (in seconds) of the search of a single tag.
+
+	Returns:
+	--------
+	results : pandas.DataFrame
+		Represents the order, seasonal order, AIC, fit time and number of
+		observations per tag. Tags whose search failed or timed out have
+		their reason in the `error` column.
+
+	"""
+	n_jobs = n_jobs or os.cpu_count()
+	records = list()
+
+	with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+
+		futures = {executor.submit(_search_tag, col, data[col].dropna().values, seasonal, timeout) : col for col in data.columns}
+
+		for future in as_completed(futures):
+			try:
+				records.append(future.result())
+
+			except Exception as e:
+				# the worker process itself died (e.g. out of memory)
+				records.append(dict(tag=futures[future], error=f'{type(e).__name__}: {e}'))
+
+	results = pd.DataFrame.from_records(records, columns=['tag', 'order', 'seasonal_order', 'aic', 'fit_time', 'n_obs', 'error'])
+	results = results.set_index('tag').reindex(data.columns)
+	results.index.name = 'tag'
+
+	return results
+
+
+@traced()
 def arima_fit(data, order, filename=None):
 
 	"""
@@ -52,7 +163,8 @@ def arima_fit(data, order, filename=None):
 		Represents the order for the ARIMA
 
 	filename : str, optional; default:None
-		Represents the filename to save the ARIMA model.
+		Represents the filename to save the ARIMA model. A `.json` file gets the
+		compact model (see `compact_arima.CompactARIMA`), any other the pickled results.
 
 	Returns:
 	-------
@@ -63,17 +175,57 @@ def arima_fit(data, order, filename=None):
 	model = ARIMA(data, order=order)
 	model_fit = model.fit()
 	
-	if filename is not None:
+	if filename is not None and filename.endswith(COMPACT_SUFFIX):
+		CompactARIMA.from_results(model_fit).save(filename)
+
+	elif filename is not None:
 		model_fit.save(filename)
 
 	return model_fit
 
 
+@traced()
+def arima_update(model_fit, data):
+
+	"""
+	Function to run a fitted ARIMA model on new (usually extended) data,
+	reusing its fitted state instead of searching the parameters from scratch.
+
+	Parameters:
+	-----------
+	model_fit : statsmodels.tsa.arima_model.ARIMAResults or CompactARIMA
+		Represents the fitted ARIMA model
+
+	data : pandas.Series
+		Represents the data on which the model needs to be applied.
+
+	Returns:
+	-------
+	model_fit : statsmodels.tsa.arima_model.ARIMAResults or CompactARIMA
+		Represents the ARIMA model for the new data. A `CompactARIMA` keeps its
+		parameters and appends the new observations, see `CompactARIMA.append`.
+	"""
+
+	if isinstance(model_fit, CompactARIMA):
+		return model_fit.append(data)
+
+	if hasattr(model_fit, 'apply'):
+		# state-space ARIMA results: only re-run the filter with the fitted parameters
+		return model_fit.apply(data)
+
+	# legacy ARIMA results can't be re-filtered, so warm start the optimizer from the fitted parameters
+	order = (model_fit.k_ar, model_fit.k_diff, model_fit.k_ma)
+	model = ARIMA(data, order=order)
+
+	return model.fit(start_params=model_fit.params, disp=0)
+
+
 def __getnewargs__(self):
 	return ((self.endog), (self.k_lags, self.k_diff, self.k_ma))
 
 
 
+@traced()
 def load_arima(filename):
 
 	"""
@@ -86,14 +238,20 @@ def load_arima(filename):
 
 	Returns:
 	-----------
-	model : statsmodels.tsa.arima_model.ARIMA
-		Represents the ARIMA model
+	model : statsmodels.tsa.arima_model.ARIMA or compact_arima.CompactARIMA
+		Represents the ARIMA model, compact for a `.json` file
 
 	""" 
+	if filename.endswith(COMPACT_SUFFIX):
+		return CompactARIMA.load(filename)
+
 	ARIMA.__getnewargs__ = __getnewargs__
 	model = ARIMAResults.load(filename)
 
+	return model
+
 
+@traced()
 def arima_forecast(model, start, end):
 	return model.predict(start, end, typ='levels')
 
@@ -0,0 +1,288 @@
+import numpy as np
+import pandas as pd
+import json
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import rolling_moving_averages, stationarity_table
+from aggregates import describe_values
+from modelling import find_best_fit, arima_fit, arima_forecast
+
+
+DEFAULT_BUDGET = 256 * 1024 ** 2
+
+
+class TagStore:
+
+	"""
+	Memory-mapped storage of a wide dataset (one tag per column), laid out
+	column-major so that a chunk of columns is a contiguous block of the file.
+
+	Parameters:
+	-----------
+	path : str
+		Represents the directory of the store.
+
+	mode : str, optional; default:'r'
+		Represents the mode of the memory map. Possible values `r` or `r+`
+
+	"""
+	VALUES_FILE = 'values.npy'
+	INDEX_FILE = 'index.npy'
+	COLUMNS_FILE = 'columns.json'
+
+	def __init__(self, path, mode='r'):
+
+		self.path = path
+		self.values = np.load(os.path.join(path, self.VALUES_FILE), mmap_mode=mode)
+		self.index = pd.DatetimeIndex(np.load(os.path.join(path, self.INDEX_FILE)), name='month')
+
+		with open(os.path.join(path, self.COLUMNS_FILE)) as f:
+			self.columns = pd.Index(json.load(f))
+
+	@property
+	def shape(self):
+		return self.values.shape
+
+	@classmethod
+	def create(cls, path, index, columns, dtype=np.float32):
+
+		"""
+		Function to create an empty (all missing) store.
+		"""
+		os.makedirs(path, exist_ok=True)
+
+		values = np.lib.format.open_memmap(os.path.join(path, cls.VALUES_FILE), mode='w+', dtype=dtype,
+			shape=(len(index), len(columns)), fortran_order=True)
+		values[:] = np.nan
+		values.flush()
+		del values
+
+		np.save(os.path.join(path, cls.INDEX_FILE), pd.DatetimeIndex(index).values.astype('datetime64[ns]'))
+		with open(os.path.join(path, cls.COLUMNS_FILE), 'w') as f:
+			json.dump([str(col) for col in columns], f)
+
+		return cls(path, mode='r+')
+
+	@classmethod
+	def from_frame(cls, data, path, dtype=np.float32):
+
+		"""
+		Function to write an in-memory dataset to a store.
+		"""
+		store = cls.create(path, data.index, data.columns, dtype=dtype)
+		store.values[:] = data.to_numpy(dtype=dtype)
+		store.values.flush()
+
+		return store
+
+	@classmethod
+	def from_csv(cls, csv_path, path, date_col='month', date_format='%y-%b', chunksize=1024, dtype=np.float32):
+
+		"""
+		Function to convert a wide CSV file to a store, reading it `chunksize`
+		rows at a time. The rows must be in chronological order.
+		"""
+		dates = pd.read_csv(csv_path, usecols=[date_col])[date_col]
+		index = pd.to_datetime(dates, format=date_format)
+		columns = pd.read_csv(csv_path, nrows=0).columns.drop(date_col)
+
+		store = cls.create(path, index, columns, dtype=dtype)
+
+		start = 0
+		for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+			store.values[start:start + len(chunk)] = chunk[columns].to_numpy(dtype=dtype)
+			start += len(chunk)
+
+		store.values.flush()
+
+		return store
+
+	def chunk_size(self, memory_budget=DEFAULT_BUDGET, copies=4):
+
+		"""
+		Returns the number of columns per chunk so that `copies` float64
+		copies of a chunk fit into the memory budget (in bytes).
+		"""
+		bytes_per_col = max(self.shape[0], 1) * 8 * copies
+		return int(max(1, min(self.shape[1], memory_budget // bytes_per_col)))
+
+	def iter_chunks(self, memory_budget=DEFAULT_BUDGET, copies=4):
+
+		"""
+		Yields the dataset as float64 DataFrames of consecutive columns.
+		"""
+		step = self.chunk_size(memory_budget, copies)
+
+		for start in range(0, self.shape[1], step):
+			stop = min(start + step, self.shape[1])
+			yield pd.DataFrame(np.asarray(self.values[:, start:stop], dtype=np.float64),
+				index=self.index, columns=self.columns[start:stop])
+
+	def frame(self, cols):
+
+		"""
+		Returns the given columns only, as a DataFrame.
+		"""
+		pos = self.columns.get_indexer(cols)
+		if (pos < 0).any():
+			raise KeyError(f'Unknown tags: {list(np.asarray(cols)[pos < 0])}')
+
+		return pd.DataFrame(np.asarray(self.values[:, pos], dtype=np.float64), index=self.index, columns=self.columns[pos])
+
+
+def describe(store, memory_budget=DEFAULT_BUDGET):
+
+	"""
+	Function to compute `pandas.DataFrame.describe` of every tag, chunk by chunk.
+
+	Parameters:
+	-----------
+	store : TagStore
+		Represents the dataset.
+
+	memory_budget : int, optional; default:DEFAULT_BUDGET
+		Represents the memory budget (in bytes) of a chunk.
+
+	Returns:
+	--------
+	res : pandas.DataFrame
+		Represents the summary statistics, one row per tag.
+
+	"""
+	return pd.concat([describe_values(chunk) for chunk in store.iter_chunks(memory_budget)])
+
+
+def missing_percentage(store, memory_budget=DEFAULT_BUDGET):
+
+	"""
+	Function to compute the percentage of missing values of every tag, chunk by chunk.
+	"""
+	res = pd.concat([chunk.isna().mean() * 100 for chunk in store.iter_chunks(memory_budget, copies=2)])
+
+	return pd.DataFrame(res, columns=["Percentage of Data Missing"])
+
+
+def moving_averages(store, out_path, windows=range(3, 11), kind='simple', memory_budget=DEFAULT_BUDGET):
+
+	"""
+	Function to compute the moving averages of every tag, chunk by chunk,
+	writing them to one store per window length.
+
+	Parameters:
+	-----------
+	store : TagStore
+		Represents the dataset.
+
+	out_path : str
+		Represents the directory in which the stores `ma_{win_len}` are written.
+
+	windows : iterable of int, optional; default:range(3, 11)
+		Represents the window lengths, see `rolling_moving_averages`.
+
+	kind : str, optional; default:'simple'
+		Represents the type of the Moving Average, see `rolling_moving_averages`.
+
+	memory_budget : int, optional; default:DEFAULT_BUDGET
+		Represents the memory budget (in bytes) of a chunk.
+
+	Returns:
+	--------
+	stores : dict
+		Represents the store of the moving averages per window length.
+
+	"""
+	windows = list(windows)
+	stores = {w : TagStore.create(os.path.join(out_path, f'ma_{w}'), store.index, store.columns, dtype=store.values.dtype)
+		for w in windows}
+
+	start = 0
+	for chunk in store.iter_chunks(memory_budget, copies=3 + len(windows)):
+		smoothed_vals = rolling_moving_averages(chunk, windows=windows, kind=kind)
+
+		for i, w in enumerate(windows):
+			stores[w].values[:, start:start + chunk.shape[1]] = smoothed_vals[i]
+
+		start += chunk.shape[1]
+
+	for w in windows:
+		stores[w].values.flush()
+
+	return stores
+
+
+def stationarity(store, regs=('c', 'ct'), n_jobs=None, memory_budget=DEFAULT_BUDGET):
+
+	"""
+	Function to run `stationarity_table` on every tag, chunk by chunk.
+	"""
+	return pd.concat([stationarity_table(chunk, regs=regs, n_jobs=n_jobs, use_cache=False)
+		for chunk in store.iter_chunks(memory_budget)])
+
+
+def _forecast_tag(tag, series, horizon, order):
+	try:
+		series = series.dropna()
+		if order is None:
+			order = find_best_fit(series, trace=False)['order']
+
+		model_fit = arima_fit(series, order)
+		forecast_res = np.asarray(arima_forecast(model_fit, len(series), len(series) + horizon - 1)).reshape(-1)
+
+		return tag, order, forecast_res, None
+
+	except Exception as e:
+		return tag, order, np.full(horizon, np.nan), f'{type(e).__name__}: {e}'
+
+
+def forecast(store, horizon=12, orders=None, n_jobs=None, memory_budget=DEFAULT_BUDGET):
+
+	"""
+	Function to forecast every tag with ARIMA, chunk by chunk.
+
+	Parameters:
+	-----------
+	store : TagStore
+		Represents the dataset.
+
+	horizon : int, optional; default:12
+		Represents the number of steps forecasted.
+
+	orders : dict, optional; default:None
+		Represents the ARIMA order per tag, searched with `find_best_fit` for the missing tags.
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None.
+
+	memory_budget : int, optional; default:DEFAULT_BUDGET
+		Represents the memory budget (in bytes) of a chunk.
+
+	Returns:
+	--------
+	forecasts : pandas.DataFrame
+		Represents the forecasts, one row per step and one column per tag.
+
+	info : pandas.DataFrame
+		Represents the order and the error (if any) per tag.
+
+	"""
+	orders = orders or dict()
+	freq = pd.infer_freq(store.index[-3:]) if len(store.index) >= 3 else None
+	future_index = pd.date_range(store.index[-1], periods=horizon + 1, freq=freq)[1:] if freq else pd.RangeIndex(1, horizon + 1)
+
+	forecasts = dict()
+	info = dict()
+
+	with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+		for chunk in store.iter_chunks(memory_budget):
+
+			args = [(col, chunk[col], horizon, orders.get(col)) for col in chunk.columns]
+			for tag, order, forecast_res, error in executor.map(_forecast_tag, *zip(*args)):
+				forecasts[tag] = forecast_res
+				info[tag] = dict(order=order, error=error)
+
+	forecasts = pd.DataFrame(forecasts, index=future_index)[store.columns]
+	info = pd.DataFrame.from_dict(info, orient='index').reindex(store.columns)
+
+	return forecasts, info
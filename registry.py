@@ -0,0 +1,348 @@
+import pandas as pd
+import hashlib
+import json
+import os
+import threading
+import time
+import warnings
+
+from modelling import find_best_fit, arima_fit, load_arima, arima_update
+from compact_arima import CompactARIMA
+from dataset import data_fingerprint
+from tracing import traced
+
+
+class ModelRegistry:
+
+	"""
+	Cache of the best ARIMA orders and the fitted ARIMA models, kept in memory
+	and written through to a directory on disk.
+
+	Orders are keyed by the tag and the fingerprint of the searched data.
+	Models are keyed by the tag, the fingerprint of the training data, the
+	train/test split date and the order.
+
+	Parameters:
+	-----------
+	root : str, optional; default:'./MODELS'
+		Represents the directory in which the models and the index are stored.
+
+	max_entries : int, optional; default:256
+		Represents the maximum number of entries kept, least recently used are evicted first.
+
+	max_bytes : int, optional; default:None
+		Represents the maximum total size (in bytes) of the saved models.
+
+	max_age : float, optional; default:None
+		Represents the maximum age (in seconds) of an entry.
+
+	"""
+	INDEX_FILE = 'registry.json'
+
+	def __init__(self, root='./MODELS', max_entries=256, max_bytes=None, max_age=None):
+
+		self.root = root
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self.max_age = max_age
+
+		self._lock = threading.RLock()
+		self._models = dict()
+
+		os.makedirs(self.root, exist_ok=True)
+		self._index = self._read_index()
+
+	@property
+	def index_path(self):
+		return os.path.join(self.root, self.INDEX_FILE)
+
+	def _read_index(self):
+		if not os.path.exists(self.index_path):
+			return dict()
+
+		try:
+			with open(self.index_path) as f:
+				return json.load(f)
+
+		except (OSError, ValueError):
+			return dict()
+
+	def _write_index(self):
+		tmp_path = f'{self.index_path}.tmp'
+		with open(tmp_path, 'w') as f:
+			json.dump(self._index, f, indent=1)
+
+		os.replace(tmp_path, self.index_path)
+
+	@staticmethod
+	def order_key(tag, fingerprint):
+		return f'order|{tag}|{fingerprint}'
+
+	@staticmethod
+	def model_key(tag, fingerprint, split_date, order):
+		split_date = pd.Timestamp(split_date).strftime('%Y-%m-%d')
+		order = '-'.join(str(o) for o in order)
+		return f'model|{tag}|{fingerprint}|{split_date}|{order}'
+
+	def _touch(self, key):
+		self._index[key]['last_access'] = time.time()
+
+	def _drop(self, key):
+		entry = self._index.pop(key)
+		self._models.pop(key, None)
+
+		if entry.get('filename') and os.path.exists(entry['filename']):
+			os.remove(entry['filename'])
+
+	def evict(self):
+
+		"""
+		Remove the expired entries, then the least recently used ones
+		until the registry fits into its size limits.
+		"""
+		with self._lock:
+			now = time.time()
+
+			if self.max_age is not None:
+				for key in [k for k, v in self._index.items() if now - v['created'] > self.max_age]:
+					self._drop(key)
+
+			lru = sorted(self._index, key=lambda k: self._index[k]['last_access'])
+			total_bytes = sum(v.get('size', 0) for v in self._index.values())
+
+			while lru and ((self.max_entries is not None and len(self._index) > self.max_entries) or
+				(self.max_bytes is not None and total_bytes > self.max_bytes)):
+
+				key = lru.pop(0)
+				total_bytes -= self._index[key].get('size', 0)
+				self._drop(key)
+
+			self._write_index()
+
+	def get_order(self, tag, data):
+
+		"""
+		Returns the cached best parameters of the tag for this data, or None.
+		"""
+		key = self.order_key(tag, data_fingerprint(data))
+
+		with self._lock:
+			if key not in self._index:
+				return None
+
+			self._touch(key)
+			entry = self._index[key]
+
+			return dict(order=tuple(entry['order']), seasonal_order=tuple(entry['seasonal_order']))
+
+	def put_order(self, tag, data, best_params):
+		key = self.order_key(tag, data_fingerprint(data))
+
+		with self._lock:
+			now = time.time()
+			self._index[key] = dict(tag=tag, created=now, last_access=now,
+				order=list(best_params['order']), seasonal_order=list(best_params['seasonal_order']))
+			self.evict()
+
+	def _model_filename(self, tag, key):
+		digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+		return os.path.join(self.root, f'arima_{tag}_{digest}.json')
+
+	def get_model(self, tag, data, split_date, order):
+
+		"""
+		Returns the cached fitted model, loading it from disk
+		if it is not in memory, or None.
+		"""
+		return self._get_model(self.model_key(tag, data_fingerprint(data), split_date, order))
+
+	def _get_model(self, key):
+		with self._lock:
+			if key not in self._index:
+				return None
+
+			if key not in self._models:
+				try:
+					self._models[key] = load_arima(self._index[key]['filename'])
+
+				except (OSError, ValueError, KeyError, EOFError):
+					self._drop(key)
+					self._write_index()
+					return None
+
+			self._touch(key)
+
+			return self._models[key]
+
+	def put_model(self, tag, data, split_date, order, model_fit, filename):
+		key = self.model_key(tag, data_fingerprint(data), split_date, order)
+
+		with self._lock:
+			now = time.time()
+			size = os.path.getsize(filename) if os.path.exists(filename) else 0
+
+			self._index[key] = dict(tag=tag, created=now, last_access=now, filename=filename, size=size,
+				order=list(order), split_date=pd.Timestamp(split_date).strftime('%Y-%m-%d'))
+
+			# a model saved by another process is loaded from its file on the first `get_model`
+			if model_fit is not None:
+				self._models[key] = model_fit
+
+			self.evict()
+
+	@traced()
+	def best_params(self, tag, data, seasonal=False):
+
+		"""
+		Function to find the best set of parameters of a tag,
+		running `find_best_fit` only on a cache miss.
+
+		Parameters:
+		-----------
+		tag : str
+			Represents the name of the tag.
+
+		data : pandas.Series
+			Represents the data on which the ARIMA model needs to be applied.
+
+		seasonal : bool, optional; default:False
+			Represents whether there are any seasonality in the data.
+
+		Returns:
+		--------
+		best_params : dict
+			Represents the best set of orders for the ARIMA model.
+
+		"""
+		best_params = self.get_order(tag, data)
+
+		if best_params is None:
+			best_params = find_best_fit(data, seasonal=seasonal, trace=False)
+			self.put_order(tag, data, best_params)
+
+		return best_params
+
+	@traced()
+	def fit(self, tag, data, split_date, order):
+
+		"""
+		Function to fit the ARIMA model of a tag,
+		running `arima_fit` only on a cache miss.
+
+		Parameters:
+		-----------
+		tag : str
+			Represents the name of the tag.
+
+		data : pandas.Series
+			Represents the training data.
+
+		split_date : datetime-like
+			Represents the train/test split date.
+
+		order : tuple
+			Represents the order for the ARIMA
+
+		Returns:
+		--------
+		model_fit : statsmodels.tsa.arima_model.ARIMAResults
+			Represents the fitted ARIMA model
+
+		"""
+		model_fit = self.get_model(tag, data, split_date, order)
+
+		if model_fit is None:
+			filename = self._model_filename(tag, self.model_key(tag, data_fingerprint(data), split_date, order))
+
+			model_fit = arima_fit(data, order, filename)
+			self.put_model(tag, data, split_date, order, model_fit, filename)
+
+		return model_fit
+
+	def latest_models(self):
+
+		"""
+		Returns the key of the latest model of every tag, by split date then creation time.
+		"""
+		with self._lock:
+			latest = dict()
+			for key, entry in self._index.items():
+				if 'filename' not in entry:
+					continue
+
+				tag = entry['tag']
+				if tag not in latest or (entry['split_date'], entry['created']) > (self._index[latest[tag]]['split_date'], self._index[latest[tag]]['created']):
+					latest[tag] = key
+
+			return latest
+
+	@traced()
+	def update_models(self, data):
+
+		"""
+		Function to update the latest model of every tag of the dataset with its
+		months after the split date, see `modelling.arima_update`. The updated
+		models are saved in the compact format and registered as new entries,
+		keyed by the data up to the last month, which becomes their split date:
+		the files of the earlier entries are left untouched.
+
+		Parameters:
+		-----------
+		data : pandas.DataFrame
+			Represents the dataset, one tag per column.
+
+		Returns:
+		--------
+		updated : list
+			Represents the tags whose model was updated.
+
+		"""
+		split_date = data.index[-1]
+
+		updated = list()
+		for tag, key in self.latest_models().items():
+			with self._lock:
+				entry = self._index.get(key)
+
+			if tag not in data.columns or entry is None or pd.Timestamp(entry['split_date']) >= split_date:
+				continue
+
+			model_fit = self._get_model(key)
+			if model_fit is None:
+				continue
+
+			try:
+				model_fit = arima_update(model_fit, data[tag].dropna())
+
+			except Exception as e:
+				warnings.warn(f'The model of the {tag} tag could not be updated, {type(e).__name__}: {e}')
+				continue
+
+			if not isinstance(model_fit, CompactARIMA):
+				model_fit = CompactARIMA.from_results(model_fit)
+
+			order = tuple(entry['order'])
+			filename = self._model_filename(tag, self.model_key(tag, data_fingerprint(data[tag]), split_date, order))
+
+			model_fit.save(filename)
+			self.put_model(tag, data[tag], split_date, order, model_fit, filename)
+			updated.append(tag)
+
+		return updated
+
+
+_registries = dict()
+_registries_lock = threading.Lock()
+
+
+def get_registry(root='./MODELS', **kwargs):
+
+	"""
+	Returns the process-wide registry of a directory, so that it
+	survives the reruns of the Streamlit script.
+	"""
+	with _registries_lock:
+		if root not in _registries:
+			_registries[root] = ModelRegistry(root, **kwargs)
+
+		return _registries[root]
@@ -0,0 +1,300 @@
+import numpy as np
+import pandas as pd
+import argparse
+import json
+import os
+import threading
+import time
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from modelling import load_arima, arima_forecast
+from compact_arima import CompactARIMA
+from registry import ModelRegistry
+
+
+MAX_HORIZON = 120
+
+
+class UnknownTag(KeyError):
+	pass
+
+
+class _Batch:
+
+	def __init__(self):
+		self.horizon = 0
+		self.size = 0
+		self.result = None
+		self.error = None
+		self.done = threading.Event()
+
+
+class ForecastService:
+
+	"""
+	Forecasts of the tags from the ARIMA models saved in a model directory
+	(see `registry.ModelRegistry`), the latest split of every tag being used.
+
+	Loaded models are kept in a LRU cache, and the concurrent requests for the
+	same tag are micro-batched: the first one waits `batch_window` seconds for
+	the others, then a single prediction up to the longest horizon asked
+	answers all of them.
+
+	Parameters:
+	-----------
+	root : str, optional; default:'./MODELS'
+		Represents the directory of the models and of their index.
+
+	max_models : int, optional; default:32
+		Represents the number of models kept in memory.
+
+	batch_window : float, optional; default:0.005
+		Represents the time (in seconds) a prediction waits for other requests of its tag.
+
+	"""
+	def __init__(self, root='./MODELS', max_models=32, batch_window=0.005):
+
+		self.root = root
+		self.max_models = max_models
+		self.batch_window = batch_window
+
+		self._lock = threading.Lock()
+		self._models = OrderedDict()
+		self._pending = dict()
+
+		self._index = dict()
+		self._index_mtime = None
+
+		self.stats = dict(requests=0, batches=0, loads=0, errors=0)
+
+	def _entries(self):
+
+		"""
+		Returns the latest model entry of every tag, re-reading the index of the registry when it changed on disk.
+		"""
+		path = os.path.join(self.root, ModelRegistry.INDEX_FILE)
+		mtime = os.path.getmtime(path) if os.path.exists(path) else None
+
+		if mtime != self._index_mtime:
+			try:
+				with open(path) as f:
+					index = json.load(f)
+
+			except (OSError, ValueError):
+				index = dict()
+
+			latest = dict()
+			for entry in index.values():
+				if 'filename' not in entry:
+					continue
+
+				key = (entry['split_date'], entry['created'])
+				if entry['tag'] not in latest or key > (latest[entry['tag']]['split_date'], latest[entry['tag']]['created']):
+					latest[entry['tag']] = entry
+
+			self._index, self._index_mtime = latest, mtime
+
+		return self._index
+
+	def tags(self):
+		with self._lock:
+			return sorted(self._entries())
+
+	def model(self, tag):
+
+		"""
+		Returns the fitted model of a tag and its registry entry, loading it with `load_arima` on a cache miss.
+		"""
+		with self._lock:
+			entry = self._entries().get(tag)
+			if entry is None:
+				raise UnknownTag(tag)
+
+			cached = self._models.get(tag)
+			if cached is not None and cached[1]['filename'] == entry['filename']:
+				self._models.move_to_end(tag)
+				return cached
+
+		model_fit = load_arima(entry['filename'])
+
+		with self._lock:
+			self.stats['loads'] += 1
+			self._models[tag] = (model_fit, entry)
+			self._models.move_to_end(tag)
+
+			while len(self._models) > self.max_models:
+				self._models.popitem(last=False)
+
+		return model_fit, entry
+
+	def _predict(self, tag, horizon):
+		model_fit, entry = self.model(tag)
+
+		# the positions are those of the training data, which ends at the split date
+		n_obs = model_fit.n_obs if isinstance(model_fit, CompactARIMA) else len(model_fit.model.data.orig_endog)
+		forecast_res = np.asarray(arima_forecast(model_fit, n_obs, n_obs + horizon - 1)).reshape(-1)
+		dates = pd.date_range(entry['split_date'], periods=horizon + 1, freq='MS')[1:]
+
+		return dict(tag=tag, order=entry['order'], split_date=entry['split_date'],
+			dates=dates.strftime('%Y-%m-%d').tolist(), forecast=forecast_res.tolist())
+
+	def forecast(self, tag, horizon=12):
+
+		"""
+		Function to forecast a tag.
+
+		Parameters:
+		-----------
+		tag : str
+			Represents the name of the tag.
+
+		horizon : int, optional; default:12
+			Represents the number of months forecasted after the split date of the model.
+
+		Returns:
+		--------
+		res : dict
+			Represents the order and split date of the model, the forecast dates and
+			values, and the number of requests answered by the same prediction.
+
+		"""
+		with self._lock:
+			self.stats['requests'] += 1
+			batch = self._pending.get(tag)
+			leader = batch is None
+
+			if leader:
+				batch = _Batch()
+				self._pending[tag] = batch
+
+			batch.horizon = max(batch.horizon, horizon)
+			batch.size += 1
+
+		if leader:
+			time.sleep(self.batch_window)
+
+			# no request joins the batch once its prediction started
+			with self._lock:
+				self._pending.pop(tag, None)
+				self.stats['batches'] += 1
+
+			try:
+				batch.result = self._predict(tag, batch.horizon)
+
+			except Exception as e:
+				batch.error = e
+
+			batch.done.set()
+
+		else:
+			batch.done.wait()
+
+		if batch.error is not None:
+			with self._lock:
+				self.stats['errors'] += 1
+
+			raise batch.error
+
+		res = dict(batch.result, batch_size=batch.size)
+		res['dates'], res['forecast'] = res['dates'][:horizon], res['forecast'][:horizon]
+
+		return res
+
+
+class ForecastHandler(BaseHTTPRequestHandler):
+
+	service = None
+
+	def _send(self, status, body):
+		payload = json.dumps(body).encode()
+
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(payload)))
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def do_GET(self):
+		url = urlparse(self.path)
+		params = {k : v[-1] for k, v in parse_qs(url.query).items()}
+
+		if url.path == '/health':
+			return self._send(200, dict(status='ok'))
+
+		if url.path == '/tags':
+			return self._send(200, dict(tags=self.service.tags()))
+
+		if url.path == '/stats':
+			return self._send(200, dict(self.service.stats, cached_models=len(self.service._models)))
+
+		if url.path != '/forecast':
+			return self._send(404, dict(error=f'unknown path {url.path}'))
+
+		try:
+			tag = params['tag']
+			horizon = int(params.get('horizon', 12))
+			if not 1 <= horizon <= MAX_HORIZON:
+				raise ValueError(f'horizon must be between 1 and {MAX_HORIZON}')
+
+		except (KeyError, ValueError) as e:
+			return self._send(400, dict(error=f'bad request: {e}'))
+
+		try:
+			self._send(200, self.service.forecast(tag, horizon))
+
+		except UnknownTag:
+			self._send(404, dict(error=f'no model for the tag {tag!r}'))
+
+		except Exception as e:
+			self._send(500, dict(error=f'{type(e).__name__}: {e}'))
+
+	def log_message(self, format, *args):
+		if self.server.verbose:
+			super().log_message(format, *args)
+
+
+class ForecastServer(ThreadingHTTPServer):
+
+	# the default listen backlog (5) drops the connections of a burst of clients,
+	# which are then only retried after a second (the SYN retry delay)
+	daemon_threads = True
+	request_queue_size = 128
+
+
+def make_server(service, host='127.0.0.1', port=8502, verbose=False, backlog=128):
+
+	"""
+	Returns the HTTP server of a `ForecastService`, one thread per connection,
+	queueing up to `backlog` connections not yet accepted.
+	"""
+	handler = type('Handler', (ForecastHandler,), dict(service=service))
+	server = type('Server', (ForecastServer,), dict(request_queue_size=backlog))((host, port), handler)
+	server.verbose = verbose
+
+	return server
+
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description='Serve the forecasts of the saved ARIMA models over HTTP')
+	parser.add_argument('--models', default='./MODELS', help='directory of the models')
+	parser.add_argument('--host', default='127.0.0.1', help='address to listen on')
+	parser.add_argument('--port', type=int, default=8502, help='port to listen on')
+	parser.add_argument('--max-models', type=int, default=32, help='number of models kept in memory')
+	parser.add_argument('--batch-window', type=float, default=0.005, help='seconds a prediction waits for other requests of its tag')
+	parser.add_argument('--backlog', type=int, default=128, help='number of connections queued before being accepted')
+	parser.add_argument('--verbose', action='store_true', help='log every request')
+	args = parser.parse_args()
+
+	service = ForecastService(args.models, max_models=args.max_models, batch_window=args.batch_window)
+	server = make_server(service, args.host, args.port, verbose=args.verbose, backlog=args.backlog)
+
+	print(f'Serving the forecasts of {len(service.tags())} tags on http://{args.host}:{args.port}/forecast?tag=...&horizon=...')
+	try:
+		server.serve_forever()
+
+	except KeyboardInterrupt:
+		server.server_close()
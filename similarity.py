@@ -0,0 +1,393 @@
+import numpy as np
+import pandas as pd
+import threading
+import warnings
+
+from collections import OrderedDict
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+from dataset import data_fingerprint
+from tracing import traced
+
+
+METHODS = ('correlation', 'dtw')
+
+
+def znormalize(values, min_periods=12):
+
+	"""
+	Function to z-normalize every column of the values, ignoring the missing values.
+
+	Parameters:
+	-----------
+	values : numpy.ndarray
+		Represents the values, one tag per column.
+
+	min_periods : int, optional; default:12
+		Represents the minimum number of observed values of a column to be normalized.
+
+	Returns:
+	--------
+	z : numpy.ndarray
+		Represents the normalized values, the missing ones set to 0 (the mean).
+
+	valid : numpy.ndarray
+		Represents whether every column has at least `min_periods` observed values and is not constant.
+
+	"""
+	count = (~np.isnan(values)).sum(axis=0)
+
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore', RuntimeWarning)
+		mean = np.nanmean(values, axis=0)
+		std = np.nanstd(values, axis=0)
+
+	valid = (count >= max(min_periods, 2)) & (std > 0)
+	std = np.where(valid, std, np.inf)
+
+	return np.nan_to_num((values - mean) / std), valid
+
+
+def envelope(z, radius):
+
+	"""
+	Returns the upper and lower envelopes of every column, the maximum and the minimum within `radius` rows.
+	"""
+	size = 2 * radius + 1
+	return maximum_filter1d(z, size, axis=0, mode='nearest'), minimum_filter1d(z, size, axis=0, mode='nearest')
+
+
+def lb_keogh(upper, lower, candidates):
+
+	"""
+	Function to compute the LB_Keogh lower bound of the DTW distance between
+	the series of the envelope and every candidate.
+
+	Parameters:
+	-----------
+	upper, lower : numpy.ndarray
+		Represents the envelope, of shape (n,) or (n, k).
+
+	candidates : numpy.ndarray
+		Represents the candidates, of shape (n, k) (or (n, 1) with a (n, k) envelope).
+
+	Returns:
+	--------
+	lb : numpy.ndarray
+		Represents the lower bound of every candidate.
+
+	"""
+	if np.ndim(upper) == 1:
+		upper, lower = upper[:, None], lower[:, None]
+
+	above = np.clip(candidates - upper, 0, None)
+	below = np.clip(lower - candidates, 0, None)
+
+	return np.sqrt((above ** 2 + below ** 2).sum(axis=0))
+
+
+def dtw_distances(query, candidates, radius):
+
+	"""
+	Function to compute the DTW distance (with a Sakoe-Chiba band) between
+	the query and every candidate, vectorized over the candidates.
+
+	Parameters:
+	-----------
+	query : numpy.ndarray
+		Represents the query, of shape (n,).
+
+	candidates : numpy.ndarray
+		Represents the candidates, of shape (n, k).
+
+	radius : int
+		Represents the maximum shift (in rows) of the warping path.
+
+	Returns:
+	--------
+	dist : numpy.ndarray
+		Represents the square root of the sum of the squared differences along the best path, per candidate.
+
+	"""
+	n, k = candidates.shape
+
+	prev = np.full((n + 1, k), np.inf)
+	prev[0] = 0.
+
+	for i in range(1, n + 1):
+		lo, hi = max(1, i - radius), min(n, i + radius)
+		cost = (query[i - 1] - candidates[lo - 1:hi]) ** 2
+
+		cur = np.full((n + 1, k), np.inf)
+		cur[lo:hi + 1] = np.minimum(prev[lo - 1:hi], prev[lo:hi + 1]) + cost
+
+		# the horizontal moves depend on the previous cell of the row
+		for j in range(lo + 1, hi + 1):
+			np.minimum(cur[j], cur[j - 1] + cost[j - lo], out=cur[j])
+
+		prev = cur
+
+	return np.sqrt(prev[n])
+
+
+def dtw_top_k(query, candidates, k=10, radius=6, lower_bounds=None, batch_size=64):
+
+	"""
+	Function to find the `k` candidates the closest to the query by DTW distance.
+	The candidates are visited in increasing order of their lower bound, by batches,
+	and the search stops as soon as no lower bound is below the k-th best distance.
+
+	Parameters:
+	-----------
+	query : numpy.ndarray
+		Represents the query, of shape (n,).
+
+	candidates : numpy.ndarray
+		Represents the candidates, of shape (n, m).
+
+	k : int, optional; default:10
+		Represents the number of candidates returned.
+
+	radius : int, optional; default:6
+		Represents the maximum shift (in rows) of the warping path.
+
+	lower_bounds : numpy.ndarray, optional; default:None
+		Represents a lower bound of the distance of every candidate. LB_Keogh when None.
+
+	batch_size : int, optional; default:64
+		Represents the number of exact distances computed at once.
+
+	Returns:
+	--------
+	idx : numpy.ndarray
+		Represents the positions of the closest candidates, closest first.
+
+	dist : numpy.ndarray
+		Represents their distances.
+
+	n_computed : int
+		Represents the number of exact distances computed.
+
+	"""
+	if lower_bounds is None:
+		upper, lower = envelope(query[:, None], radius)
+		lower_bounds = lb_keogh(upper, lower, candidates)
+
+	order = np.argsort(lower_bounds, kind='stable')
+	best_idx, best_dist = np.empty(0, dtype=int), np.empty(0)
+	threshold, n_computed = np.inf, 0
+
+	for b in range(0, len(order), max(batch_size, k)):
+		batch = order[b:b + max(batch_size, k)]
+		batch = batch[lower_bounds[batch] < threshold]
+
+		if not len(batch):
+			break
+
+		dist = dtw_distances(query, candidates[:, batch], radius)
+		n_computed += len(batch)
+
+		best_idx, best_dist = np.r_[best_idx, batch], np.r_[best_dist, dist]
+		keep = np.argsort(best_dist, kind='stable')[:k]
+		best_idx, best_dist = best_idx[keep], best_dist[keep]
+
+		if len(best_dist) == k:
+			threshold = best_dist[-1]
+
+	return best_idx, best_dist, n_computed
+
+
+class SimilarityIndex:
+
+	"""
+	Index of the tags of a dataset for the similar tags searches, by correlation
+	or DTW distance of their z-normalized trajectories over a date range.
+
+	The normalized values and their DTW envelopes are computed once per date
+	range (the last `max_ranges` ranges are kept), so that a query only costs
+	a few matrix-vector products for the correlations (over the months both
+	tags are observed), or the vectorized LB_Keogh bounds and the exact
+	distances of the candidates they do not prune for DTW. DTW compares the
+	missing months as the mean of their tag.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	radius : int, optional; default:6
+		Represents the maximum shift (in months) of the DTW warping paths.
+
+	min_periods : int, optional; default:12
+		Represents the minimum number of observed months of a tag in the range to be compared.
+
+	max_ranges : int, optional; default:8
+		Represents the number of date ranges kept.
+
+	"""
+	def __init__(self, data, radius=6, min_periods=12, max_ranges=8):
+
+		self.index = data.index
+		self.columns = data.columns
+		self.values = data.to_numpy(dtype=np.float64)
+
+		self.radius = radius
+		self.min_periods = min_periods
+		self.max_ranges = max_ranges
+
+		self._positions = {col : i for i, col in enumerate(self.columns)}
+		self._ranges = OrderedDict()
+		self._lock = threading.Lock()
+
+	def _bounds(self, start, end):
+		first = 0 if start is None else self.index.searchsorted(pd.Timestamp(start), side='left')
+		last = len(self.index) if end is None else self.index.searchsorted(pd.Timestamp(end), side='right')
+
+		return int(first), int(last)
+
+	def _range(self, start, end):
+
+		"""
+		Returns the normalized values, their validity and their DTW envelopes between `start` and `end`.
+		"""
+		key = self._bounds(start, end)
+
+		with self._lock:
+			if key in self._ranges:
+				self._ranges.move_to_end(key)
+				return self._ranges[key]
+
+		values = self.values[key[0]:key[1]]
+		z, valid = znormalize(values, self.min_periods)
+		res = dict(z=z, valid=valid, mask=(~np.isnan(values)).astype(np.float64), envelope=None)
+
+		with self._lock:
+			self._ranges[key] = res
+			while len(self._ranges) > self.max_ranges:
+				self._ranges.popitem(last=False)
+
+		return res
+
+	def _envelope(self, res):
+		if res['envelope'] is None:
+			res['envelope'] = envelope(res['z'], self.radius)
+
+		return res['envelope']
+
+	def _query_position(self, tag, res):
+		pos = self._positions[tag]
+
+		if not res['valid'][pos]:
+			raise ValueError(f'The {tag} tag has fewer than {self.min_periods} observed months in the range, or is constant')
+
+		return pos
+
+	def normalized(self, cols, start=None, end=None):
+
+		"""
+		Returns the z-normalized values of the tags between `start` and `end`, the missing values kept missing.
+		"""
+		first, last = self._bounds(start, end)
+		pos = [self._positions[col] for col in cols]
+
+		z = self._range(start, end)['z'][:, pos]
+		z = np.where(np.isnan(self.values[first:last, pos]), np.nan, z)
+
+		return pd.DataFrame(z, index=self.index[first:last], columns=list(cols))
+
+	def correlations(self, tag, start=None, end=None):
+
+		"""
+		Returns the (Pearson) correlation of the tag with every other tag between `start` and `end`,
+		over the months both observed. NaN for the tags not compared, or observed together
+		for fewer than `min_periods` months.
+		"""
+		res = self._range(start, end)
+		pos = self._query_position(tag, res)
+
+		# the sums over the months both observed, one matrix-vector product each (the missing values of z are 0)
+		z, mask = res['z'], res['mask']
+		query, query_mask = z[:, pos], mask[:, pos]
+
+		n = mask.T @ query_mask
+		sx, sy = z.T @ query_mask, mask.T @ query
+		sxx, syy, sxy = (z ** 2).T @ query_mask, mask.T @ query ** 2, z.T @ query
+
+		with np.errstate(invalid='ignore', divide='ignore'):
+			corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx ** 2) * (n * syy - sy ** 2))
+
+		corr[~res['valid'] | (n < max(self.min_periods, 2))] = np.nan
+		corr[pos] = np.nan
+
+		return pd.Series(corr, index=self.columns, name='Correlation')
+
+	def query(self, tag, k=10, method='correlation', start=None, end=None):
+
+		"""
+		Function to find the tags with the most similar trajectories to a tag.
+
+		Parameters:
+		-----------
+		tag : str
+			Represents the name of the tag.
+
+		k : int, optional; default:10
+			Represents the number of tags returned.
+
+		method : str, optional; default:'correlation'
+			Represents the similarity. Possible values `correlation` (highest first)
+			or `dtw` (smallest distance first)
+
+		start, end : datetime-like, optional; default:None
+			Represents the date range compared, the whole dataset when None.
+
+		Returns:
+		--------
+		res : pandas.Series
+			Represents the correlations or the DTW distances of the top-k tags.
+
+		"""
+		if method not in METHODS:
+			raise ValueError(f'Unknown similarity {method!r}, possible values {METHODS}')
+
+		if method == 'correlation':
+			corr = self.correlations(tag, start, end).dropna()
+			return corr.iloc[np.argsort(-corr.values, kind='stable')[:k]]
+
+		res = self._range(start, end)
+		pos = self._query_position(tag, res)
+		upper, lower = self._envelope(res)
+
+		candidates = np.flatnonzero(res['valid'])
+		candidates = candidates[candidates != pos]
+
+		z, query = res['z'][:, candidates], res['z'][:, pos]
+
+		# both LB_Keogh bounds are valid, the envelope of the query against the candidates and the reverse
+		lower_bounds = np.maximum(lb_keogh(upper[:, pos], lower[:, pos], z),
+			lb_keogh(upper[:, candidates], lower[:, candidates], query[:, None]))
+
+		idx, dist, _ = dtw_top_k(query, z, k=k, radius=self.radius, lower_bounds=lower_bounds)
+
+		return pd.Series(dist, index=self.columns[candidates[idx]], name='DTW Distance')
+
+
+_index_cache = dict()
+_index_lock = threading.Lock()
+
+
+@traced()
+def similarity_index(data, radius=6, min_periods=12):
+
+	"""
+	Returns the `SimilarityIndex` of a dataset, cached per dataset.
+	"""
+	# the fingerprint ignores the column names
+	key = (tuple(data.columns), data_fingerprint(data), radius, min_periods)
+
+	with _index_lock:
+		if key not in _index_cache:
+			_index_cache.clear()
+			_index_cache[key] = SimilarityIndex(data, radius=radius, min_periods=min_periods)
+
+		return _index_cache[key]
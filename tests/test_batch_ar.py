@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+from statsmodels.tsa.ar_model import AutoReg
+
+from batch_ar import batch_ar_fit, batch_ar_forecast
+
+
+def _data(n_rows=132, n_cols=4, seed=0):
+	rng = np.random.default_rng(seed)
+	values = 1000 + rng.normal(2, 10, size=(n_rows, n_cols)).cumsum(axis=0)
+
+	return pd.DataFrame(values, index=pd.date_range('2009-01-01', periods=n_rows, freq='MS'),
+		columns=[f'tag_{i}' for i in range(n_cols)])
+
+
+@pytest.mark.parametrize('order', [(12, 1), (3, 1), (2, 0)])
+def test_matches_autoreg(order):
+	p, d = order
+
+	# the levels are a random walk, the models without differencing are checked on a stationary series
+	data = _data() if d else _data().diff().iloc[1:]
+	model = batch_ar_fit(data, order=order)
+	forecasts = batch_ar_forecast(model, len(data), len(data) + 11)
+
+	for i, col in enumerate(data.columns):
+		series = data[col].diff(d).iloc[d:] if d else data[col]
+		expected = AutoReg(series.to_numpy(), lags=p, trend='c').fit()
+
+		np.testing.assert_allclose(model.params[i], expected.params, rtol=1e-5, atol=1e-6)
+
+		expected_forecast = expected.forecast(12)
+		if d:
+			expected_forecast = data[col].iloc[-1] + np.cumsum(expected_forecast)
+
+		np.testing.assert_allclose(forecasts[col].to_numpy(), expected_forecast, rtol=1e-6)
+
+
+def test_in_sample_predictions_match_autoreg():
+	data = _data()
+	model = batch_ar_fit(data, order=(3, 1))
+	predictions = batch_ar_forecast(model, 10, len(data) - 1)
+
+	for col in data.columns:
+		expected = AutoReg(data[col].diff().iloc[1:].to_numpy(), lags=3, trend='c').fit().fittedvalues
+		expected = data[col].shift(1).iloc[4:].to_numpy() + expected
+
+		np.testing.assert_allclose(predictions[col].to_numpy(), expected[10 - 4:], rtol=1e-6)
+
+
+def test_gaps_are_left_out_of_the_fit():
+	data = _data()
+	data.iloc[50:53, 0] = np.nan
+	data.iloc[:124, 1] = np.nan
+	p, d = 3, 1
+
+	model = batch_ar_fit(data, order=(p, d))
+
+	# ordinary least squares over the periods whose target and lags are all observed
+	diffed = data['tag_0'].diff().to_numpy()[1:]
+	rows = np.lib.stride_tricks.sliding_window_view(diffed, p + 1)
+	rows = rows[np.isfinite(rows).all(axis=1)]
+	design = np.column_stack([np.ones(len(rows)), rows[:, -2::-1]])
+	expected = np.linalg.lstsq(design, rows[:, -1], rcond=None)[0]
+
+	np.testing.assert_allclose(model.params[0], expected, rtol=1e-5, atol=1e-6)
+
+	# 4 usable periods are too few for 4 parameters
+	assert np.isnan(model.params[1]).all()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import warnings
+
+import pytest
+
+from statsmodels.tsa.arima.model import ARIMA
+
+from compact_arima import CompactARIMA
+
+
+ORDERS = [(1, 1, 1), (2, 1, 0), (0, 1, 1), (1, 0, 1), (2, 2, 1)]
+
+
+def _series(n_rows=132, seed=0, d=1):
+
+	# integrated `d` times, so that the MA part of the fit is not close to a unit root
+	values = np.random.default_rng(seed).normal(2, 10, n_rows)
+	for _ in range(max(d, 1)):
+		values = values.cumsum()
+
+	return pd.Series(1000 + values, index=pd.date_range('2009-01-01', periods=n_rows, freq='MS'), name='tag')
+
+
+def _fit(series, order):
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore')
+		return ARIMA(series, order=order).fit()
+
+
+@pytest.mark.parametrize('order', ORDERS)
+def test_forecast_matches_state_space(order):
+	series = _series(d=order[1])
+	model_fit = _fit(series, order)
+	model = CompactARIMA.from_results(model_fit)
+
+	np.testing.assert_allclose(model.forecast(12), model_fit.forecast(12).to_numpy(), rtol=1e-6)
+
+
+@pytest.mark.parametrize('order', ORDERS)
+def test_predict_matches_state_space(order):
+	series = _series(d=order[1])
+	model_fit = _fit(series, order)
+	model = CompactARIMA.from_results(model_fit, n_tail=6)
+
+	# the last in-sample predictions and the forecasts, by position and by date
+	start, end = len(series) - 6, len(series) + 11
+	expected = model_fit.predict(start, end).to_numpy()
+
+	np.testing.assert_allclose(np.asarray(model.predict(start, end)), expected, rtol=1e-6)
+	np.testing.assert_allclose(np.asarray(model.predict(series.index[start], pd.Timestamp('2020-12-01'))), expected, rtol=1e-6)
+
+	with pytest.raises(ValueError):
+		model.predict(start - 1, end)
+
+
+@pytest.mark.parametrize('order', ORDERS)
+def test_append_matches_apply(order):
+	series = _series(d=order[1])
+	model_fit = _fit(series.iloc[:100], order)
+
+	model = CompactARIMA.from_results(model_fit).append(series)
+	expected = model_fit.apply(series)
+
+	assert model.n_obs == len(series)
+	assert model.last_date == series.index[-1]
+	np.testing.assert_allclose(model.forecast(12), expected.forecast(12).to_numpy(), rtol=1e-6)
+
+
+def test_append_by_position_and_nothing_new():
+	series = _series()
+	model_fit = _fit(series.iloc[:100], (1, 1, 1))
+	model = CompactARIMA.from_results(model_fit)
+
+	positional = CompactARIMA.from_results(_fit(series.iloc[:100].reset_index(drop=True), (1, 1, 1)))
+	np.testing.assert_allclose(positional.append(series.reset_index(drop=True)).forecast(6), model.append(series).forecast(6), rtol=1e-9)
+
+	unchanged = model.append(series.iloc[:100])
+	assert unchanged.n_obs == model.n_obs
+	np.testing.assert_array_equal(unchanged.forecast(6), model.forecast(6))
+
+
+def test_save_and_load(tmp_path):
+	model = CompactARIMA.from_results(_fit(_series(), (2, 1, 1)), n_tail=3)
+	filename = str(tmp_path / 'model.json')
+
+	model.save(filename)
+	loaded = CompactARIMA.load(filename)
+
+	assert loaded.order == model.order and loaded.n_obs == model.n_obs and loaded.last_date == model.last_date
+	np.testing.assert_array_equal(loaded.forecast(12), model.forecast(12))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+from scipy.integrate import trapezoid
+from scipy.stats import gaussian_kde
+
+from distributions import bandwidths, kde_matrix, histogram_matrix, tag_distributions
+
+
+def _values(n_rows=132, seed=0):
+	rng = np.random.default_rng(seed)
+	values = np.column_stack([rng.normal(100, 15, n_rows), rng.lognormal(3, 0.8, n_rows),
+		np.r_[rng.normal(0, 1, n_rows // 2), rng.normal(8, 2, n_rows - n_rows // 2)], rng.poisson(4, n_rows).astype(np.float64)])
+
+	values[:30, 1] = np.nan
+	return values
+
+
+@pytest.mark.parametrize('method', ['scott', 'silverman'])
+def test_kde_matches_gaussian_kde(method):
+	values = _values()
+	grid, density, bw = kde_matrix(values, n_grid=1024, method=method)
+
+	np.testing.assert_allclose(bw, bandwidths(values, method=method))
+
+	for i in range(values.shape[1]):
+		col = values[:, i][~np.isnan(values[:, i])]
+		expected = gaussian_kde(col, bw_method=bw[i] / col.std(ddof=1))(grid[:, i])
+
+		# the binning error is of the order of the square of the grid step over the bandwidth
+		np.testing.assert_allclose(density[:, i], expected, atol=2e-3 * expected.max())
+		assert abs(trapezoid(density[:, i], grid[:, i]) - 1) < 1e-3
+
+
+def test_kde_of_empty_and_constant_columns():
+	values = np.column_stack([np.full(20, np.nan), np.full(20, 3.)])
+	grid, density, bw = kde_matrix(values)
+
+	assert np.isnan(density[:, 0]).all()
+	# a single Gaussian, cut 3 bandwidths away
+	assert np.isfinite(density[:, 1]).all() and abs(trapezoid(density[:, 1], grid[:, 1]) - 0.9973) < 1e-3
+
+
+def test_histograms_match_numpy():
+	values = _values()
+	edges, density, n_bins = histogram_matrix(values)
+
+	for i in range(values.shape[1]):
+		col = values[:, i][~np.isnan(values[:, i])]
+		expected, expected_edges = np.histogram(col, bins=n_bins[i], density=True)
+
+		np.testing.assert_allclose(edges[:n_bins[i] + 1, i], expected_edges, rtol=1e-12)
+		np.testing.assert_allclose(density[:n_bins[i], i], expected, rtol=1e-9)
+		assert np.isnan(density[n_bins[i]:, i]).all()
+
+		# the Freedman-Diaconis number of bins of numpy
+		assert n_bins[i] == min(len(np.histogram_bin_edges(col, bins='fd')) - 1, 50)
+
+
+def test_tag_distributions_are_cached_per_tag():
+	data = pd.DataFrame(_values(), columns=list('abcd'))
+
+	first = tag_distributions(data, ['a', 'b'])
+	res = tag_distributions(data, ['b', 'c'])
+
+	assert res['b'] is first['b']
+	np.testing.assert_allclose(res['c']['density'], kde_matrix(data[['c']].to_numpy())[1][:, 0])
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+from dataset import DATE_FORMAT, load_dataset, data_fingerprint
+from ingest import DerivedState, append_rows, load_state, validate_rows
+
+
+def _data(n_rows=132, n_cols=6, seed=0):
+	rng = np.random.default_rng(seed)
+	values = rng.poisson(rng.uniform(50, 500, n_cols), size=(n_rows, n_cols)).astype(np.float64)
+
+	# a tag starting late, and a few missing months
+	values[:30, 1] = np.nan
+	values[[40, 41, 100, 125], 2] = np.nan
+
+	# a shift within the appended months
+	values[124:, 3] *= 4
+
+	return pd.DataFrame(values, index=pd.date_range('2009-01-01', periods=n_rows, freq='MS', name='month'),
+		columns=[f'tag_{i}' for i in range(n_cols)])
+
+
+def _write_csv(data, path):
+	out = data.copy()
+	out.insert(0, 'month', out.index.strftime(DATE_FORMAT))
+	out.to_csv(path, index=False)
+
+
+def _rows(data):
+	out = data.copy()
+	out.insert(0, 'month', out.index.strftime(DATE_FORMAT))
+	return out.reset_index(drop=True)
+
+
+def _assert_states_equal(state, expected):
+	assert state.fingerprint == expected.fingerprint
+	assert list(state.columns) == list(expected.columns)
+
+	for period, tables in expected.aggregates.periods.items():
+		for stat, table in tables.items():
+			pd.testing.assert_frame_equal(state.aggregates.periods[period][stat], table, check_dtype=False, check_freq=False)
+
+	pd.testing.assert_frame_equal(state.aggregates.summary, expected.aggregates.summary, check_dtype=False)
+	assert state.aggregates.n_rows == expected.aggregates.n_rows
+
+	for w, table in expected.moving_averages.items():
+		pd.testing.assert_frame_equal(state.moving_averages[w], table, check_dtype=False, check_freq=False, rtol=1e-9)
+
+	pd.testing.assert_frame_equal(state.tail, expected.tail, check_dtype=False, check_freq=False)
+
+	detector, expected_detector = state.changepoints, expected.changepoints
+	for attr in ('level', 'slope', 'seasonal', 'var', 'pos', 'neg', 'count'):
+		np.testing.assert_allclose(getattr(detector, attr), getattr(expected_detector, attr), rtol=1e-9, equal_nan=True)
+
+	assert detector.last_month == expected_detector.last_month
+	pd.testing.assert_frame_equal(detector.alerts_frame(), expected_detector.alerts_frame())
+
+
+@pytest.mark.parametrize('batches', [[120, 132], [100, 101, 120, 132]])
+def test_append_rows_matches_rebuild(tmp_path, batches):
+	data = _data()
+	path, state_path = str(tmp_path / 'data.csv'), str(tmp_path / 'state.pkl')
+
+	_write_csv(data.iloc[:batches[0]], path)
+	load_state(load_dataset(path), state_path)
+
+	for start, end in zip(batches[:-1], batches[1:]):
+		res, state = append_rows(_rows(data.iloc[start:end]), path=path, state_path=state_path, models_root=None)
+
+	pd.testing.assert_frame_equal(res, load_dataset(path), check_freq=False)
+	pd.testing.assert_frame_equal(res, data, check_dtype=False, check_freq=False)
+
+	_assert_states_equal(state, DerivedState(res))
+
+	# the saved state is the updated one
+	assert load_state(res, state_path).fingerprint == data_fingerprint(res)
+
+
+def test_append_rows_raises_the_changepoint_of_the_new_months(tmp_path):
+	data = _data()
+	path, state_path = str(tmp_path / 'data.csv'), str(tmp_path / 'state.pkl')
+
+	_write_csv(data.iloc[:120], path)
+	_, state = append_rows(_rows(data.iloc[120:]), path=path, state_path=state_path, models_root=None)
+
+	alerts = state.changepoints.alerts_frame(kinds=['changepoint'], since=data.index[120])
+	assert 'tag_3' in set(alerts['tag'])
+
+
+def test_validate_rows_rejects_bad_rows():
+	data = _data().iloc[:120]
+	new_rows = _data().iloc[120:]
+
+	with pytest.raises(ValueError):
+		validate_rows(data, new_rows.drop(columns='tag_0'))
+
+	with pytest.raises(ValueError):
+		validate_rows(data, _data().iloc[110:125])
+
+	with pytest.raises(ValueError):
+		validate_rows(data, new_rows * -1)
+
+	pd.testing.assert_frame_equal(validate_rows(data, _rows(new_rows)), new_rows, check_freq=False)
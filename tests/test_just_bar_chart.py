@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import functools
+import shutil
+import subprocess
+
+import pytest
+
+bcr = pytest.importorskip('bar_chart_race')
+jbc = pytest.importorskip('just_bar_chart')
+
+
+def _race_data():
+	rng = np.random.default_rng(0)
+	values = rng.integers(0, 100, size=(6, 8)).cumsum(axis=0).astype(np.float64)
+	return pd.DataFrame(values, index=pd.date_range('2019-01-01', periods=6, freq='MS'), columns=[f'tag_{i}' for i in range(8)])
+
+
+RACE_KWARGS = dict(n_bars=5, steps_per_period=3, period_length=300, figsize=(4, 3), dpi=72)
+
+
+def _decoded_frames(filename):
+	return subprocess.run(['ffmpeg', '-v', 'error', '-i', str(filename), '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-'],
+		check=True, capture_output=True).stdout
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='ffmpeg is not installed')
+def test_parallel_frames_match_serial(tmp_path):
+	df = _race_data()
+
+	bcr.bar_chart_race(df, str(tmp_path / 'serial.mp4'), **RACE_KWARGS)
+	jbc.parallel_bar_chart_race(df, str(tmp_path / 'parallel.mp4'), n_jobs=2, chunk_size=4, **RACE_KWARGS)
+
+	serial = _decoded_frames(tmp_path / 'serial.mp4')
+	assert len(serial)
+	assert _decoded_frames(tmp_path / 'parallel.mp4') == serial
+
+
+def test_falls_back_without_private_api(monkeypatch, tmp_path):
+	calls = list()
+	serial = bcr.bar_chart_race
+
+	@functools.wraps(serial)
+	def recorder(*args, **kwargs):
+		calls.append(kwargs)
+
+	monkeypatch.setattr(jbc.bcr, 'bar_chart_race', recorder)
+	monkeypatch.setattr(jbc, '_BarChartRace', None)
+
+	filename = str(tmp_path / 'race.mp4')
+	jbc.parallel_bar_chart_race(_race_data(), filename, **RACE_KWARGS)
+
+	assert len(calls) == 1
+	assert calls[0]['filename'] == filename and calls[0]['n_bars'] == 5
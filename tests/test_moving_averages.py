@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+from utils import rolling_moving_averages, apply_moving_average_filter, MovingAverageFilter
+
+
+WINDOWS = range(3, 11)
+
+
+def _data(n_rows=120, n_cols=6, seed=0):
+	rng = np.random.default_rng(seed)
+	data = pd.DataFrame(rng.normal(100, 20, size=(n_rows, n_cols)).cumsum(axis=0))
+
+	# leading, inner and trailing gaps
+	data.iloc[:5, 1] = np.nan
+	data.iloc[40:43, 2] = np.nan
+	data.iloc[-2:, 3] = np.nan
+
+	return data
+
+
+def _pandas_moving_averages(data, win_len, kind):
+	if kind == 'simple':
+		return data.rolling(win_len).mean()
+
+	if kind == 'weighted':
+		weights = np.arange(1, win_len + 1, dtype=np.float64)
+		return data.rolling(win_len).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+
+	# the recursion runs over the gaps filled forward, the rows whose window holds a gap are NaN
+	res = data.ffill().bfill().ewm(span=win_len, adjust=False).mean()
+	return res.where(data.rolling(win_len).count() == win_len)
+
+
+@pytest.mark.parametrize('kind', ['simple', 'weighted', 'exponential'])
+def test_matches_pandas(kind):
+	data = _data()
+	smoothed_vals = rolling_moving_averages(data, windows=WINDOWS, kind=kind)
+
+	assert smoothed_vals.shape == (len(WINDOWS),) + data.shape
+
+	for i, win_len in enumerate(WINDOWS):
+		expected = _pandas_moving_averages(data, win_len, kind).to_numpy()
+		np.testing.assert_allclose(smoothed_vals[i], expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_window_longer_than_data():
+	smoothed_vals = rolling_moving_averages(np.arange(4.), windows=[5])
+	assert np.isnan(smoothed_vals).all()
+
+
+def test_filter_wrapper_matches_streaming_filter():
+	values = _data()[0].tolist()
+
+	expected = list()
+	ma_filter = MovingAverageFilter(5)
+	for x in values:
+		ma_filter.step(x)
+		expected.append(ma_filter.current_state())
+
+	res = apply_moving_average_filter(values, win_len=5)
+
+	assert np.isnan(res[:4]).all()
+	np.testing.assert_allclose(res[4:], expected[4:], rtol=1e-9)
+
+
+def test_rejects_unknown_kind():
+	with pytest.raises(ValueError):
+		rolling_moving_averages(np.arange(10.), kind='median')
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+from statsmodels.tsa.seasonal import seasonal_decompose
+from statsmodels.tsa.stattools import acf
+
+from utils import acf_matrix, decompose_matrix, seasonal_strength, precompute_profiles
+
+
+def _data(n_rows=132, n_cols=5, seed=0):
+	rng = np.random.default_rng(seed)
+	months = np.arange(n_rows)
+	season = 20 * np.sin(2 * np.pi * months / 12)[:, None]
+	values = 500 + rng.normal(0, 10, size=(n_rows, n_cols)).cumsum(axis=0) + season * rng.uniform(0, 2, size=n_cols)
+
+	return pd.DataFrame(values, index=pd.date_range('2009-01-01', periods=n_rows, freq='MS'),
+		columns=[f'tag_{i}' for i in range(n_cols)])
+
+
+def test_acf_matches_statsmodels():
+	data = _data()
+	res = acf_matrix(data, nlags=40)
+
+	for col in data.columns:
+		np.testing.assert_allclose(res[col].to_numpy(), acf(data[col], nlags=40, fft=True), rtol=1e-9, atol=1e-12)
+
+
+def test_acf_with_gaps_matches_statsmodels_conservative():
+	data = _data()
+	data.iloc[10:14, 0] = np.nan
+	data.iloc[:7, 1] = np.nan
+
+	res = acf_matrix(data, nlags=24)
+
+	for col in data.columns[:2]:
+		expected = acf(data[col], nlags=24, fft=True, missing='conservative')
+		np.testing.assert_allclose(res[col].to_numpy(), expected, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize('period', [12, 7])
+def test_decomposition_matches_statsmodels(period):
+	data = _data()
+	res = decompose_matrix(data, period=period)
+
+	for col in data.columns:
+		expected = seasonal_decompose(data[col], model='additive', period=period)
+
+		for name in ('trend', 'seasonal', 'resid'):
+			np.testing.assert_allclose(res[name][col].to_numpy(), getattr(expected, name).to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_seasonal_strength_orders_tags():
+	rng = np.random.default_rng(1)
+	months = np.arange(132)
+	data = pd.DataFrame(dict(flat=rng.normal(500, 1, len(months)), strong=500 + 100 * np.sin(2 * np.pi * months / 12) + rng.normal(0, 1, len(months))),
+		index=pd.date_range('2009-01-01', periods=len(months), freq='MS'))
+
+	res = decompose_matrix(data)
+	strength = seasonal_strength(res['seasonal'], res['resid'])
+
+	assert strength.index[0] == 'strong'
+	assert strength['strong'] > 0.9 and strength['flat'] < 0.5
+
+
+def test_profiles_are_cached_per_columns():
+	data = _data()
+	renamed = data.set_axis([f'other_{i}' for i in range(data.shape[1])], axis=1)
+
+	res = precompute_profiles(data)
+
+	assert precompute_profiles(data) is res
+	assert list(precompute_profiles(renamed)['nobs'].index) == list(renamed.columns)
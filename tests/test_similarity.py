@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+import pytest
+
+from similarity import SimilarityIndex, dtw_distances, dtw_top_k, envelope, lb_keogh, znormalize, similarity_index
+
+
+def _data(n_rows=60, n_cols=40, seed=0):
+	rng = np.random.default_rng(seed)
+	data = pd.DataFrame(rng.normal(0, 1, size=(n_rows, n_cols)).cumsum(axis=0),
+		index=pd.date_range('2014-01-01', periods=n_rows, freq='MS'), columns=[f'tag_{i}' for i in range(n_cols)])
+
+	data.iloc[:20, 3] = np.nan
+	data.iloc[30:35, 4] = np.nan
+
+	return data
+
+
+def _dtw(a, b, radius):
+
+	# the textbook dynamic programming, one cell at a time
+	n = len(a)
+	cost = np.full((n + 1, n + 1), np.inf)
+	cost[0, 0] = 0.
+
+	for i in range(1, n + 1):
+		for j in range(max(1, i - radius), min(n, i + radius) + 1):
+			cost[i, j] = (a[i - 1] - b[j - 1]) ** 2 + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+
+	return np.sqrt(cost[n, n])
+
+
+def test_dtw_distances_match_brute_force():
+	z, _ = znormalize(_data().to_numpy())
+
+	dist = dtw_distances(z[:, 0], z[:, 1:], radius=4)
+	expected = [_dtw(z[:, 0], z[:, j], 4) for j in range(1, z.shape[1])]
+
+	np.testing.assert_allclose(dist, expected, rtol=1e-12)
+
+
+def test_lb_keogh_is_a_lower_bound():
+	z, _ = znormalize(_data().to_numpy())
+	upper, lower = envelope(z[:, :1], 4)
+
+	assert (lb_keogh(upper[:, 0], lower[:, 0], z[:, 1:]) <= dtw_distances(z[:, 0], z[:, 1:], radius=4) + 1e-12).all()
+
+
+@pytest.mark.parametrize('batch_size', [1, 8, 64])
+def test_dtw_top_k_matches_brute_force(batch_size):
+	z, _ = znormalize(_data().to_numpy())
+
+	idx, dist, n_computed = dtw_top_k(z[:, 0], z[:, 1:], k=5, radius=4, batch_size=batch_size)
+	expected = np.array([_dtw(z[:, 0], z[:, j], 4) for j in range(1, z.shape[1])])
+
+	np.testing.assert_allclose(dist, np.sort(expected)[:5], rtol=1e-12)
+	np.testing.assert_allclose(expected[idx], dist, rtol=1e-12)
+	assert n_computed <= z.shape[1] - 1
+
+
+def test_query_dtw_matches_brute_force():
+	data = _data()
+	index = SimilarityIndex(data, radius=4)
+	res = index.query('tag_0', k=5, method='dtw')
+
+	z = index.normalized(data.columns).fillna(0.).to_numpy()
+	valid = znormalize(data.to_numpy())[1]
+	expected = pd.Series({col : _dtw(z[:, 0], z[:, j], 4) for j, col in enumerate(data.columns) if j and valid[j]})
+
+	np.testing.assert_allclose(res.to_numpy(), expected.sort_values().iloc[:5].to_numpy(), rtol=1e-12)
+	assert set(res.index) == set(expected.sort_values().index[:5])
+
+
+def test_correlations_match_pandas():
+	data = _data()
+	data.iloc[50:, 0] = np.nan
+
+	res = SimilarityIndex(data, min_periods=12).correlations('tag_0')
+	expected = data.corr(min_periods=12)['tag_0'].drop('tag_0')
+
+	np.testing.assert_allclose(res.drop('tag_0').to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12, equal_nan=True)
+
+
+def test_index_cache_is_keyed_by_columns():
+	data = _data()
+	renamed = data.set_axis([f'other_{i}' for i in range(data.shape[1])], axis=1)
+
+	assert list(similarity_index(data).columns) == list(data.columns)
+	assert list(similarity_index(renamed).columns) == list(renamed.columns)
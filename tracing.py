@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+import time
+
+from collections import defaultdict
+from functools import wraps
+
+
+TRACE_ENV = 'STACKOVERTIME_TRACE'
+TRACE_DIR_ENV = 'STACKOVERTIME_TRACE_DIR'
+
+_enabled = os.environ.get(TRACE_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+_trace_dir = os.environ.get(TRACE_DIR_ENV, './TRACES')
+
+_lock = threading.Lock()
+_local = threading.local()
+_totals = defaultdict(lambda: dict(count=0, sum=0., max=0.))
+
+
+def enabled():
+
+	"""
+	Returns whether the tracing is on. It is switched on by setting the
+	STACKOVERTIME_TRACE environment variable to 1 before the app starts.
+	"""
+	return _enabled
+
+
+class _NoopSpan:
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+
+	def __init__(self, name, attrs):
+		self.name = name
+		self.attrs = attrs
+
+	def __enter__(self):
+		stack = _stack()
+		self.parent = stack[-1].name if stack else None
+		stack.append(self)
+
+		self.start = time.time()
+		self._t0 = time.perf_counter()
+
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		duration = time.perf_counter() - self._t0
+		_stack().pop()
+
+		record = dict(name=self.name, parent=self.parent, start=self.start, duration=duration,
+			thread=threading.current_thread().name, error=exc_type.__name__ if exc_type else None)
+		if self.attrs:
+			record['attrs'] = self.attrs
+
+		_record(record)
+
+		return False
+
+
+def _stack():
+	if not hasattr(_local, 'stack'):
+		_local.stack = list()
+		_local.spans = list()
+
+	return _local.stack
+
+
+def _record(record):
+	_local.spans.append(record)
+
+	with _lock:
+		totals = _totals[record['name']]
+		totals['count'] += 1
+		totals['sum'] += record['duration']
+		totals['max'] = max(totals['max'], record['duration'])
+
+		os.makedirs(_trace_dir, exist_ok=True)
+		with open(os.path.join(_trace_dir, 'spans.jsonl'), 'a') as f:
+			f.write(json.dumps(record) + '\n')
+
+
+def span(name, **attrs):
+
+	"""
+	Function to time a block of code as a named span.
+
+	Parameters:
+	-----------
+	name : str
+		Represents the name of the span, e.g. `page.Home` or `utils.plot_interactive`.
+
+	**attrs :
+		Represents extra (JSON serializable) attributes of the span.
+
+	Returns:
+	--------
+	span : context manager
+		Represents the span, a shared no-op when the tracing is off.
+
+	"""
+	if not _enabled:
+		return _NOOP
+
+	return _Span(name, attrs)
+
+
+def traced(name=None):
+
+	"""
+	Decorator to time every call of a function as a span. When the tracing
+	is off the function is returned unchanged.
+
+	Parameters:
+	-----------
+	name : str, optional; default:None
+		Represents the name of the span, `module.function` when None.
+
+	"""
+	def decorator(func):
+
+		if not _enabled:
+			return func
+
+		span_name = name or f'{func.__module__}.{func.__qualname__}'
+
+		@wraps(func)
+		def wrapper(*args, **kwargs):
+			with _Span(span_name, None):
+				return func(*args, **kwargs)
+
+		return wrapper
+
+	return decorator
+
+
+def instrument(obj, names, prefix):
+
+	"""
+	Function to time the calls of some attributes of an object (e.g. the
+	rendering functions of `streamlit`) by replacing them with traced wrappers.
+	Nothing is replaced when the tracing is off, or when already instrumented.
+	"""
+	if not _enabled:
+		return
+
+	for attr in names:
+		func = getattr(obj, attr)
+		if getattr(func, '__traced__', False):
+			continue
+
+		wrapper = traced(f'{prefix}.{attr}')(func)
+		wrapper.__traced__ = True
+		setattr(obj, attr, wrapper)
+
+
+def start_run():
+
+	"""
+	Forget the spans of the previous run (rerun of the Streamlit script) of the current thread.
+	"""
+	if _enabled:
+		_stack()
+		_local.spans = list()
+
+
+def run_spans():
+
+	"""
+	Returns the spans recorded by the current thread since `start_run`.
+	"""
+	if not _enabled:
+		return list()
+
+	_stack()
+	return list(_local.spans)
+
+
+def write_metrics():
+
+	"""
+	Function to write the totals of every span to `metrics.prom`, in the Prometheus text format.
+	"""
+	if not _enabled:
+		return
+
+	with _lock:
+		lines = ['# HELP stackovertime_span_seconds Time spent in the named spans.',
+			'# TYPE stackovertime_span_seconds summary']
+
+		for name, totals in sorted(_totals.items()):
+			label = name.replace('\\', '\\\\').replace('"', '\\"')
+			lines.append(f'stackovertime_span_seconds_sum{{span="{label}"}} {totals["sum"]:.6f}')
+			lines.append(f'stackovertime_span_seconds_count{{span="{label}"}} {totals["count"]}')
+
+		lines += ['# HELP stackovertime_span_max_seconds Longest call of the named spans.',
+			'# TYPE stackovertime_span_max_seconds gauge']
+
+		for name, totals in sorted(_totals.items()):
+			label = name.replace('\\', '\\\\').replace('"', '\\"')
+			lines.append(f'stackovertime_span_max_seconds{{span="{label}"}} {totals["max"]:.6f}')
+
+		os.makedirs(_trace_dir, exist_ok=True)
+		path = os.path.join(_trace_dir, 'metrics.prom')
+		with open(f'{path}.tmp', 'w') as f:
+			f.write('\n'.join(lines) + '\n')
+
+		os.replace(f'{path}.tmp', path)
@@ -5,13 +5,25 @@ import seaborn as sns
 import plotly.graph_objects as go
 import plotly.express as px
 import plotly.offline as pyo
+import inspect
+import os
+import threading
+import warnings
 
 from plotly.subplots import make_subplots
+from scipy import stats
+from scipy.signal import lfilter
 from statsmodels.tsa.stattools import adfuller, kpss, grangercausalitytests
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from dataset import data_fingerprint
+from distributions import tag_distributions
+from tracing import traced
 
 plt.style.use('ggplot')
 
+
 class MovingAverageFilter:
 
 	"""
@@ -43,6 +55,121 @@ class MovingAverageFilter:
 		return np.mean(self.data)
 
 
+def _window_sums(values, win_len):
+
+	"""
+	Trailing window sums of a 2-D array along axis 0, computed from a
+	single cumulative sum. Rows for which the window is not yet full are NaN.
+	"""
+	n = values.shape[0]
+	out = np.full(values.shape, np.nan)
+
+	if win_len > n:
+		return out
+
+	csum = np.cumsum(values, axis=0)
+	out[win_len - 1] = csum[win_len - 1]
+	out[win_len:] = csum[win_len:] - csum[:-win_len]
+
+	return out
+
+
+def _fill_gaps(values):
+
+	"""
+	Forward fill (and back fill the leading part of) every column of a 2-D array,
+	so that a recursive filter never sees a NaN.
+	"""
+	n = values.shape[0]
+	valid = ~np.isnan(values)
+
+	idx = np.where(valid, np.arange(n)[:, None], 0)
+	np.maximum.accumulate(idx, axis=0, out=idx)
+
+	first = valid.argmax(axis=0)
+	idx = np.where(np.arange(n)[:, None] < first, first, idx)
+
+	filled = np.take_along_axis(values, idx, axis=0)
+
+	return np.nan_to_num(filled)
+
+
+@traced()
+def rolling_moving_averages(data, windows=range(3, 11), kind='simple'):
+
+	"""
+	Function to compute the moving averages of many series for many
+	window lengths at once.
+
+	Parameters:
+	-----------
+	data : array-like
+		Represents the data with which we are working. A 1-D array is treated
+		as a single series, a 2-D array (or a pandas.DataFrame) as one series per column.
+
+	windows : iterable of int, optional; default:range(3, 11)
+		Represents the window lengths for which the Moving Average is calculated.
+
+	kind : str, optional; default:'simple'
+		Represents the type of the Moving Average. Possible values
+		`simple`, `weighted` or `exponential`
+
+	Returns:
+	--------
+	smoothed_vals : numpy.ndarray
+		Represents the moving averages of the data, of shape (n_windows, n_rows, n_cols).
+		The first `win_len - 1` rows, and every row whose window contains a missing
+		value, are NaN.
+
+	"""
+	if kind not in ('simple', 'weighted', 'exponential'):
+		raise ValueError(f"kind must be one of 'simple', 'weighted' or 'exponential', got {kind!r}")
+
+	values = np.asarray(data, dtype=np.float64)
+	if values.ndim == 1:
+		values = values.reshape(-1, 1)
+
+	windows = [int(w) for w in windows]
+	if any(w < 1 for w in windows):
+		raise ValueError('Window lengths must be positive integers')
+
+	n = values.shape[0]
+	missing = np.isnan(values)
+	clean = np.where(missing, 0., values)
+
+	if kind == 'weighted':
+		pos = np.arange(1, n + 1, dtype=np.float64)[:, None]
+		clean_pos = clean * pos
+
+	if kind == 'exponential':
+		filled = _fill_gaps(values)
+
+	smoothed_vals = np.empty((len(windows),) + values.shape)
+
+	for i, win_len in enumerate(windows):
+
+		n_missing = _window_sums(missing.astype(np.float64), win_len)
+
+		if kind == 'simple':
+			res = _window_sums(clean, win_len) / win_len
+
+		elif kind == 'weighted':
+			# sum_j (j - t + w) * x_j = sum_j j * x_j - (t - w) * sum_j x_j over the trailing window
+			shift = pos - win_len
+			res = (_window_sums(clean_pos, win_len) - shift * _window_sums(clean, win_len)) / (win_len * (win_len + 1) / 2)
+
+		else:
+			alpha = 2. / (win_len + 1)
+			res, _ = lfilter([alpha], [1., alpha - 1.], filled[1:], axis=0, zi=((1. - alpha) * filled[:1]))
+			res = np.concatenate([filled[:1], res], axis=0)
+
+		res[~(n_missing == 0)] = np.nan
+		smoothed_vals[i] = res
+
+	return smoothed_vals
+
+
+@traced()
 def apply_moving_average_filter(data, win_len=5):
 
 	"""
@@ -62,20 +189,114 @@ def apply_moving_average_filter(data, win_len=5):
 		Represents the moving average of the data
 
 	"""
-	ma = MovingAverageFilter(win_len=win_len)
-	
-	smoothed_vals = list()
+	smoothed_vals = rolling_moving_averages(np.asarray(data, dtype=np.float64).reshape(-1), windows=[win_len])
+
+	return smoothed_vals[0, :, 0].tolist()
+
+def lttb_indices(x, y, n_out):
+
+	"""
+	Function to downsample a series with the Largest-Triangle-Three-Buckets
+	algorithm.
+
+	Parameters:
+	-----------
+	x : array-like
+		Represents the (increasing, numeric) x values of the series.
+
+	y : array-like
+		Represents the y values of the series.
+
+	n_out : int
+		Represents the number of points to keep.
+
+	Returns:
+	--------
+	idx : numpy.ndarray
+		Represents the positions of the kept points, always including the first and the last.
+
+	"""
+	x = np.asarray(x, dtype=np.float64)
+	y = np.asarray(y, dtype=np.float64)
+	n = len(x)
+
+	if n_out >= n or n_out < 3:
+		return np.arange(n)
+
+	edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+	idx = np.empty(n_out, dtype=int)
+	idx[0], idx[-1] = 0, n - 1
+
+	a = 0
+	for i in range(n_out - 2):
+		start, end = edges[i], edges[i + 1]
+
+		if i + 2 < len(edges):
+			avg_x, avg_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
 
-	for i in range(len(data)):
-		ma.step(data[i])
-		if len(ma.data) != win_len:
-			smoothed_vals.append(np.nan)
 		else:
-			smoothed_vals.append(ma.current_state())
+			avg_x, avg_y = x[-1], y[-1]
+
+		area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+		a = start + int(np.argmax(area))
+		idx[i + 1] = a
+
+	return idx
+
+
+def downsample(series, max_points):
+
+	"""
+	Function to downsample a series with a datetime or numeric index to about
+	`max_points` observed points. Every run of observed values is downsampled
+	on its own, with a share of the budget proportional to its length, and
+	the first missing value after a run is kept so that the gaps still show.
+
+	Parameters:
+	-----------
+	series : pandas.Series
+		Represents the series to be downsampled.
+
+	max_points : int
+		Represents the point budget.
+
+	Returns:
+	--------
+	series : pandas.Series
+		Represents the downsampled series.
+
+	"""
+	if series.count() <= max_points:
+		return series
+
+	x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.asarray(series.index)
+	y = series.to_numpy(dtype=np.float64)
+
+	observed = np.flatnonzero(~np.isnan(y))
+	gaps = np.flatnonzero(np.diff(observed) > 1)
+	starts, ends = np.r_[observed[0], observed[gaps + 1]], np.r_[observed[gaps], observed[-1]] + 1
+
+	idx = [ends[:-1]]
+	for start, end in zip(starts, ends):
+		n_out = max(1, int(max_points * (end - start) / len(observed)))
+
+		if n_out >= 3:
+			idx.append(start + lttb_indices(x[start:end], y[start:end], n_out))
+
+		else:
+			idx.append(np.array([start, end - 1][:n_out]))
+
+	return series.iloc[np.unique(np.concatenate(idx))]
 
-	return smoothed_vals
 
-def plot_interactive(data, cols, title='Interactive Plot'):
+_figure_cache = OrderedDict()
+_figure_lock = threading.Lock()
+FIGURE_CACHE_SIZE = 32
+
+
+@traced()
+def plot_interactive(data, cols, title='Interactive Plot', max_points=None, x_range=None):
 
 	"""
 	Function to plot interactive plot for the data
@@ -91,14 +312,32 @@ def plot_interactive(data, cols, title='Interactive Plot'):
 	title : str, optional; default:'Interactive Plot'
 		Represents the title for the plot
 
+	max_points : int, optional; default:None
+		Represents the maximum number of points sent per series, downsampled with
+		the Largest-Triangle-Three-Buckets algorithm. Every point is sent when None.
+
+	x_range : tuple, optional; default:None
+		Represents the (start, end) of the plotted part of the data. Narrowing it
+		gives a finer resolution for the same point budget.
+
 
 	Returns:
 	--------
 	fig : plotly.Figure
-		Represents the interactive plot
+		Represents the interactive plot. Identical calls return the same
+		(cached) figure, which must not be modified.
 
 	"""
+	cols = list(cols)
+	if x_range is not None:
+		data = data.loc[x_range[0]:x_range[1]]
+
+	key = (tuple(cols), title, max_points, data_fingerprint(data[cols]))
 
+	with _figure_lock:
+		if key in _figure_cache:
+			_figure_cache.move_to_end(key)
+			return _figure_cache[key]
 
 	layout = dict(autosize=False, width=900, title=title,
 		xaxis=dict(
@@ -121,55 +360,130 @@ def plot_interactive(data, cols, title='Interactive Plot'):
 	fig = go.Figure(layout=layout)
 	for col in cols:
 
+		series = data[col] if max_points is None else downsample(data[col], max_points)
+
 		orgn = go.Scatter(name=f"{col}",
-			x=data.index,
-			y=data[col],
+			x=series.index,
+			y=series,
 			mode='lines',
 			line=dict(width=3))
 		fig.add_trace(orgn)
 
+	with _figure_lock:
+		_figure_cache[key] = fig
+		while len(_figure_cache) > FIGURE_CACHE_SIZE:
+			_figure_cache.popitem(last=False)
+
 	return fig
 
 
 
+@traced()
 def multiple_distribution_plots(data, cols, title='Distribution Plots'):
 
+	"""
+	Function to overlay the KDEs of the tags, computed by `distributions.tag_distributions`.
+	"""
 	fig, ax = plt.subplots(figsize=(12, 8))
-	
+	res = tag_distributions(data, cols)
+
 	for col in cols:
-		sns.distplot(data[col], hist=False, label=f'{col}', ax=ax)
+		ax.plot(res[col]['grid'], res[col]['density'], label=f'{col}')
 
 	ax.set_xlabel('Values')
+	ax.set_title(title)
 	ax.legend()
 
 	return fig
 
 
+@traced()
 def box_dist(data, col, title='Distribution Plot'):
 
+	"""
+	Function to plot the box plot, the histogram and the KDE of a tag, like `seaborn.distplot`.
+	"""
 	fig, ax = plt.subplots(2, 1, figsize=(12, 8))
 	sns.boxplot(x=data[col], ax=ax[0])
-	sns.distplot(data[col], ax=ax[1])
+
+	res = tag_distributions(data, [col])[col]
+	ax[1].bar(res['edges'][:-1], res['hist'], width=np.diff(res['edges']), align='edge', alpha=0.4)
+	ax[1].plot(res['grid'], res['density'])
+	ax[1].set_xlabel(col)
 	fig.suptitle(title)
 
 	return fig
 
 
 
-def interactive_pie_chart(data):
-	labels = ['python', 'r', 'matlab']
-	value_2009 = [data.loc['2009':'2009', col].values[0] for col in labels]
-	value_2019 = [data.loc['2019':'2019', col].values[0] for col in labels]
+def changepoint_plot(data, col, alerts, title='Changepoints and Anomalies'):
+
+	"""
+	Function to plot a tag with its alerts.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset.
+
+	col : str
+		Represents the tag to be plotted.
+
+	alerts : pandas.DataFrame
+		Represents the alerts of the tag, see `changepoints.ChangepointDetector.alerts_frame`.
+
+	title : str, optional; default:'Changepoints and Anomalies'
+		Represents the title for the plot
+
+	Returns:
+	--------
+	fig : plotly.Figure
+		Represents the plot, the changepoints as vertical lines and the anomalies as markers.
+
+	"""
+	fig = go.Figure(go.Scatter(name=col, x=data.index, y=data[col], mode='lines', line=dict(width=3)))
+
+	for _, alert in alerts[alerts['kind'] == 'changepoint'].iterrows():
+		fig.add_vline(x=alert['month'], line=dict(color='green' if alert['direction'] == 'increase' else 'red', dash='dash'))
+
+	anomalies = alerts[alerts['kind'] == 'anomaly']
+	fig.add_trace(go.Scatter(name='anomaly', x=anomalies['month'], y=data[col].reindex(anomalies['month']),
+		mode='markers', marker=dict(size=10, symbol='x', color='black')))
+
+	fig.update_layout(title=title, width=900, template='plotly_white')
+
+	return fig
+
+
+@traced()
+def interactive_pie_chart(data, years=(2009, 2019)):
+
+	"""
+	Function to compare the share of the tags in two years.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the yearly values (e.g. `DerivedState.yearly_means`), indexed by year, one tag per column.
+
+	years : tuple, optional; default:(2009, 2019)
+		Represents the two years compared.
+
+	"""
+	labels = data.columns.tolist()
+	values = [data.loc[int(year), labels].values for year in years]
 
-	fig = make_subplots(1, 2, specs=[[dict(type='domain'), dict(type='domain')]], subplot_titles=['2009', '2019'])
+	fig = make_subplots(1, 2, specs=[[dict(type='domain'), dict(type='domain')]], subplot_titles=[str(year) for year in years])
 
-	fig.add_trace(go.Pie(labels=labels, values=value_2009, scalegroup='one', name='Stackoverflow Question Toll 2009', hole=.3), 1, 1)
-	fig.add_trace(go.Pie(labels=labels, values=value_2019, scalegroup='one', name='Stackoverflow Question Toll 2019', hole=.3), 1, 2)
+	for i, year in enumerate(years):
+		fig.add_trace(go.Pie(labels=labels, values=values[i], scalegroup='one', name=f'Stackoverflow Question Toll {year}', hole=.3), 1, i + 1)
 
-	fig.update_layout(title_text='Stack Overflow Question Toll of Python, R, and Matlab', width=900)
+	fig.update_layout(title_text=f"Stack Overflow Question Toll of {', '.join(labels[:-1])}, and {labels[-1]}" if len(labels) > 1 else
+		f'Stack Overflow Question Toll of {labels[0]}', width=900)
 	return fig
 
 
+@traced()
 def adfuller_test(data, trace=False):
 	"""
 	Perform the Augmented-Dickey Fuller Test on the data
@@ -214,6 +528,7 @@ def adfuller_test(data, trace=False):
 	return res, is_stn
 
 
+@traced()
 def kpss_test(data, reg='c', trace=False):
 
 	"""
@@ -261,3 +576,532 @@ def kpss_test(data, reg='c', trace=False):
 
 	return res, is_stn
 
+
+
+def _stationarity_rows(data, regs):
+
+	"""
+	Worker for `stationarity_table`. Runs the ADF and KPSS Tests on every
+	column of a chunk of the dataset.
+	"""
+	rows = dict()
+
+	for col in data.columns:
+		series = data[col].dropna()
+		row = dict()
+
+		try:
+			res, is_stn = adfuller_test(series)
+			row.update({('ADF', k) : v for k, v in res.items()})
+			row[('ADF', 'is_stationary')] = is_stn
+
+		except Exception as e:
+			row[('ADF', 'error')] = f'{type(e).__name__}: {e}'
+
+		for reg in regs:
+			try:
+				res, is_stn = kpss_test(series, reg=reg)
+				row.update({(f'KPSS-{reg}', k) : v for k, v in res.items()})
+				row[(f'KPSS-{reg}', 'is_stationary')] = is_stn
+
+			except Exception as e:
+				row[(f'KPSS-{reg}', 'error')] = f'{type(e).__name__}: {e}'
+
+		rows[col] = row
+
+	return rows
+
+
+_stationarity_cache = OrderedDict()
+_stationarity_lock = threading.Lock()
+STATIONARITY_CACHE_SIZE = 16
+
+
+@traced()
+def stationarity_table(data, regs=('c', 'ct'), n_jobs=None, use_cache=True):
+
+	"""
+	Function to perform the Augmented-Dickey Fuller Test and the KPSS Test
+	on every column of the data, in parallel.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the data on which the tests need to be performed. Missing
+		values of a column are dropped before its tests.
+
+	regs : tuple, optional; default:('c', 'ct')
+		Represents the null hypotheses for the KPSS Test.
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None,
+		and runs in the current process when 1.
+
+	use_cache : bool, optional; default:True
+		Represents whether to reuse the table computed earlier for the same data
+		and null hypotheses.
+
+	Returns:
+	--------
+	res : pandas.DataFrame
+		Represents the results of the tests, one row per column of the data. The
+		columns are indexed by the test (`ADF`, `KPSS-c`, `KPSS-ct`) and the fields
+		returned by `adfuller_test` and `kpss_test`, plus `is_stationary`.
+
+	"""
+	regs = tuple(regs)
+	# the fingerprint ignores the column names
+	key = (tuple(data.columns), data_fingerprint(data), regs)
+
+	if use_cache:
+		with _stationarity_lock:
+			if key in _stationarity_cache:
+				_stationarity_cache.move_to_end(key)
+				return _stationarity_cache[key]
+
+	n_jobs = n_jobs or os.cpu_count()
+	chunks = [data.iloc[:, i::n_jobs] for i in range(min(n_jobs, data.shape[1]))]
+
+	if n_jobs == 1:
+		rows = _stationarity_rows(data, regs)
+
+	else:
+		rows = dict()
+		with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+			for chunk_rows in executor.map(_stationarity_rows, chunks, [regs] * len(chunks)):
+				rows.update(chunk_rows)
+
+	tests = ['ADF'] + [f'KPSS-{reg}' for reg in regs]
+	res = pd.DataFrame.from_dict(rows, orient='index').reindex(data.columns)
+	res = res[sorted(res.columns, key=lambda c: tests.index(c[0]))]
+	res.columns = pd.MultiIndex.from_tuples(res.columns, names=['test', 'field'])
+
+	if use_cache:
+		with _stationarity_lock:
+			_stationarity_cache[key] = res
+			while len(_stationarity_cache) > STATIONARITY_CACHE_SIZE:
+				_stationarity_cache.popitem(last=False)
+
+	return res
+
+
+def lagged_cross_correlation(data, max_lag=4):
+
+	"""
+	Function to compute the lagged cross-correlations between all the columns
+	of the data at once.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	max_lag : int, optional; default:4
+		Represents the maximum lag for which the correlation is calculated.
+
+	Returns:
+	--------
+	corr : numpy.ndarray
+		Represents the correlations of shape (max_lag, n_cols, n_cols), where
+		`corr[l - 1, i, j]` is the correlation between column `i` at time `t - l`
+		and column `j` at time `t`. Missing values are ignored.
+
+	"""
+	values = np.asarray(data, dtype=np.float64)
+	n = values.shape[0]
+
+	mean = np.nanmean(values, axis=0)
+	std = np.nanstd(values, axis=0)
+	std[~(std > 0)] = np.inf
+
+	z = np.nan_to_num((values - mean) / std)
+
+	corr = np.empty((max_lag, values.shape[1], values.shape[1]))
+	for lag in range(1, max_lag + 1):
+		corr[lag - 1] = z[:n - lag].T @ z[lag:] / max(n - lag, 1)
+
+	return corr
+
+
+def _granger_rows(data, pairs, max_lag, test):
+
+	"""
+	Worker for `granger_matrix`. Returns the minimum p-value over the lags
+	for every (cause, effect) pair, NaN when the test fails.
+	"""
+	pvals = list()
+
+	for cause, effect in pairs:
+		pair_data = data[[effect, cause]].dropna()
+
+		try:
+			res = grangercausalitytests(pair_data.values, maxlag=max_lag, **_granger_kwargs)
+			pvals.append(min(res[lag][0][test][1] for lag in res))
+
+		except Exception:
+			pvals.append(np.nan)
+
+	return pvals
+
+
+# `verbose` only silences the printing of old statsmodels releases and was removed later
+_granger_kwargs = dict(verbose=False) if 'verbose' in inspect.signature(grangercausalitytests).parameters else dict()
+_granger_cache = OrderedDict()
+_granger_lock = threading.Lock()
+GRANGER_CACHE_SIZE = 8
+
+
+@traced()
+def granger_matrix(data, max_lag=4, min_corr=0.2, diff=True, test='ssr_ftest', n_jobs=None, use_cache=True):
+
+	"""
+	Function to compute the Granger Causality p-values between
+	every ordered pair of columns of the data.
+
+	Pairs whose lagged cross-correlation never reaches `min_corr` in absolute
+	value are not tested.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	max_lag : int, optional; default:4
+		Represents the maximum lag of the tests.
+
+	min_corr : float, optional; default:0.2
+		Represents the minimum absolute lagged cross-correlation for a pair to be tested.
+		Every pair is tested when 0.
+
+	diff : bool, optional; default:True
+		Represents whether to difference the series before the tests, as the tests
+		assume stationary series.
+
+	test : str, optional; default:'ssr_ftest'
+		Represents the test statistic whose p-value is reported. Possible values
+		`ssr_ftest`, `ssr_chi2test`, `lrtest` or `params_ftest`
+
+	n_jobs : int, optional; default:None
+		Represents the number of worker processes. Uses all the CPUs when None,
+		and runs in the current process when 1.
+
+	use_cache : bool, optional; default:True
+		Represents whether to reuse the matrix computed earlier for the same data and parameters.
+
+	Returns:
+	--------
+	pvals : pandas.DataFrame
+		Represents the minimum p-value over the lags that the row tag Granger-causes
+		the column tag. NaN on the diagonal and for the pruned pairs.
+
+	"""
+	# the fingerprint ignores the column names
+	key = (tuple(data.columns), data_fingerprint(data), max_lag, min_corr, diff, test)
+
+	if use_cache:
+		with _granger_lock:
+			if key in _granger_cache:
+				_granger_cache.move_to_end(key)
+				return _granger_cache[key]
+
+	series = data.diff() if diff else data
+	cols = data.columns.tolist()
+
+	corr = np.abs(lagged_cross_correlation(series, max_lag=max_lag)).max(axis=0)
+	np.fill_diagonal(corr, 0.)
+	cause_idx, effect_idx = np.nonzero(corr >= min_corr) if min_corr > 0 else np.nonzero(~np.eye(len(cols), dtype=bool))
+	pairs = [(cols[i], cols[j]) for i, j in zip(cause_idx, effect_idx)]
+
+	n_jobs = n_jobs or os.cpu_count()
+	chunks = [pairs[i::n_jobs] for i in range(min(n_jobs, len(pairs)))]
+
+	if n_jobs == 1 or len(chunks) < 2:
+		chunk_pvals = [_granger_rows(series, chunk, max_lag, test) for chunk in chunks]
+
+	else:
+		with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+			chunk_pvals = list(executor.map(_granger_rows, [series] * len(chunks), chunks, [max_lag] * len(chunks), [test] * len(chunks)))
+
+	pvals = np.full((len(cols), len(cols)), np.nan)
+	for i, chunk in enumerate(chunk_pvals):
+		pvals[cause_idx[i::n_jobs], effect_idx[i::n_jobs]] = chunk
+
+	pvals = pd.DataFrame(pvals, index=pd.Index(cols, name='cause'), columns=pd.Index(cols, name='effect'))
+
+	if use_cache:
+		with _granger_lock:
+			_granger_cache[key] = pvals
+			while len(_granger_cache) > GRANGER_CACHE_SIZE:
+				_granger_cache.popitem(last=False)
+
+	return pvals
+
+
+def leading_indicators(pvals, tag, k=10, alpha=0.05):
+
+	"""
+	Function to find the tags which Granger-cause a tag the most.
+
+	Parameters:
+	-----------
+	pvals : pandas.DataFrame
+		Represents the p-values computed by `granger_matrix`.
+
+	tag : str
+		Represents the tag whose leading indicators are needed.
+
+	k : int, optional; default:10
+		Represents the maximum number of tags returned.
+
+	alpha : float, optional; default:0.05
+		Represents the significance level.
+
+	Returns:
+	--------
+	res : pandas.Series
+		Represents the p-values of the top-k leading tags, in increasing order.
+
+	"""
+	res = pvals[tag].dropna()
+	res = res[res <= alpha].sort_values()
+
+	return res.head(k).rename('p-values')
+
+
+def granger_heatmap(pvals, title='Granger Causality p-values'):
+
+	"""
+	Function to plot the p-value matrix computed by `granger_matrix`.
+
+	Parameters:
+	-----------
+	pvals : pandas.DataFrame
+		Represents the p-values computed by `granger_matrix`.
+
+	title : str, optional; default:'Granger Causality p-values'
+		Represents the title for the plot
+
+	Returns:
+	--------
+	fig : plotly.Figure
+		Represents the heatmap
+
+	"""
+	fig = go.Figure(go.Heatmap(z=pvals.values, x=pvals.columns, y=pvals.index, zmin=0, zmax=1,
+		colorscale='Viridis_r', colorbar=dict(title='p-value')))
+	fig.update_layout(title=title, width=900, height=900, xaxis_title='Effect', yaxis_title='Cause', template='plotly_white')
+
+	return fig
+
+
+def acf_matrix(data, nlags=40):
+
+	"""
+	Function to compute the auto-correlations of every column
+	of the data at once, using the FFT.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column. Missing values are ignored.
+
+	nlags : int, optional; default:40
+		Represents the number of lags for which the auto-correlation is calculated.
+
+	Returns:
+	--------
+	acf : pandas.DataFrame
+		Represents the auto-correlations, one row per lag (from 0 to `nlags`) and one column per tag.
+
+	"""
+	values = np.asarray(data, dtype=np.float64)
+	n = values.shape[0]
+
+	x = np.nan_to_num(values - np.nanmean(values, axis=0))
+	n_fft = 1 << int(np.ceil(np.log2(2 * n - 1)))
+
+	freq = np.fft.rfft(x, n=n_fft, axis=0)
+	acov = np.fft.irfft(freq * np.conj(freq), n=n_fft, axis=0)[:nlags + 1]
+
+	with np.errstate(invalid='ignore', divide='ignore'):
+		acf = acov / acov[:1]
+
+	return pd.DataFrame(acf, index=pd.RangeIndex(nlags + 1, name='lag'), columns=data.columns)
+
+
+def decompose_matrix(data, period=12):
+
+	"""
+	Function to compute the additive decomposition of every column of the data at
+	once, the same way as `statsmodels.tsa.seasonal.seasonal_decompose`.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	period : int, optional; default:12
+		Represents the period of the seasonality.
+
+	Returns:
+	--------
+	res : dict
+		Represents the `trend`, `seasonal` and `resid` components, each a
+		pandas.DataFrame shaped like the data. The trend is NaN at both ends
+		and wherever its window contains a missing value.
+
+	"""
+	values = np.asarray(data, dtype=np.float64)
+	n = values.shape[0]
+
+	if period % 2 == 0:
+		weights = np.r_[0.5, np.ones(period - 1), 0.5] / period
+
+	else:
+		weights = np.ones(period) / period
+
+	half = len(weights) // 2
+
+	trend = np.full(values.shape, np.nan)
+	if n >= len(weights):
+		# a causal FIR filter, shifted back by half its length to be centered
+		trend[half:n - half] = lfilter(weights, [1.], values, axis=0)[len(weights) - 1:]
+
+	detrended = values - trend
+
+	with warnings.catch_warnings():
+		warnings.simplefilter('ignore', category=RuntimeWarning)
+		period_averages = np.stack([np.nanmean(detrended[i::period], axis=0) for i in range(period)])
+
+	period_averages -= np.mean(period_averages, axis=0)
+	seasonal = np.tile(period_averages, (n // period + 1, 1))[:n]
+
+	resid = detrended - seasonal
+
+	return dict(trend=pd.DataFrame(trend, index=data.index, columns=data.columns),
+		seasonal=pd.DataFrame(seasonal, index=data.index, columns=data.columns),
+		resid=pd.DataFrame(resid, index=data.index, columns=data.columns))
+
+
+def seasonal_strength(seasonal, resid):
+
+	"""
+	Function to compute the strength of the seasonality of every tag, as
+	`max(0, 1 - Var(resid) / Var(seasonal + resid))`.
+
+	Parameters:
+	-----------
+	seasonal : pandas.DataFrame
+		Represents the seasonal components computed by `decompose_matrix`.
+
+	resid : pandas.DataFrame
+		Represents the residual components computed by `decompose_matrix`.
+
+	Returns:
+	--------
+	strength : pandas.Series
+		Represents the seasonal strength (between 0 and 1) per tag, in decreasing order.
+
+	"""
+	valid = resid.notna()
+	with np.errstate(invalid='ignore', divide='ignore'):
+		strength = 1 - resid.var() / (seasonal.where(valid) + resid).var()
+
+	return strength.clip(lower=0).sort_values(ascending=False).rename('Seasonal Strength')
+
+
+_profile_cache = OrderedDict()
+_profile_lock = threading.Lock()
+PROFILE_CACHE_SIZE = 8
+
+
+@traced()
+def precompute_profiles(data, period=12, nlags=40):
+
+	"""
+	Function to precompute the auto-correlations, the additive decomposition
+	and the seasonal strength of every tag, cached per dataset.
+
+	Parameters:
+	-----------
+	data : pandas.DataFrame
+		Represents the dataset, one tag per column.
+
+	period : int, optional; default:12
+		Represents the period of the seasonality.
+
+	nlags : int, optional; default:40
+		Represents the number of lags of the auto-correlations.
+
+	Returns:
+	--------
+	res : dict
+		Represents the `acf` computed by `acf_matrix`, the `trend`, `seasonal` and `resid`
+		computed by `decompose_matrix`, the `seasonal_strength` and the number of
+		observations `nobs` of every tag.
+
+	"""
+	# the fingerprint ignores the column names
+	key = (tuple(data.columns), data_fingerprint(data), period, nlags)
+
+	with _profile_lock:
+		if key in _profile_cache:
+			_profile_cache.move_to_end(key)
+			return _profile_cache[key]
+
+	res = decompose_matrix(data, period=period)
+	res['acf'] = acf_matrix(data, nlags=nlags)
+	res['seasonal_strength'] = seasonal_strength(res['seasonal'], res['resid'])
+	res['nobs'] = data.notna().sum()
+
+	with _profile_lock:
+		_profile_cache[key] = res
+		while len(_profile_cache) > PROFILE_CACHE_SIZE:
+			_profile_cache.popitem(last=False)
+
+	return res
+
+
+def acf_plot(acf, nobs, ax, title='Autocorrelation', alpha=0.05):
+
+	"""
+	Function to plot precomputed auto-correlations like
+	`statsmodels.graphics.tsaplots.plot_acf(use_vlines=False)`.
+
+	Parameters:
+	-----------
+	acf : array-like
+		Represents the auto-correlations, starting at lag 0.
+
+	nobs : int
+		Represents the number of observations of the series.
+
+	ax : matplotlib.axes.Axes
+		Represents the axes on which to plot.
+
+	title : str, optional; default:'Autocorrelation'
+		Represents the title for the plot
+
+	alpha : float, optional; default:0.05
+		Represents the significance level of the confidence band (Bartlett's formula).
+
+	Returns:
+	--------
+	ax : matplotlib.axes.Axes
+		Represents the axes of the plot
+
+	"""
+	acf = np.asarray(acf, dtype=np.float64)
+	lags = np.arange(len(acf))
+
+	varacf = np.ones(len(acf)) / nobs
+	varacf[0] = 0
+	varacf[2:] *= 1 + 2 * np.cumsum(acf[1:-1] ** 2)
+	conf = stats.norm.ppf(1 - alpha / 2.) * np.sqrt(varacf)
+
+	ax.plot(lags, acf, marker='o', markersize=5, linestyle='None')
+	ax.axhline(0, color='k', linewidth=1)
+	ax.fill_between(lags, -conf, conf, alpha=.25, linewidth=0)
+	ax.set_title(title)
+
+	return ax
@@ -0,0 +1,99 @@
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+
+# navigation entry -> module rendering it, imported the first time the entry is selected
+PAGES = {
+	"Home" : 'views.home',
+	"Data Insights" : 'views.insights',
+	"Know Specific Data" : 'views.specific',
+	"Statistical Tests" : 'views.tests',
+	"Changepoints" : 'views.changepoints',
+	"Data Modelling" : 'views.forecasting',
+}
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_imports = dict()
+_imports_lock = threading.Lock()
+
+
+def _top_level(modules):
+	return {name.split('.')[0] for name in modules if not name.startswith('_')}
+
+
+def load_page(name):
+
+	"""
+	Function to import the module of a page, with its dependencies, on first use.
+
+	Parameters:
+	-----------
+	name : str
+		Represents the navigation entry of the page.
+
+	Returns:
+	--------
+	page : module
+		Represents the module of the page, with a `render(df, derived)` function.
+
+	"""
+	module_name = PAGES[name]
+
+	with _imports_lock:
+		if module_name in sys.modules:
+			return sys.modules[module_name]
+
+		before = set(sys.modules)
+		start = time.perf_counter()
+		page = importlib.import_module(module_name)
+		duration = time.perf_counter() - start
+
+		_imports[name] = dict(seconds=duration, modules=sorted(_top_level(set(sys.modules) - before) - {'views'}))
+
+	return page
+
+
+def import_report():
+
+	"""
+	Returns the import time of the pages loaded by this process (the first page
+	loaded also pays for the dependencies it shares with the others) and
+	the top level packages each of them pulled in.
+	"""
+	with _imports_lock:
+		return {name : dict(info) for name, info in _imports.items()}
+
+
+def measure_cold_imports(python=sys.executable):
+
+	"""
+	Function to measure the import time of every page on its own, each in
+	a fresh interpreter so that no page benefits from another one.
+
+	Returns:
+	--------
+	res : dict
+		Represents the import time (in seconds) and the top level
+		packages pulled in by every page, plus the base app (`init`).
+
+	"""
+	res = dict()
+	base = 'import streamlit, pandas, dataset, ingest, tracing'
+	probe = ('import sys, time, json; {setup}; before = set(sys.modules); start = time.perf_counter(); {stmt}; '
+		'print(json.dumps([time.perf_counter() - start, sorted({{m.split(".")[0] for m in set(sys.modules) - before}})]))')
+
+	cases = [('init', probe.format(setup='pass', stmt=base))]
+	cases += [(name, probe.format(setup=base, stmt=f'import {module_name}')) for name, module_name in PAGES.items()]
+
+	for name, code in cases:
+		out = subprocess.run([python, '-c', code], capture_output=True, text=True, check=True, cwd=_APP_DIR).stdout
+		seconds, modules = json.loads(out.strip().splitlines()[-1])
+		res[name] = dict(seconds=seconds, modules=[m for m in modules if not m.startswith('_') and m != 'views'])
+
+	return res
@@ -0,0 +1,14 @@
+import argparse
+import sys
+
+from views import measure_cold_imports
+
+
+if __name__ == "__main__":
+
+	parser = argparse.ArgumentParser(description='Report the cold import time of every page of the dashboard')
+	parser.add_argument('--python', default=sys.executable, help='interpreter used to import the pages')
+	args = parser.parse_args()
+
+	for name, res in measure_cold_imports(python=args.python).items():
+		print(f"{name:<20} {res['seconds'] * 1e3:10.1f} ms   {', '.join(res['modules'])}")
@@ -0,0 +1,39 @@
+import pandas as pd
+import streamlit as st
+
+from utils import changepoint_plot
+
+
+def render(df, derived):
+
+	"""
+	Renders the Changepoints page: the shifts and the outliers of the question counts flagged by the online detector.
+	"""
+	detector = derived.changepoints
+
+	st.header('Changepoints and Anomalies')
+	st.markdown(f'Every tag is checked when a month is added to the dataset, last month checked : **{detector.last_month:%Y-%m}**')
+
+	kinds = st.multiselect('Alerts', ['changepoint', 'anomaly'], default=['changepoint'])
+	directions = st.multiselect('Direction', ['increase', 'decrease'], default=['increase', 'decrease'])
+
+	first_date, last_date = df.index[0].to_pydatetime(), df.index[-1].to_pydatetime()
+	since = st.slider('Since', min_value=first_date, max_value=last_date, value=max(first_date, (pd.Timestamp(last_date) - pd.DateOffset(years=2)).to_pydatetime()))
+
+	alerts = detector.alerts_frame(kinds=kinds, since=since)
+	alerts = alerts[alerts['direction'].isin(directions)]
+
+	st.header(f'{alerts["tag"].nunique()} tags flagged since {since:%Y-%m}')
+	st.dataframe(alerts.assign(month=alerts['month'].dt.strftime('%Y-%m')))
+
+	if not len(alerts):
+		return
+
+	tags = alerts['tag'].unique().tolist()
+	option = st.selectbox('Select the Tag which needs to be analyzed', tags)
+
+	tag_alerts = detector.alerts_frame()
+	tag_alerts = tag_alerts[tag_alerts['tag'] == option]
+
+	fig = changepoint_plot(df, option, tag_alerts, title=f'Changepoints and Anomalies of the {option} tag')
+	st.write(fig)
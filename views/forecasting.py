@@ -0,0 +1,143 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import streamlit as st
+import time
+
+from pandas.tseries.offsets import DateOffset
+from sklearn.metrics import r2_score, mean_squared_error
+
+from modelling import arima_forecast
+from registry import get_registry
+from jobs import get_queue, DONE, FAILED
+from batch_ar import batch_ar_fit, batch_ar_forecast
+
+
+POLL_SECONDS = 2
+
+
+def _rerun():
+	# `st.rerun` replaced `st.experimental_rerun` in the newer versions of streamlit
+	(getattr(st, 'rerun', None) or st.experimental_rerun)()
+
+
+def _job_pending(job, label):
+
+	"""
+	Shows the status of a background job, returns whether it is still running.
+	"""
+	if job is None or job['status'] == DONE:
+		return False
+
+	if job['status'] == FAILED:
+		st.error(f"{label} failed: {job['error']}")
+		return False
+
+	st.info(f"{label} is running in the background since {time.strftime('%H:%M:%S', time.localtime(job['started']))}, "
+		"the results will show up here when they are ready.")
+	return True
+
+
+def render(df, derived):
+
+	"""
+	Renders the Data Modelling page: the ARIMA (or batched AR) fit and forecast of a tag.
+	"""
+	dropdown = st.selectbox('Tag', df.columns.tolist())
+	df_sub = df[[dropdown]]
+
+	slider = st.slider('Test Size (in months)', min_value=12, max_value=48, value=12)
+	last_date = df_sub.index[-1]
+	test_date = last_date + DateOffset(months=-slider)
+
+	train_data = df_sub[:test_date]
+	test_data = df_sub[test_date:]
+
+	registry = get_registry('./MODELS')
+
+	model_type = st.selectbox('Model', ['ARIMA', 'Batched AR'])
+
+	if model_type == 'Batched AR':
+		ar_lags = st.slider('AR Lags', min_value=1, max_value=24, value=12)
+
+	forecast_res = None
+
+	if model_type == 'ARIMA':
+		# the searches and fits run on the job queue so that they survive the reruns of the
+		# script, and the same tag and split requested by several sessions is only fitted once
+		jobs = get_queue('./JOBS', registry=registry)
+
+		best_params, model, fit_time = None, None, None
+
+		if st.button('Best-Params'):
+			best_params = registry.get_order(dropdown, df_sub[dropdown])
+			if best_params is None:
+				jobs.submit_search(dropdown, df_sub[dropdown])
+
+		if st.button('Fit-Model'):
+			best_params = registry.get_order(dropdown, df_sub[dropdown])
+			if best_params is not None:
+				model = registry.get_model(dropdown, train_data[dropdown], test_date, best_params['order'])
+
+			if model is None:
+				jobs.submit_fit(dropdown, df_sub[dropdown], test_date, order=best_params['order'] if best_params else None)
+
+		search_job = jobs.find('search', dropdown, df_sub[dropdown])
+		fit_job = jobs.find('fit', dropdown, df_sub[dropdown], test_date)
+		pending = _job_pending(search_job, 'The search of the best params')
+		pending = _job_pending(fit_job, 'The fit of the ARIMA model') or pending
+
+		if search_job is not None and search_job['status'] == DONE:
+			best_params = search_job['result']
+
+		if best_params is not None:
+			st.write(best_params)
+
+		if model is None and fit_job is not None and fit_job['status'] == DONE:
+			model = registry.get_model(dropdown, train_data[dropdown], test_date, fit_job['result']['order'])
+			fit_time = fit_job['finished'] - fit_job['started']
+
+			if model is None:
+				# the model was evicted from the registry since the job finished
+				jobs.submit_fit(dropdown, df_sub[dropdown], test_date, order=fit_job['result']['order'], force=True)
+				pending = True
+
+		if model is not None:
+			forecast_res = arima_forecast(model, train_data.index[-1], test_data.index[-1] )
+
+		if pending:
+			time.sleep(POLL_SECONDS)
+			_rerun()
+
+	elif st.button('Fit-Model'):
+		start = time.perf_counter()
+
+		# the AR models of all the tags come out of the same solve, so all of them are fitted
+		with st.spinner('Fitting the AR models of all the tags....'):
+			model = batch_ar_fit(df[:test_date], order=(ar_lags, 1))
+			forecast_res = batch_ar_forecast(model, train_data.index[-1], test_data.index[-1])[[dropdown]]
+
+		fit_time = time.perf_counter() - start
+
+	if forecast_res is not None:
+
+		if forecast_res.isna().values.any():
+			st.error(f'Not enough data in the {dropdown} tag to fit the model.')
+			return
+
+		# print(forecast_res)
+		score = r2_score(test_data[dropdown].values.reshape(-1), forecast_res.values.reshape(-1))
+		rmse = np.sqrt(mean_squared_error(test_data[dropdown].values.reshape(-1), forecast_res.values.reshape(-1)))
+
+
+		st.write("**Model Fitting Complete.**")
+		st.markdown(f'$\mu$ of the test data : {test_data[dropdown].mean()}')
+		st.markdown(f'$RMSE$ of the model : {rmse}')
+		st.markdown(f'$R^{2}$ Score of the model : {score}')
+		if fit_time is not None:
+			st.markdown(f'Fit time of the model : {fit_time:.3f}s' + (f' (all the {df.shape[1]} tags)' if model_type == 'Batched AR' else ''))
+
+		fig, ax = plt.subplots(figsize=(12,8))
+		plt.plot(test_data.index, test_data.values, label='Test Data')
+		plt.plot(forecast_res.index, forecast_res.values, label='Forecast')
+		plt.legend()
+		st.pyplot(fig)
@@ -0,0 +1,30 @@
+import streamlit as st
+
+
+def render(df, derived):
+
+	"""
+	Renders the Home page: a sample of the dataset and the missing values of every tag.
+	"""
+	st.header("Top 100 records of the StackOverflow Dataset")
+	cols = ["nltk", "spacy", "python", "r"]
+	st_ms = st.multiselect("Topics", df.columns.tolist(), default=cols)
+	st.dataframe(df[st_ms].head(100))
+
+	st.markdown(f""" 
+
+		The above Data-frame represents the top discussion topics and their tolls in StackOverflow from the year 2009-2019.
+		The total Number of records in the dataset is {df.shape[0]} and the total number of topics that are being discussed 
+		are {df.shape[1]}.
+		""")
+
+	st.markdown("The data is recorded at the begining of each month of each year.")
+	st.markdown("")
+
+	st.header("Percentage of Data Missing")
+	miss_df = derived.missing_percentage()
+	st.dataframe(miss_df)
+
+	st.markdown("")
+	st.header("Top 20 discussion topics in Stack Overflow over the year 2009-2019")
+	st.image('./img/comparison.gif')
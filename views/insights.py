@@ -0,0 +1,57 @@
+import streamlit as st
+
+from utils import plot_interactive, interactive_pie_chart, multiple_distribution_plots
+from similarity import similarity_index
+
+
+def render(df, derived):
+
+	"""
+	Renders the Data Insights page: the comparison plots of the tags.
+	"""
+	st.header("Comparison plots")
+	cols = ['nltk', 'spacy']
+	st_ms = st.multiselect("Topics", df.columns.tolist(), default=cols)
+	first_date, last_date = df.index[0].to_pydatetime(), df.index[-1].to_pydatetime()
+	view_range = st.slider('Date Range', min_value=first_date, max_value=last_date, value=(first_date, last_date))
+	fig = plot_interactive(df, st_ms, max_points=500, x_range=view_range)
+	st.write(fig)
+
+	st.markdown("")
+	st.header("Similar Tags")
+	tags = df.columns.tolist()
+	tag = st.selectbox('Tag', tags, index=tags.index('pandas') if 'pandas' in tags else 0)
+	method = st.radio('Similarity', ['Correlation', 'DTW'])
+	k = st.slider('Number of Similar Tags', min_value=1, max_value=20, value=5)
+
+	try:
+		similar = similarity_index(df).query(tag, k=k, method=method.lower(), start=view_range[0], end=view_range[1])
+
+	except ValueError as e:
+		st.error(str(e))
+
+	else:
+		st.dataframe(similar)
+		normalized = similarity_index(df).normalized([tag] + similar.index.tolist(), start=view_range[0], end=view_range[1])
+		fig_similar = plot_interactive(normalized, normalized.columns, title=f'Tags similar to {tag} (z-normalized)', max_points=500)
+		st.write(fig_similar)
+
+	st.markdown("")
+	st.markdown("# Distribution Plot for the data")
+	fig_dist = multiple_distribution_plots(df, st_ms)
+	st.pyplot(fig_dist)
+
+	st.markdown("")
+	df_sub1 = derived.yearly_means(['python', 'r', 'matlab'])
+
+	st.header("Comparison between Python, R, and Matlab Question Toll")
+	years = derived.aggregates.years()
+	year_1 = st.selectbox('First Year', years, index=years.index(2009) if 2009 in years else 0)
+	year_2 = st.selectbox('Second Year', years, index=years.index(2019) if 2019 in years else len(years) - 1)
+	fig2 = interactive_pie_chart(df_sub1, years=(year_1, year_2))
+	st.write(fig2)
+
+	st.markdown("")
+	st.header("Rise of Big-Data Libraries")
+	fig3 = plot_interactive(df, ['hadoop', 'apache-spark', 'pyspark', 'Dask'], max_points=500)
+	st.write(fig3)
@@ -0,0 +1,52 @@
+import matplotlib.pyplot as plt
+import streamlit as st
+
+from utils import plot_interactive, box_dist, precompute_profiles, acf_plot
+
+
+def render(df, derived):
+
+	"""
+	Renders the Know Specific Data page: the properties, seasonality and pattern of a tag.
+	"""
+	option = st.selectbox('Select the Tag which needs to be analyzed', df.columns.tolist())
+
+	df_sub2 = df[[option]]
+	st.header(f'Data Properties of {option} tag')
+	st.dataframe(derived.describe([option]))
+
+	st.header(f"Distribution of the {option} tag")
+	fig4 = box_dist(df_sub2, option, title=f'Distribution Plot of the {option}')
+	st.pyplot(fig4)
+
+	profiles = precompute_profiles(df)
+
+	st.header(f'Trend and Seasonality in the {option} tag')
+	fig5, ax5 = plt.subplots(3, 1, figsize=(12, 8))
+	ax5[0].plot(profiles['trend'][option])
+	ax5[1].plot(profiles['seasonal'][option])
+	ax5[2].plot(profiles['resid'][option])
+
+	ax5[0].set_ylabel('Trend')
+	ax5[1].set_ylabel('Seasonal')
+	ax5[2].set_ylabel('Residual')
+
+	st.pyplot(fig5)
+	st.markdown(f"Seasonal strength of the **{option}** tag : {profiles['seasonal_strength'][option]:.3f}")
+
+	if st.checkbox('Show the most seasonal tags'):
+		st.dataframe(profiles['seasonal_strength'].head(20))
+
+	st.header(f"Auto-Correlation plot of the {option} tag")
+	fig6, ax6 = plt.subplots(figsize=(10, 4))
+	acf_plot(profiles['acf'][option], profiles['nobs'][option], ax=ax6, title=f'AutoCorrelation of {option}')
+	st.pyplot(fig6)
+
+	st.header(f"The pattern of the {option} tag")
+
+	slider_val = st.slider('Window Length', min_value=3, max_value=10)
+
+	df_sub2['moving_average'] = derived.moving_averages[slider_val][option]
+
+	fig7 = plot_interactive(df_sub2, [option, 'moving_average'], title=f'Pattern in {option} tag')
+	st.write(fig7)
@@ -0,0 +1,65 @@
+import pandas as pd
+import streamlit as st
+
+from utils import stationarity_table, granger_matrix, leading_indicators, granger_heatmap
+
+
+def _verdict(stn_table, option, test):
+
+	"""
+	Returns the verdict of a test of a tag, or None with the error message when the test failed.
+	"""
+	is_stn = stn_table.loc[option, (test, 'is_stationary')]
+	error = stn_table.loc[option, (test, 'error')] if (test, 'error') in stn_table.columns else None
+
+	if pd.isna(is_stn):
+		return None, error if isinstance(error, str) else 'the test could not be run'
+
+	return ("Stationary" if is_stn else "Non-Stationary"), None
+
+
+def render(df, derived):
+
+	"""
+	Renders the Statistical Tests page: the stationarity and Granger causality tests.
+	"""
+	option = st.selectbox("Select the Tag which needs to be tested", df.columns.tolist())
+
+	with st.spinner('Running the tests on all the tags....'):
+		stn_table = stationarity_table(df)
+
+	st.header('Augmented Dickey-Fuller Test Results')
+	adtes_res = stn_table.loc[option, 'ADF'].drop(['is_stationary', 'error'], errors='ignore').rename('ADF results')
+	ad_is_stn, ad_error = _verdict(stn_table, option, 'ADF')
+	st.dataframe(adtes_res)
+
+	if ad_error is not None:
+		st.error(f'The Augmented Dickey Fuller Test failed on the tag {option}: {ad_error}')
+
+	else:
+		st.markdown(f'\n As per the Augmented Dickey Fuller the series for the tag **{option}** is considered to be **{ad_is_stn}**')
+
+	st.markdown("")
+	st.header('KPSS Test Results')
+	option2 = st.selectbox('Select the Null Hypothesis for the KPSS Test', ['c', 'ct'])
+	kpsstest_res = stn_table.loc[option, f'KPSS-{option2}'].drop(['is_stationary', 'error'], errors='ignore').rename('KPSS results')
+	kpss_is_stn, kpss_error = _verdict(stn_table, option, f'KPSS-{option2}')
+	st.dataframe(kpsstest_res)
+
+	if kpss_error is not None:
+		st.error(f'The KPSS Test failed on the tag {option}: {kpss_error}')
+
+	else:
+		st.markdown(f""" 
+			As per the KPSS Test on the series for the tag **{option}** is considered to be **{kpss_is_stn}**
+			""")
+
+	st.markdown("")
+	st.header('Granger Causality')
+	if st.checkbox('Show the Granger Causality between all the tags'):
+		with st.spinner('Running the Granger Causality tests....'):
+			granger_pvals = granger_matrix(df)
+
+		st.write(granger_heatmap(granger_pvals))
+		st.markdown(f'Tags leading the **{option}** tag')
+		st.dataframe(leading_indicators(granger_pvals, option))